@@ -5,11 +5,17 @@ import os
 import traceback
 from dotenv import load_dotenv
 from openai import OpenAI
-from engine.data_loader import get_binance_data
-from engine.backtester import run_backtest
+from engine.data_loader import get_binance_data, FetchStats, timeframe_to_ms
+from engine.resample import DEFAULT_BASE_TIMEFRAME, can_resample
+from engine.candle_store import CandleStore
+from engine.intrabar import LowerTimeframe
+from engine.result_cache import ResultCache, cached_signals, cached_backtest
+from engine.profiling import RunReport, Profiler
+from engine.montecarlo import max_streaks, monte_carlo, summarize
+from engine.chart_data import ChartData
 
-# --- IMPORT STRATEGI ---
-from strategies import simple_ma, bb_rsi, smc, trend_ema, supertrend
+# --- STRATEGI (registry, modul di-import saat dipakai) ---
+from engine import registry
 
 # --- LOAD ENV ---
 load_dotenv()
@@ -17,6 +23,9 @@ load_dotenv()
 # --- 1. CONFIG ---
 st.set_page_config(page_title="Crypto Backtester + AI", layout="wide")
 st.title("Crypto Backtester + DeepSeek Chat")
+MC_PATHS = 2000 # Jumlah path Monte Carlo untuk konteks AI
+DATA_REFRESH_SECONDS = 60 # Cache candle dianggap masih segar selama ini (ganti timeframe tanpa request network)
+SIGNAL_COLORS = {1: '#00BFFF', -1: '#FF00FF', 0: '#FFA500'} # Long / Short / Flat
 
 # --- 2. SESSION STATE ---
 if "backtest_result" not in st.session_state:
@@ -31,10 +40,19 @@ timeframe = st.sidebar.selectbox("Timeframe", ["15m", "1h", "4h", "1d", "1w", "1
 start_date = st.sidebar.date_input("Mulai", pd.to_datetime("2024-01-01"))
 end_date = st.sidebar.date_input("Selesai", pd.to_datetime("today"))
 
-strategy_option = st.sidebar.selectbox(
-    "Strategi",
-    ("Bollinger Bands + RSI", "Supertrend (Trend Follower)", "Triple EMA Trend", "Smart Money Concept (SMC)", "Simple MA Crossover")
-)
+strategy_option = st.sidebar.selectbox("Strategi", registry.labels())
+strategy_spec = registry.get(strategy_option)
+
+# Parameter strategi dari skema registry (default = setting bawaan strategi)
+strategy_params = {}
+with st.sidebar.expander("Parameter Strategi"):
+    for name, schema in strategy_spec.params.items():
+        if schema.get('type') == 'int':
+            strategy_params[name] = st.number_input(name, int(schema.get('min', 1)), int(schema.get('max', 10000)),
+                                                    int(schema['default']), step=1, key=f"{strategy_spec.key}.{name}")
+        else:
+            strategy_params[name] = st.number_input(name, float(schema.get('min', 0.0)), float(schema.get('max', 1000.0)),
+                                                    float(schema['default']), key=f"{strategy_spec.key}.{name}")
 
 st.sidebar.subheader("Manajemen Risiko")
 use_sl = st.sidebar.checkbox("Stop Loss (SL)", value=True)
@@ -42,37 +60,57 @@ sl_input = st.sidebar.number_input("SL %", 0.1, 5.0, 2.0) if use_sl else 0
 use_tp = st.sidebar.checkbox("Take Profit (TP)", value=True)
 tp_input = st.sidebar.number_input("TP %", 0.1, 20.0, 10.0) if use_tp else 0 
 
+st.sidebar.subheader("Eksekusi")
+allow_short = st.sidebar.checkbox("Short Selling (Signal -1)", value=False)
+max_positions = st.sidebar.number_input("Maks Posisi (Pyramiding)", 1, 10, 1, step=1)
+pyramid_bars = st.sidebar.number_input("Tambah Posisi Tiap N Bar", 1, 100, 1, step=1) if max_positions > 1 else 1
+fee_input = st.sidebar.number_input("Fee % per Transaksi", 0.0, 1.0, 0.0, step=0.01)
+slippage_input = st.sidebar.number_input("Slippage %", 0.0, 1.0, 0.0, step=0.01)
+use_intrabar = st.sidebar.checkbox("SL/TP Intrabar (High/Low)", value=False,
+                                   help=f"Bar yang kena SL & TP sekaligus dicek ke candle {DEFAULT_BASE_TIMEFRAME} lokal")
+
 # API KEY INPUT
 st.sidebar.markdown("---")
 env_key = os.getenv("DEEPSEEK_API_KEY")
 deepseek_api_key = env_key if env_key else st.sidebar.text_input("DeepSeek API Key", type="password")
 
+st.sidebar.markdown("---")
+use_profiler = st.sidebar.checkbox("Profiling (cProfile + memori)", value=False,
+                                   help="Lebih lambat: cProfile & tracemalloc aktif selama run")
+
 run_btn = st.sidebar.button("Jalankan Backtest", type="primary")
 
 # --- 4. FUNGSI AI CONTEXT ---
+class StreamlitProgress:
+    """Consumer callback progress(done, total, text) dari engine, ditampilkan sebagai st.progress."""
+
+    def __init__(self, text):
+        self.bar = st.progress(0, text=text)
+
+    def __call__(self, done, total, text):
+        value = int(done / total * 100) if total else done % 100
+        self.bar.progress(min(value, 100), text=text)
+
+    def close(self):
+        self.bar.empty()
+
+@st.cache_resource
+def get_result_cache():
+    """Satu ResultCache per server Streamlit (tingkat memori tetap hidup antar rerun)."""
+    return ResultCache()
+
 def prepare_ai_context(results, strategy, symbol, tf):
     """Merangkum data backtest jadi teks buat AI"""
-    log = results.get('trade_log', pd.DataFrame())
-    if log.empty: return "Data kosong, tidak ada trade."
+    trades = results.trades
+    if len(trades) == 0: return "Data kosong, tidak ada trade."
     
-    # Statistik Tambahan
-    win_streak = 0
-    loss_streak = 0
-    current_streak = 0
-    is_win = False
-    
-    # Hitung Streak Sederhana
-    for pnl in log['Profit/Loss %']:
-        if pnl > 0:
-            if not is_win: current_streak = 0
-            is_win = True
-            current_streak += 1
-            win_streak = max(win_streak, current_streak)
-        else:
-            if is_win: current_streak = 0
-            is_win = False
-            current_streak += 1
-            loss_streak = max(loss_streak, current_streak)
+    # Statistik Tambahan (streak dihitung dari trade tertutup saja)
+    trade_returns = trades.closed_returns()
+    wins, losses = max_streaks(trade_returns[None, :] > 0)
+    win_streak, loss_streak = int(wins[0]), int(losses[0])
+
+    # Monte Carlo: urutan trade di-bootstrap untuk melihat sebaran hasil yang mungkin
+    mc = summarize(monte_carlo(trade_returns, n_paths=MC_PATHS, method="bootstrap", seed=0))
 
     summary = f"""
     HASIL BACKTEST:
@@ -81,12 +119,18 @@ def prepare_ai_context(results, strategy, symbol, tf):
     - Total Return: {results['total_return_pct']:.2f}%
     - Win Rate: {results['win_rate']:.2f}%
     - Max Drawdown: {results['max_drawdown_pct']:.2f}%
-    - Total Trades: {len(log)}
+    - Total Trades: {trades.n_rows()}
     - Max Win Streak: {win_streak}
     - Max Loss Streak: {loss_streak}
     
+    MONTE CARLO ({MC_PATHS} path, bootstrap return per trade):
+    - Return Akhir p5 / median / p95: {mc.loc['p5', 'final_return_pct']:.2f}% / {mc.loc['p50', 'final_return_pct']:.2f}% / {mc.loc['p95', 'final_return_pct']:.2f}%
+    - Max Drawdown median / p5 (terburuk): {mc.loc['p50', 'max_drawdown_pct']:.2f}% / {mc.loc['p5', 'max_drawdown_pct']:.2f}%
+    - Max Loss Streak median / p95: {mc.loc['p50', 'max_loss_streak']:.0f} / {mc.loc['p95', 'max_loss_streak']:.0f}
+    - Peluang Rugi: {mc.attrs['prob_loss'] * 100:.1f}%
+    
     5 TRADE TERAKHIR:
-    {log.tail(5).to_string(index=False)}
+    {results.trade_log.tail(5).to_string(index=False)}
     """
     return summary
 
@@ -95,11 +139,29 @@ if run_btn:
     st.session_state.messages = [] # Reset chat setiap backtest baru
     status = st.status("Memproses...", expanded=True)
     
+    # Peak memory (tracemalloc) hanya saat profiling: tracing memperlambat tiap tahap
+    report = RunReport(track_memory=use_profiler, symbol=symbol, timeframe=timeframe, strategy=strategy_option)
+    profiler = None
+    if use_profiler:
+        profiler = Profiler(os.path.join("profiles", f"run_{pd.Timestamp.now():%Y%m%d_%H%M%S}.prof")).start()
+    
     try:
         # A. LOAD DATA
         status.write("Mengambil data dari Binance...")
-        start_str = f"{start_date} 00:00:00"
-        df = get_binance_data(symbol, timeframe, start_str)
+        # Ambil juga bar warm-up strategi sebelum tanggal mulai (indikator sudah panas di hari pertama)
+        warmup = strategy_spec.warmup(**strategy_params)
+        fetch_start = registry.warmup_start(start_date, pd.Timedelta(milliseconds=timeframe_to_ms(timeframe)), warmup)
+        start_str = f"{fetch_start:%Y-%m-%d %H:%M:%S}"
+        fetch_stats = FetchStats()
+        bar = StreamlitProgress(f"Mengambil data {symbol} dari Binance...")
+        with report.stage("load") as stage:
+            # Satu resolusi dasar per simbol; timeframe lain di-resample lokal dari cache
+            df = get_binance_data(symbol, timeframe, start_str, stats=fetch_stats, progress=bar,
+                                  base_timeframe=DEFAULT_BASE_TIMEFRAME, refresh_after=DATA_REFRESH_SECONDS)
+            stage.update(rows=len(df), **fetch_stats.as_dict())
+        bar.close()
+        for message in fetch_stats.errors:
+            st.warning(f"{message}. Memakai data cache yang sudah ada.")
         
         if df.empty:
             status.update(label="Gagal ambil data", state="error")
@@ -110,23 +172,37 @@ if run_btn:
             df_filtered = df.loc[mask]
             
             status.write(f"Menerapkan strategi {strategy_option}...")
-            if strategy_option == "Simple MA Crossover": df_s = simple_ma.apply_strategy(df_filtered)
-            elif strategy_option == "Bollinger Bands + RSI": df_s = bb_rsi.apply_strategy(df_filtered)
-            elif strategy_option == "Smart Money Concept (SMC)": df_s = smc.apply_strategy(df_filtered)
-            elif strategy_option == "Triple EMA Trend (High Win Rate)": df_s = trend_ema.apply_strategy(df_filtered)
-            elif strategy_option == "Supertrend (Trend Follower)": df_s = supertrend.apply_strategy(df_filtered)
+            # Frame sinyal & hasil backtest diambil dari cache kalau data + setting sama
+            cache = get_result_cache()
+            with report.stage("strategy", rows=len(df_filtered), warmup_bars=warmup) as stage:
+                df_s, stage['cache_hit'] = cached_signals(cache, df_filtered, strategy_spec, strategy_params)
+                df_s = df_s.loc[df_s.index >= pd.to_datetime(start_date)]
             
             # C. RUN BACKTEST
             status.write("Menghitung Profit/Loss...")
             sl_dec = sl_input / 100 if use_sl else 0
             tp_dec = tp_input / 100 if use_tp else 0
-            results = run_backtest(df_s, sl_pct=sl_dec, tp_pct=tp_dec)
+            execution = {'fee_pct': fee_input / 100, 'slippage_pct': slippage_input / 100, 'allow_short': allow_short,
+                         'max_positions': int(max_positions), 'pyramid_bars': int(pyramid_bars)}
+            if use_intrabar:
+                # Drill-down ke candle base yang sudah tersimpan lokal (dipakai juga untuk resample)
+                execution['intrabar'] = True
+                if timeframe != DEFAULT_BASE_TIMEFRAME and can_resample(DEFAULT_BASE_TIMEFRAME, timeframe):
+                    execution['drill_down'] = LowerTimeframe(CandleStore(), symbol, DEFAULT_BASE_TIMEFRAME,
+                                                             bar_timeframe=timeframe)
+            with report.stage("backtest", rows=len(df_s)) as stage:
+                results, stage['cache_hit'] = cached_backtest(cache, df_s, sl_pct=sl_dec, tp_pct=tp_dec, **execution)
+            
+            # Pyramid chart dihitung sekali per hasil; tiap rerun/zoom cukup ambil view-nya
+            with report.stage("chart", rows=len(df_s)):
+                chart = ChartData(results)
             
             # D. SIMPAN SESSION & PREPARE AI
+            # Cukup BacktestResult: array equity/trade + referensi df_s (tanpa salinan candle lagi)
             st.session_state.backtest_result = {
                 'results': results,
-                'df': df_s,
-                'log': results.get('trade_log', pd.DataFrame())
+                'chart': chart,
+                'report': report
             }
             
             # Inject Context ke AI (System Prompt)
@@ -149,26 +225,70 @@ if run_btn:
         st.error(f"Terjadi kesalahan: {str(e)}")
         st.code(traceback.format_exc())
 
+    finally:
+        if profiler:
+            profiler.stop()
+            report.meta['profile'] = profiler.path
+
 # --- 6. DISPLAY DASHBOARD ---
 if st.session_state.backtest_result:
     data = st.session_state.backtest_result
     res = data['results']
-    log = data['log']
     
     # METRICS
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total Return", f"{res['total_return_pct']:.2f}%", delta_color="normal")
     c2.metric("Win Rate", f"{res['win_rate']:.2f}%")
     c3.metric("Drawdown", f"{res['max_drawdown_pct']:.2f}%")
-    c4.metric("Trades", len(log))
+    c4.metric("Trades", res.trades.n_rows())
+    
+    # CHART (di-downsample: level pyramid yang pas + LTTB, bukan semua bar dikirim ke browser)
+    chart = data.get('chart') or ChartData(res)
+    chart_start, chart_end = chart.start.to_pydatetime(), chart.end.to_pydatetime()
+    zoom = st.slider("Rentang Grafik", min_value=chart_start, max_value=chart_end,
+                     value=(chart_start, chart_end), format="YYYY-MM-DD HH:mm")
+    view = chart.view(*zoom)
+    
+    if view['candles'] is not None:
+        st.subheader("Grafik Harga & Sinyal")
+        x, o, h, l, c = view['candles']
+        fig = go.Figure(go.Candlestick(x=x, open=o, high=h, low=l, close=c, name="Harga"))
+        if view['signals'] is not None:
+            sx, sy, sdir = view['signals']
+            fig.add_trace(go.Scatter(x=sx, y=sy, mode='markers', name="Sinyal",
+                                     marker=dict(size=5, color=[SIGNAL_COLORS[d] for d in sdir])))
+        if view['entries'] is not None:
+            ex, ey, etext, eside = view['entries']
+            fig.add_trace(go.Scatter(x=ex, y=ey, mode='markers', name="Entry", hovertext=etext,
+                                     marker=dict(symbol=['triangle-up' if d > 0 else 'triangle-down' for d in eside], size=10, color='#00FF00')))
+        if view['exits'] is not None:
+            ex, ey, etext, eside = view['exits']
+            fig.add_trace(go.Scatter(x=ex, y=ey, mode='markers', name="Exit", hovertext=etext,
+                                     marker=dict(symbol=['triangle-down' if d > 0 else 'triangle-up' for d in eside], size=10, color='#FF4B4B')))
+        fig.update_layout(height=450, template="plotly_dark", margin=dict(l=0, r=0, t=10, b=0), xaxis_rangeslider_visible=False)
+        st.plotly_chart(fig, use_container_width=True)
+        if view['entries'] is None or view['signals'] is None:
+            st.caption("Marker sinyal/trade disembunyikan karena terlalu padat. Persempit Rentang Grafik untuk melihatnya.")
     
-    # CHART
     st.subheader("Grafik Equity")
+    x, y = view['equity']
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=res['dataframe'].index, y=res['dataframe']['Equity_Curve'], mode='lines', line=dict(color='#00FF00')))
+    fig.add_trace(go.Scatter(x=x, y=y, mode='lines', line=dict(color='#00FF00')))
     fig.update_layout(height=350, template="plotly_dark", margin=dict(l=0, r=0, t=10, b=0))
     st.plotly_chart(fig, use_container_width=True)
     
+    # PROFIL EKSEKUSI
+    report = data.get('report')
+    if report is not None:
+        with st.expander(f"Profil Eksekusi ({report.total_wall:.2f} detik)"):
+            st.dataframe(report.to_frame(), use_container_width=True)
+            st.download_button("Download Report (JSON)", report.to_json(), file_name="run_report.json", mime="application/json")
+            profile_path = report.meta.get('profile')
+            if profile_path and os.path.exists(profile_path + '.txt'):
+                st.caption(f"cProfile disimpan di {profile_path}")
+                with open(profile_path + '.txt') as f:
+                    st.code(f.read())
+    
     # --- 7. CHAT AREA (DEEPSEEK) ---
     st.markdown("---")
     st.subheader("Diskusi dengan AI (DeepSeek)")
@@ -210,4 +330,4 @@ if st.session_state.backtest_result:
 
     # LOG EXPANDER
     with st.expander("Lihat Detail Transaksi"):
-        st.dataframe(log)
+        st.dataframe(res.trade_log)
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from bench.synthetic import make_ohlcv
+from engine.backtester import run_backtest
+from engine import registry
+from indicators import kernels
+
+STRATEGIES = registry.names()
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+def _measure(func, repeat):
+    """Waktu terbaik dari `repeat` kali jalan, lalu satu jalan terpisah di bawah tracemalloc untuk peak memory."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+def _record(case, bars, seconds, peak):
+    return {
+        'case': case,
+        'bars': bars,
+        'seconds': seconds,
+        'bars_per_sec': bars / seconds if seconds > 0 else float('inf'),
+        'peak_mb': peak / 1024 ** 2,
+    }
+
+def run_benchmarks(sizes=DEFAULT_SIZES, strategies=STRATEGIES, repeat=3, seed=42,
+                   sl_pct=0.02, tp_pct=0.04, on_result=None):
+    """
+    Ukur tiap apply_strategy dan run_backtest (di atas frame sinyal strategi tsb)
+    untuk setiap ukuran data sintetis. Return dict {'meta', 'results'} siap di-dump ke JSON.
+    """
+    specs = {name: registry.get(name) for name in strategies}
+
+    # Warm-up: import lazy, kompilasi kernel Numba, dsb. tidak ikut terukur
+    warm = make_ohlcv(500, seed=seed)
+    for spec in specs.values():
+        run_backtest(spec.apply(warm), sl_pct=sl_pct, tp_pct=tp_pct)
+
+    results = []
+    for n_bars in sizes:
+        df = make_ohlcv(n_bars, seed=seed)
+        for name, spec in specs.items():
+            seconds, peak, df_s = _measure(lambda: spec.apply(df), repeat)
+            results.append(_record(f"strategy.{name}", n_bars, seconds, peak))
+            if on_result: on_result(results[-1])
+
+            seconds, peak, _ = _measure(lambda: run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct), repeat)
+            results.append(_record(f"backtest.{name}", n_bars, seconds, peak))
+            if on_result: on_result(results[-1])
+        del df
+
+    meta = {
+        'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'numba': kernels.HAS_NUMBA,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'seed': seed,
+    }
+    return {'meta': meta, 'results': results}
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Bandingkan throughput dengan baseline per (case, bars).
+    Return list regresi: case yang bars/sec-nya turun lebih dari `tolerance` (0.2 = 20%).
+    """
+    base = {(r['case'], r['bars']): r for r in baseline.get('results', [])}
+    regressions = []
+    for r in report['results']:
+        ref = base.get((r['case'], r['bars']))
+        if ref is None:
+            continue
+        ratio = r['bars_per_sec'] / ref['bars_per_sec']
+        r['baseline_ratio'] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(r)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark strategi & backtester dengan data OHLCV sintetis.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Jumlah bar, pisahkan dengan koma (contoh: 1000,100000,10000000)")
+    parser.add_argument('--strategies', default=','.join(STRATEGIES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=None, help="Simpan hasil ke file JSON ini")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="File JSON baseline untuk perbandingan")
+    parser.add_argument('--save-baseline', action='store_true', help="Tulis hasil sebagai baseline baru")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Batas penurunan throughput (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    strategies = [s for s in args.strategies.split(',') if s]
+
+    def show(r):
+        print(f"{r['case']:<24} {r['bars']:>10,} bars  {r['seconds']:>9.4f}s  "
+              f"{r['bars_per_sec']:>14,.0f} bars/s  {r['peak_mb']:>9.1f} MB", flush=True)
+
+    report = run_benchmarks(sizes, strategies, args.repeat, args.seed, on_result=show)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESI: {r['case']} @ {r['bars']:,} bars -> {r['baseline_ratio']:.0%} dari baseline")
+        if not regressions:
+            print("Tidak ada regresi dibanding baseline.")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline disimpan ke {args.baseline}")
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from bench.synthetic import make_ohlcv
+from engine.data_loader import timeframe_to_ms
+
+class StandInExchange:
+    """
+    Exchange offline pengganti ccxt untuk engine.data_loader (id, rateLimit, milliseconds(),
+    fetch_ohlcv) di atas candle sintetis make_ohlcv. Latency dan kegagalan bisa disuntikkan
+    untuk menguji downloader sharded, retry & rate limiter tanpa network.
+
+    latency / jitter : detik per request (jitter = tambahan acak 0..jitter)
+    fail_rate        : peluang tiap request gagal (ConnectionError)
+    fail_first       : `fail_first` request pertama selalu gagal (deterministik)
+    fail_after       : semua request setelah `fail_after` request sukses gagal (simulasi koneksi putus)
+    now              : jam exchange (ms) untuk simulasi live; candle yang mulai >= now belum ada.
+                       None = semua candle sudah tertutup (jam tepat setelah candle terakhir)
+    """
+    id = 'standin'
+
+    def __init__(self, n_bars=10_000, timeframe='1m', start='2024-01-01', seed=0, latency=0.0, jitter=0.0,
+                 fail_rate=0.0, fail_first=0, fail_after=None, rate_limit=0, now=None):
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_to_ms(timeframe)
+        df = make_ohlcv(n_bars, freq=pd.Timedelta(milliseconds=self.tf_ms), start=start, seed=seed)
+        self.timestamps = df.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+        self.rows = [[int(t), *map(float, row)] for t, row in zip(self.timestamps, df.to_numpy())]
+        self.rateLimit = rate_limit
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_first = fail_first
+        self.fail_after = fail_after
+        self.now = now
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0 # Semua request, termasuk yang gagal
+        self.failures = 0
+        self.rows_served = 0
+        self.max_concurrent = 0
+        self.call_times = [] # time.monotonic() saat tiap request masuk
+
+    def milliseconds(self):
+        """'Sekarang' versi exchange ini: `now`, atau tepat setelah candle terakhir."""
+        if self.now is not None:
+            return int(self.now)
+        return int(self.timestamps[-1]) + self.tf_ms if len(self.timestamps) else 0
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=1000):
+        if timeframe != self.timeframe:
+            raise ValueError(f"StandInExchange hanya punya timeframe {self.timeframe!r}, diminta {timeframe!r}")
+        with self._lock:
+            self.calls += 1
+            number = self.calls
+            self.call_times.append(time.monotonic())
+            self._in_flight += 1
+            self.max_concurrent = max(self.max_concurrent, self._in_flight)
+            successes = self.calls - 1 - self.failures
+            fail = (self.calls <= self.fail_first
+                    or (self.fail_after is not None and successes >= self.fail_after)
+                    or (self.fail_rate > 0 and self._rng.random() < self.fail_rate))
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+        try:
+            if delay:
+                time.sleep(delay)
+            if fail:
+                with self._lock:
+                    self.failures += 1
+                raise ConnectionError(f"StandInExchange: request #{number} gagal (simulasi)")
+            lo = int(np.searchsorted(self.timestamps, since or 0))
+            hi = int(np.searchsorted(self.timestamps, self.milliseconds())) if self.now is not None else len(self.rows)
+            page = self.rows[lo:min(lo + limit, hi)]
+            with self._lock:
+                self.rows_served += len(page)
+            return [list(row) for row in page]
+        finally:
+            with self._lock:
+                self._in_flight -= 1
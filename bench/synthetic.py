@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Regime pasar: (drift log-return per bar, volatilitas per bar, rata-rata panjang regime dalam bar)
+REGIMES = {
+    'bull': (0.0004, 0.006, 800),
+    'bear': (-0.0004, 0.007, 600),
+    'sideways': (0.0, 0.003, 1000),
+    'volatile': (0.0, 0.015, 300),
+}
+
+def make_ohlcv(n_bars, freq='1h', start='2020-01-01', seed=None, start_price=30000.0, mean_reversion=1e-4):
+    """
+    OHLCV sintetis realistis tanpa network: random walk log-return berekor tebal
+    (Student-t) yang berganti-ganti regime (bull / bear / sideways / volatile),
+    dengan mean reversion sangat lambat di log harga.
+    Format sama dengan get_binance_data: index 'Timestamp', kolom Open/High/Low/Close/Volume.
+    """
+    rng = np.random.default_rng(seed)
+    params = np.array(list(REGIMES.values()), dtype=np.float64)
+
+    # 1. Urutan regime & panjangnya (geometrik), dipotong tepat n_bars
+    regime_ids = []
+    lengths = []
+    total = 0
+    while total < n_bars:
+        batch = max(16, (n_bars - total) // int(params[:, 2].mean()) + 1)
+        ids = rng.integers(0, len(params), batch)
+        lens = rng.geometric(1 / params[ids, 2])
+        regime_ids.append(ids)
+        lengths.append(lens)
+        total += int(lens.sum())
+    regime = np.repeat(np.concatenate(regime_ids), np.concatenate(lengths))[:n_bars]
+
+    # 2. Log-return: drift + vol * noise Student-t (df=4, dinormalisasi ke varians 1)
+    noise = rng.standard_t(4, n_bars) / np.sqrt(2)
+    log_ret = params[regime, 0] + params[regime, 1] * noise
+
+    # Log harga = AR(1) yang sangat lambat kembali ke harga awal (x_t = (1-k) x_{t-1} + r_t),
+    # supaya data jutaan bar tidak meledak / mendekati nol seperti random walk murni.
+    # Dihitung vektor lewat ewm: y_t = (1-k) y_{t-1} + k r_t -> x = y / k
+    k = mean_reversion
+    log_price = pd.Series(np.r_[0.0, log_ret]).ewm(alpha=k, adjust=False).mean().to_numpy()[1:] / k
+    close = start_price * np.exp(log_price)
+
+    # 3. Open = close sebelumnya (+ gap kecil), High/Low membungkus Open & Close
+    gap = rng.normal(0, 0.0005, n_bars) * params[regime, 1] / 0.006
+    open_ = np.r_[start_price, close[:-1]] * np.exp(gap)
+    wick = params[regime, 1] * 0.5
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 1, n_bars)) * wick)
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 1, n_bars)) * wick)
+
+    # 4. Volume ikut membesar saat harga bergerak jauh
+    volume = rng.lognormal(3, 0.5, n_bars) * (1 + np.abs(log_ret) / params[regime, 1])
+
+    index = pd.date_range(start, periods=n_bars, freq=freq, name='Timestamp')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
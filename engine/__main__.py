@@ -0,0 +1,147 @@
+import argparse
+import sys
+
+def _split(value):
+    return [v for v in value.split(',') if v] if value else None
+
+def _progress(done, total, text):
+    """Consumer progress untuk terminal (stderr, satu baris di-overwrite)."""
+    count = f"[{done}/{total}] " if total else ""
+    sys.stderr.write(f"\r{count}{text[:100]:<100}")
+    sys.stderr.flush()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Crypto backtester headless (tanpa Streamlit).")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="Jalankan batch backtest dari job spec JSON dan/atau argumen")
+    run.add_argument('spec', nargs='?', help="File job spec JSON (lihat engine/batch.py)")
+    run.add_argument('--symbols', help="Contoh: BTC/USDT,ETH/USDT")
+    run.add_argument('--timeframes', help="Contoh: 1h,4h")
+    run.add_argument('--strategies', help="Contoh: supertrend,smc")
+    run.add_argument('--start')
+    run.add_argument('--end')
+    run.add_argument('--sl', help="SL desimal, bisa lebih dari satu: 0.02,0.03")
+    run.add_argument('--tp', help="TP desimal, bisa lebih dari satu: 0.05,0.1")
+    run.add_argument('--capital', type=float)
+    run.add_argument('--workers', type=int, default=None, help="Jumlah proses worker (default: jumlah CPU)")
+    run.add_argument('--out', default='results', help="Folder output")
+    run.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    run.add_argument('--parallel-download', action='store_true', help="Downloader candle sharded")
+    run.add_argument('--base-timeframe', help="Unduh satu resolusi dasar (mis. 15m), timeframe lain di-resample lokal")
+    run.add_argument('--quiet', action='store_true')
+
+    parity = sub.add_parser('parity', help="Bandingkan candle hasil resample dengan candle native exchange")
+    parity.add_argument('--symbol', default='BTC/USDT')
+    parity.add_argument('--timeframes', default='1h,4h,1d,1w,1M')
+    parity.add_argument('--base', default=None, help="Timeframe dasar (default: engine.resample.DEFAULT_BASE_TIMEFRAME)")
+    parity.add_argument('--start', default='2024-01-01')
+    parity.add_argument('--rtol', type=float, default=1e-9)
+
+    dataset = sub.add_parser('dataset', help="Ekspor candle dari cache lokal ke dataset kolumnar memory-map")
+    dataset.add_argument('out', help="Folder dataset tujuan")
+    dataset.add_argument('--symbol', default='BTC/USDT')
+    dataset.add_argument('--timeframe', default='1m')
+    dataset.add_argument('--exchange', default='binance')
+    dataset.add_argument('--signals', help="Hitung kolom sinyal strategi ke dataset, contoh: supertrend,smc")
+
+    chunked = sub.add_parser('chunked', help="Backtest per blok di atas dataset kolumnar (RAM terbatas, histori sepanjang apa pun)")
+    chunked.add_argument('dataset', help="Folder dataset (hasil perintah 'dataset')")
+    chunked.add_argument('--strategy', required=True)
+    chunked.add_argument('--sl', type=float, default=0.0)
+    chunked.add_argument('--tp', type=float, default=0.0)
+    chunked.add_argument('--capital', type=float, default=1000)
+    chunked.add_argument('--block', type=int, default=None, help="Bar per blok (default: engine.chunked.DEFAULT_BLOCK)")
+    return parser
+
+def _spec_from_args(args):
+    # Import di sini supaya `python -m engine --help` tetap cepat
+    from engine.batch import load_spec
+
+    spec = load_spec(args.spec) if args.spec else {}
+    overrides = {
+        'symbols': _split(args.symbols),
+        'timeframes': _split(args.timeframes),
+        'strategies': _split(args.strategies),
+        'start': args.start,
+        'end': args.end,
+        'sl_pct': [float(v) for v in _split(args.sl)] if args.sl else None,
+        'tp_pct': [float(v) for v in _split(args.tp)] if args.tp else None,
+        'initial_capital': args.capital,
+    }
+    spec.update({k: v for k, v in overrides.items() if v is not None})
+    if args.start or args.end:
+        spec.pop('ranges', None)
+    for field in ('symbols', 'strategies'):
+        if not spec.get(field):
+            raise SystemExit(f"Job spec butuh '{field}' (file spec atau --{field})")
+    return spec
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'run':
+        from engine.batch import run_batch, write_results
+
+        spec = _spec_from_args(args)
+        progress = None if args.quiet else _progress
+        metrics, logs, equities = run_batch(spec, max_workers=args.workers, progress=progress,
+                                            parallel=args.parallel_download, base_timeframe=args.base_timeframe)
+        if progress:
+            sys.stderr.write("\n")
+        write_results(args.out, metrics, logs, equities, fmt=args.format)
+
+        columns = [c for c in ('job_id', 'total_return_pct', 'max_drawdown_pct', 'win_rate', 'trades', 'error') if c in metrics]
+        print(metrics[columns].to_string(index=False))
+        print(f"Hasil disimpan di {args.out}/")
+        failed = int(metrics['error'].notna().sum()) if 'error' in metrics else 0
+        if failed:
+            sys.stderr.write(f"{failed} dari {len(metrics)} job gagal (lihat kolom error)\n")
+            return 1
+
+    elif args.command == 'parity':
+        from engine.resample import check_parity, DEFAULT_BASE_TIMEFRAME
+
+        try:
+            table = check_parity(args.symbol, _split(args.timeframes), args.start,
+                                 base_timeframe=args.base or DEFAULT_BASE_TIMEFRAME, rtol=args.rtol)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print(table.to_string(index=False))
+        if (table['missing'] > 0).any() or (table['mismatched_bars'] > 0).any():
+            return 1
+
+    elif args.command == 'dataset':
+        from engine.candle_store import CandleStore
+        from engine.dataset import export_store, compute_signals
+        from engine import registry
+
+        try:
+            dataset = export_store(CandleStore(), args.exchange, args.symbol, args.timeframe, args.out)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for name in _split(args.signals) or []:
+            compute_signals(registry.get(name), dataset, out=f"Signal_{name}")
+        print(dataset)
+
+    elif args.command == 'chunked':
+        from engine.dataset import OHLCVDataset
+        from engine.chunked import run_chunked, DEFAULT_BLOCK
+        from engine import registry
+
+        try:
+            dataset = OHLCVDataset(args.dataset)
+            res = run_chunked(registry.get(args.strategy), dataset, initial_capital=args.capital,
+                              sl_pct=args.sl, tp_pct=args.tp, block=args.block or DEFAULT_BLOCK,
+                              prefix=f"{args.strategy}_")
+        except KeyError as e:
+            raise SystemExit(e.args[0])
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print(dataset)
+        print(f"total_return_pct={res.total_return_pct:.2f} max_drawdown_pct={res.max_drawdown_pct:.2f} "
+              f"win_rate={res.win_rate:.2f} trades={len(res.trades)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,119 +1,737 @@
-import pandas as pd
 import numpy as np
+from engine.intrabar import bar_resolver
+from engine.results import BacktestResult, TradeLog, TRADE_DTYPE, EXIT_SIGNAL, EXIT_SL, EXIT_TP
 
-def run_backtest(df, initial_capital=1000, sl_pct=0.0, tp_pct=0.0):
+def run_backtest(df, initial_capital=1000, sl_pct=0.0, tp_pct=0.0, mode="vectorized",
+                 fee_pct=0.0, slippage_pct=0.0, allow_short=False, max_positions=1, pyramid_bars=1,
+                 intrabar=False, drill_down=None):
     """
     Backtest engine update: Menghitung Win Rate.
+
+    Signal: 1 = long, -1 = short, 0 = flat (tanpa allow_short, -1 diperlakukan flat).
+
+    mode:
+    - "vectorized": core berbasis array NumPy (default, cepat untuk data panjang).
+    - "loop"      : loop bar-per-bar versi lama, dipakai sebagai referensi parity.
+
+    Opsi model posisi (hanya mode "vectorized", lihat simulate_positions):
+    fee_pct & slippage_pct per sisi transaksi, allow_short, max_positions (pyramiding:
+    tambah satu posisi tiap `pyramid_bars` bar selama sinyal bertahan).
+    intrabar=True: SL/TP dicek ke High/Low bar (bukan hanya Close). Bar yang menyentuh SL
+    dan TP sekaligus di-drill-down ke candle timeframe rendah lewat `drill_down`
+    (engine.intrabar.LowerTimeframe); tanpa drill_down, SL dianggap duluan.
+
+    Return BacktestResult (engine.results): metrik + array equity/drawdown + TradeLog,
+    tetap bisa diakses seperti dict lama (res['trade_log'], res['equity_curve'], ...).
+    """
+    execution = {'fee_pct': fee_pct, 'slippage_pct': slippage_pct, 'allow_short': allow_short,
+                 'max_positions': max_positions, 'pyramid_bars': pyramid_bars,
+                 'intrabar': intrabar, 'drill_down': drill_down}
+    legacy = not (fee_pct or slippage_pct or allow_short or max_positions != 1 or intrabar)
+    if mode == "loop":
+        if not legacy:
+            raise ValueError("Mode loop hanya mendukung long-only satu posisi tanpa fee/slippage/intrabar")
+        return _run_backtest_loop(df, initial_capital, sl_pct, tp_pct)
+    if mode == "vectorized":
+        if legacy:
+            return _run_backtest_vectorized(df, initial_capital, sl_pct, tp_pct)
+        return _run_backtest_positions(df, initial_capital, sl_pct, tp_pct, **execution)
+    raise ValueError(f"Mode backtest tidak dikenal: {mode}")
+
+# --- CORE VECTORIZED ---
+
+def _next_index(mask):
+    """
+    nxt[x] = index pertama >= x dimana mask True (len(mask) jika tidak ada).
+    Dipakai untuk lompat langsung ke edge sinyal berikutnya tanpa loop per bar.
+    """
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+def _find_trades(close, signal, sl_pct, tp_pct, open_price=np.nan):
+    """
+    Cari semua trade sekaligus dari array Close & Signal.
+    open_price (opsional): posisi yang masih terbuka dari blok sebelumnya; bar 0 (= bar
+    terakhir blok itu) diperlakukan sebagai bar entry-nya dengan harga entry open_price.
+
+    Bar SL/TP pertama dihitung serentak untuk semua calon bar entry (satu query _BlockTable,
+    dibatasi exit sinyal masing-masing), lalu rantai trade cukup dirunut lewat lookup,
+    jadi re-entry berulang di satu run sinyal panjang tetap O(n log n), bukan kuadratik.
+
+    Return (entries, exits, reasons, exit_prices):
+    - entries/exits : index bar entry & exit (exit = -1 jika posisi masih terbuka)
+    - reasons       : EXIT_SIGNAL / EXIT_SL / EXIT_TP (hanya untuk trade yang tertutup)
+    - exit_prices   : harga exit (NaN jika masih terbuka)
+    """
+    n = len(close)
+    entries, exits, reasons, exit_prices = [], [], [], []
+    if n < 2:
+        return entries, exits, reasons, exit_prices
+
+    # Sinyal bar i dieksekusi di bar i+1 (long-only: -1 / short = flat)
+    next_buy = _next_index(signal == 1)
+    next_flat = _next_index(signal <= 0)
+    continued = open_price == open_price
+
+    # Exit sinyal & bar SL/TP pertama untuk tiap calon bar entry e (Signal[e-1] == 1)
+    sig_exits = next_flat + 1 # sig_exits[e]: bar pertama j > e dengan Signal[j-1] <= 0
+    first_hits = np.full(n, n, dtype=np.int64)
+    if sl_pct > 0 or tp_pct > 0:
+        table = _BlockTable(close)
+        candidates = np.flatnonzero(signal[:-1] == 1) + 1
+        if continued:
+            candidates = candidates[candidates != 0]
+        last = np.minimum(sig_exits[candidates], n - 1)
+        first_hits[candidates] = _first_hit(table, candidates + 1, last + 1, close[candidates],
+                                            np.full(len(candidates), sl_pct), np.full(len(candidates), tp_pct))
+        if continued:
+            last_0 = min(int(sig_exits[0]), n - 1)
+            first_hits[0] = _first_hit(table, np.array([1]), np.array([last_0 + 1]), np.array([open_price]),
+                                       np.array([sl_pct]), np.array([tp_pct]))[0]
+
+    i = 1
+    while i < n:
+        if i == 1 and continued:
+            # Lanjutan posisi terbuka (hanya di awal: setelah exit, i >= 2)
+            entry, entry_price = 0, open_price
+        else:
+            # 1. ENTRY: bar pertama j >= i dengan Signal[j-1] == 1
+            k = next_buy[i - 1]
+            if k >= n - 1:
+                break
+            entry = k + 1
+            entry_price = close[entry]
+
+        # 2. EXIT SINYAL: bar pertama j > entry dengan Signal[j-1] <= 0
+        sig_exit = sig_exits[entry]
+        # 3. SL/TP: hit pertama di jendela (entry, min(sig_exit, n - 1)]
+        hit = first_hits[entry]
+
+        if hit < n and hit <= sig_exit:
+            exit_bar = int(hit)
+            pnl = (close[exit_bar] - entry_price) / entry_price
+            if sl_pct > 0 and pnl <= -sl_pct:
+                reasons.append(EXIT_SL)
+                exit_prices.append(entry_price * (1 - sl_pct))
+            else:
+                reasons.append(EXIT_TP)
+                exit_prices.append(entry_price * (1 + tp_pct))
+        elif sig_exit <= n - 1:
+            exit_bar = int(sig_exit)
+            reasons.append(EXIT_SIGNAL)
+            exit_prices.append(close[exit_bar])
+        else:
+            # Posisi masih terbuka sampai bar terakhir
+            entries.append(entry)
+            exits.append(-1)
+            reasons.append(EXIT_SIGNAL)
+            exit_prices.append(np.nan)
+            break
+
+        entries.append(entry)
+        exits.append(exit_bar)
+        # Bar exit tidak bisa langsung entry lagi (sama seperti loop lama)
+        i = exit_bar + 1
+
+    return entries, exits, reasons, exit_prices
+
+def simulate(close, signal, initial_capital=1000, sl_pct=0.0, tp_pct=0.0, open_price=np.nan):
+    """
+    Core eksekusi murni array (tanpa DataFrame): dipakai run_backtest, mode portfolio
+    & backtest per blok (engine.chunked: initial_capital = equity bar 0, open_price = posisi
+    terbuka dari blok sebelumnya, lihat _find_trades).
+
+    Return dict: equity (float64 per bar), entries, exits (-1 = masih terbuka),
+    reasons, entry_prices, exit_prices, trade_returns (hanya trade tertutup).
+    """
+    n = len(close)
+    entries, exits, reasons, exit_prices = _find_trades(close, signal, sl_pct, tp_pct, open_price)
+    entries = np.asarray(entries, dtype=np.int64)
+    exits = np.asarray(exits, dtype=np.int64)
+    exit_prices = np.asarray(exit_prices, dtype=np.float64)
+    closed = exits >= 0
+
+    # --- EQUITY CURVE ---
+    # Faktor per bar: 1 (cash/entry), return harian (hold), return trade (exit)
+    factors = np.ones(n, dtype=np.float64)
+    if n:
+        factors[0] = initial_capital
+
+    holding = np.zeros(n + 1, dtype=np.int64)
+    if len(entries):
+        hold_end = np.where(closed, exits, n)
+        np.add.at(holding, entries + 1, 1)
+        np.add.at(holding, hold_end, -1)
+    holding = np.cumsum(holding[:n]) > 0
+
+    if n > 1:
+        daily = 1 + (close[1:] - close[:-1]) / close[:-1]
+        factors[1:] = np.where(holding[1:], daily, 1.0)
+
+    entry_prices = close[entries]
+    if len(entries) and entries[0] == 0:
+        entry_prices[0] = open_price
+    trade_returns = (exit_prices[closed] - entry_prices[closed]) / entry_prices[closed]
+    factors[exits[closed]] = 1 + trade_returns
+
+    # cumprod berurutan -> identik dengan perkalian equity[-1] * faktor di loop
+    return {
+        'equity': np.multiply.accumulate(factors),
+        'entries': entries,
+        'exits': exits,
+        'reasons': reasons,
+        'entry_prices': entry_prices,
+        'exit_prices': exit_prices,
+        'trade_returns': trade_returns,
+    }
+
+def _run_backtest_vectorized(df, initial_capital, sl_pct, tp_pct):
+    # Ambil array kontigu sekali saja (frame input tidak di-copy)
+    close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64))
+    signal = np.ascontiguousarray(df['Signal'].to_numpy(dtype=np.float64))
+    sim = simulate(close, signal, initial_capital, sl_pct, tp_pct)
+
+    trades = TradeLog.from_arrays(df.index, close, sim['equity'], sim['entries'], sim['exits'],
+                                  sim['reasons'], sim['exit_prices'])
+    return BacktestResult(df, sim['equity'], trades, initial_capital)
+
+# --- BATCH SL/TP GRID ---
+# Semua posisi pasti flat saat sebuah "window sinyal" dimulai (trade sebelumnya
+# paling lambat keluar di exit sinyal window sebelumnya). Jadi window saling
+# independen: semua (window x pasangan SL/TP) disimulasikan serentak sebagai
+# array, iterasinya hanya sebanyak re-entry terbanyak di dalam satu window.
+
+class _BlockTable:
+    """
+    Agregat per blok sejajar 2^k (level 0 = data asli), total ~2n elemen.
+    Dipakai untuk query rentang [a, b) dalam O(log n) langkah NumPy.
+    """
+
+    def __init__(self, values, drawdown=False, high=None):
+        # high (opsional): maxs dibangun dari array lain, mis. mins = Low & maxs = High
+        self.mins = [values]
+        self.maxs = [values if high is None else high]
+        self.dds = [np.zeros(len(values))] if drawdown else None
+        while len(self.mins[-1]) > 1:
+            mn, mx = self.mins[-1], self.maxs[-1]
+            h = len(mn) // 2
+            self.mins.append(np.minimum(mn[0:2 * h:2], mn[1:2 * h:2]))
+            self.maxs.append(np.maximum(mx[0:2 * h:2], mx[1:2 * h:2]))
+            if drawdown:
+                dd = self.dds[-1]
+                # Drawdown gabungan: terburuk di kiri, di kanan, atau puncak kiri -> lembah kanan
+                self.dds.append(np.minimum(np.minimum(dd[0:2 * h:2], dd[1:2 * h:2]), mn[1:2 * h:2] - mx[0:2 * h:2]))
+        self.levels = len(self.mins)
+
+    def steps(self, max_len):
+        """
+        Urutan level untuk memecah [a, b) jadi blok kiri-ke-kanan: naik lalu turun.
+        Level dengan blok lebih panjang dari rentang terpanjang dilewati.
+        """
+        levels = min(self.levels, int(max_len).bit_length())
+        return [(k, True) for k in range(levels)] + [(k, False) for k in reversed(range(levels))]
+
+def _block_takes(p, b, asc, k, up):
+    """Blok level k yang dipakai query pada langkah ini (p harus sejajar 2^k)."""
+    fits = p + (1 << k) <= b
+    if not up:
+        return fits
+    odd = asc & (((p >> k) & 1) == 1)
+    asc &= ~(odd & ~fits)
+    return odd & fits
+
+def _block_hit(table, k, j, entry_price, sl, tp, side=None):
+    """
+    Apakah blok (k, j) berisi bar yang kena SL / TP (rumus pnl sama dengan run_backtest).
+    side (opsional, per query): -1 = short, pnl = -(harga - entry) / entry jadi SL dicek di max, TP di min.
+    """
+    low = (table.mins[k][j] - entry_price) / entry_price
+    high = (table.maxs[k][j] - entry_price) / entry_price
+    if side is None:
+        return ((sl > 0) & (low <= -sl)) | ((tp > 0) & (high >= tp))
+    long = side > 0
+    sl_hit = np.where(long, low <= -sl, -high <= -sl)
+    tp_hit = np.where(long, high >= tp, -low >= tp)
+    return ((sl > 0) & sl_hit) | ((tp > 0) & tp_hit)
+
+def _first_hit(table, start, end, entry_price, sl, tp, side=None):
+    """Index pertama di [start, end) yang kena SL/TP, atau `end` jika tidak ada."""
+    p = start.copy()
+    asc = np.ones(len(p), dtype=bool)
+    alive = np.ones(len(p), dtype=bool)
+    found_k = np.full(len(p), -1)
+    found_j = np.zeros(len(p), dtype=np.int64)
+    if not len(p):
+        return end
+
+    for k, up in table.steps((end - start).max()):
+        take = _block_takes(p, end, asc, k, up) & alive
+        if not take.any():
+            continue
+        idx = np.flatnonzero(take)
+        j = p[idx] >> k
+        hit = _block_hit(table, k, j, entry_price[idx], sl[idx], tp[idx], None if side is None else side[idx])
+        found_k[idx[hit]] = k
+        found_j[idx[hit]] = j[hit]
+        alive[idx[hit]] = False
+        p[idx[~hit]] += 1 << k
+
+    # Turun ke anak blok sampai level 0: kiri dulu, kalau bersih berarti di kanan
+    for k in reversed(range(table.levels - 1)):
+        idx = np.flatnonzero(found_k == k + 1)
+        if not len(idx):
+            continue
+        left = found_j[idx] * 2
+        left_hit = _block_hit(table, k, left, entry_price[idx], sl[idx], tp[idx], None if side is None else side[idx])
+        found_j[idx] = np.where(left_hit, left, left + 1)
+        found_k[idx] = k
+
+    return np.where(found_k == 0, found_j, end)
+
+def _range_path(table, start, end):
+    """(max, min, drawdown internal) dari path rentang [start, end) secara kiri-ke-kanan."""
+    p = start.copy()
+    asc = np.ones(len(p), dtype=bool)
+    mx = np.full(len(p), -np.inf)
+    mn = np.full(len(p), np.inf)
+    dd = np.zeros(len(p))
+    if not len(p):
+        return mx, mn, dd
+
+    for k, up in table.steps((end - start).max()):
+        take = _block_takes(p, end, asc, k, up)
+        if not take.any():
+            continue
+        idx = np.flatnonzero(take)
+        j = p[idx] >> k
+        dd[idx] = np.minimum(np.minimum(dd[idx], table.dds[k][j]), table.mins[k][j] - mx[idx])
+        mx[idx] = np.maximum(mx[idx], table.maxs[k][j])
+        mn[idx] = np.minimum(mn[idx], table.mins[k][j])
+        p[idx] += 1 << k
+
+    return mx, mn, dd
+
+def run_backtest_grid(df, sl_values, tp_values):
+    """
+    Evaluasi banyak pasangan SL/TP sekaligus untuk SATU frame sinyal.
+
+    Aturan eksekusi sama dengan run_backtest (entry/exit di bar berikutnya,
+    SL > TP > sinyal). Return dict berisi grid [len(sl_values), len(tp_values)]:
+    total_return_pct, max_drawdown_pct, win_rate, trades.
+
+    Trade (entry/exit/alasan) identik dengan run_backtest, jadi win_rate & trades
+    sama persis; return & drawdown dihitung di ruang log (selisih ~1e-9).
+    """
+    close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64))
+    signal = np.ascontiguousarray(df['Signal'].to_numpy(dtype=np.float64))
+    sl_values = np.asarray(sl_values, dtype=np.float64)
+    tp_values = np.asarray(tp_values, dtype=np.float64)
+    n = len(close)
+    shape = (len(sl_values), len(tp_values))
+
+    # 1. Window sinyal = trade versi tanpa SL/TP (dicari sekali)
+    w_entry, w_exit, _, _ = _find_trades(close, signal, 0.0, 0.0)
+    w_entry = np.asarray(w_entry, dtype=np.int64)
+    w_sig_exit = np.where(np.asarray(w_exit, dtype=np.int64) >= 0, w_exit, n + 1)
+    n_win = len(w_entry)
+
+    if n_win == 0:
+        zeros = np.zeros(shape)
+        return {'sl_values': sl_values, 'tp_values': tp_values, 'total_return_pct': zeros,
+                'max_drawdown_pct': zeros.copy(), 'win_rate': zeros.copy(), 'trades': zeros.astype(np.int64)}
+
+    next_buy = _next_index(signal == 1)
+    price_table = _BlockTable(close)
+    # Log equity kumulatif saat hold: sum log(1 + return harian)
+    log_growth = np.zeros(n)
+    if n > 1:
+        log_growth[1:] = np.cumsum(np.log(1 + (close[1:] - close[:-1]) / close[:-1]))
+    path_table = _BlockTable(log_growth, drawdown=True)
+
+    # 2. Query = (window, sl, tp) diratakan jadi satu dimensi
+    n_pairs = shape[0] * shape[1]
+    q_win = np.repeat(np.arange(n_win), n_pairs)
+    q_sl = np.tile(np.repeat(sl_values, shape[1]), n_win)
+    q_tp = np.tile(np.tile(tp_values, shape[0]), n_win)
+    n_q = len(q_win)
+
+    # State per query (level log equity relatif terhadap awal window)
+    level = np.zeros(n_q)
+    peak = np.zeros(n_q)
+    low = np.zeros(n_q)
+    dd = np.zeros(n_q)
+    trades = np.zeros(n_q, dtype=np.int64)
+    wins = np.zeros(n_q, dtype=np.int64)
+
+    active = np.arange(n_q)
+    entry = w_entry[q_win]
+
+    # Iterasi pertama: entry semua pasangan dalam satu window sama, jadi hit SL
+    # cukup dicari per (window, sl) dan hit TP per (window, tp), lalu digabung.
+    n_sl, n_tp = shape
+    w_last = np.minimum(w_sig_exit, n - 1)
+    sl_hit = _first_hit(price_table, np.repeat(w_entry + 1, n_sl), np.repeat(w_last + 1, n_sl),
+                        np.repeat(close[w_entry], n_sl), np.tile(sl_values, n_win), np.zeros(n_win * n_sl))
+    tp_hit = _first_hit(price_table, np.repeat(w_entry + 1, n_tp), np.repeat(w_last + 1, n_tp),
+                        np.repeat(close[w_entry], n_tp), np.zeros(n_win * n_tp), np.tile(tp_values, n_win))
+    hit = np.minimum(sl_hit.reshape(n_win, n_sl, 1), tp_hit.reshape(n_win, 1, n_tp)).reshape(-1)
+
+    while len(active):
+        e = entry[active]
+        sl, tp = q_sl[active], q_tp[active]
+        sig_exit = w_sig_exit[q_win[active]]
+        last = np.minimum(sig_exit, n - 1)
+        e_price = close[e]
+
+        # 3. Exit: SL/TP pertama di (entry, last], kalau tidak ada -> exit sinyal / masih terbuka
+        if hit is None:
+            hit = _first_hit(price_table, e + 1, last + 1, e_price, sl, tp)
+        by_risk = hit <= last
+        closed = by_risk | (sig_exit <= n - 1)
+        exit_bar = np.where(by_risk, hit, np.where(closed, sig_exit, n))
+
+        safe_exit = np.minimum(exit_bar, n - 1)
+        pnl_at_exit = (close[safe_exit] - e_price) / e_price
+        is_sl = by_risk & (sl > 0) & (pnl_at_exit <= -sl)
+        exit_price = np.where(is_sl, e_price * (1 - sl), np.where(by_risk, e_price * (1 + tp), close[safe_exit]))
+        trade_return = (exit_price - e_price) / e_price
+
+        # 4. Path equity saat hold (entry, exit)
+        h_max, h_min, h_dd = _range_path(path_table, e + 1, exit_bar)
+        base = level[active] - log_growth[e]
+        pk = np.maximum(peak[active], base + h_max)
+        d = np.minimum(np.minimum(dd[active], base + h_min - peak[active]), h_dd)
+        lo = np.minimum(low[active], base + h_min)
+        lv = base + log_growth[exit_bar - 1]
+
+        # Bar exit: equity dikali (1 + return trade)
+        lv = np.where(closed, lv + np.log(1 + trade_return), lv)
+        pk = np.maximum(pk, lv)
+        d = np.minimum(d, lv - pk)
+        lo = np.minimum(lo, lv)
+
+        level[active], peak[active], low[active], dd[active] = lv, pk, lo, d
+        trades[active] += closed
+        wins[active] += closed & (np.round(trade_return * 100, 2) > 0)
+
+        # 5. Re-entry di window yang sama jika sinyal masih 1 setelah exit
+        nb = next_buy[np.minimum(exit_bar, n - 1)]
+        again = closed & (nb < sig_exit - 1) & (nb < n - 1)
+        entry[active[again]] = nb[again] + 1
+        active = active[again]
+        hit = None
+
+    # 6. Gabungkan window berurutan: level awal window = jumlah gain window sebelumnya
+    level = level.reshape(n_win, n_pairs)
+    peak = peak.reshape(n_win, n_pairs)
+    low = low.reshape(n_win, n_pairs)
+    dd = dd.reshape(n_win, n_pairs)
+
+    start = np.vstack([np.zeros((1, n_pairs)), np.cumsum(level, axis=0)[:-1]])
+    prior_peak = np.vstack([np.zeros((1, n_pairs)), np.maximum.accumulate(start + peak, axis=0)[:-1]])
+    prior_peak = np.maximum(prior_peak, 0)
+    worst = np.minimum(dd, start + low - prior_peak).min(axis=0)
+
+    total_trades = trades.reshape(n_win, n_pairs).sum(axis=0)
+    total_wins = wins.reshape(n_win, n_pairs).sum(axis=0)
+    win_rate = np.where(total_trades > 0, total_wins / np.maximum(total_trades, 1) * 100, 0.0)
+
+    return {
+        'sl_values': sl_values,
+        'tp_values': tp_values,
+        'total_return_pct': ((np.exp(level.sum(axis=0)) - 1) * 100).reshape(shape),
+        'max_drawdown_pct': ((np.exp(worst) - 1) * 100).reshape(shape),
+        'win_rate': win_rate.reshape(shape),
+        'trades': total_trades.reshape(shape),
+    }
+
+# --- MODEL POSISI: LONG / SHORT, PYRAMIDING, FEE & SLIPPAGE ---
+# Modal dibagi rata ke `max_positions` slot. Slot j ikut masuk setelah sinyal searah
+# bertahan >= j * pyramid_bars + 1 bar, dan keluar saat sinyal berubah (SL/TP dihitung
+# per slot dari harga fill masing-masing). Tiap (slot, arah) mengikuti aturan yang sama
+# persis dengan _find_trades, dan tiap stream pasti flat saat run sinyal berikutnya
+# dimulai. Jadi semua run (slot x arah x run sinyal) disimulasikan serentak sebagai
+# array; iterasinya hanya sebanyak re-entry terbanyak (setelah SL/TP) di dalam satu run.
+
+def _eligible_runs(signal, side, min_run):
+    """Interval [start, end] (inklusif) dimana Signal == side sudah bertahan >= min_run bar."""
+    mask = np.concatenate([[False], signal == side, [False]])
+    edges = np.flatnonzero(mask[1:] != mask[:-1])
+    starts = edges[0::2] + min_run - 1
+    ends = edges[1::2] - 1
+    keep = starts <= ends
+    return starts[keep], ends[keep]
+
+def _intrabar_exits(ohlc, bars, side, entry_price, sl_pct, tp_pct, resolve):
     """
-    df = df.copy()
-    
-    position = 0 # 0: Cash, 1: Long
+    Klasifikasi exit SL/TP di bar yang High/Low-nya menyentuh level. Return (is_sl, exit_price).
+    - Open sudah melewati level (gap): level itu yang kena, fill di Open.
+    - SL & TP sama-sama tersentuh: urutan ditentukan resolve() (drill-down timeframe rendah),
+      tanpa resolve dianggap SL. Exit sinyal dieksekusi di Close, jadi sentuhan intrabar
+      di bar yang sama selalu lebih dulu (tidak perlu drill-down).
+    """
+    o, h, l = ohlc[0][bars], ohlc[1][bars], ohlc[2][bars]
+    # Rumus pnl sama dengan _block_hit (low = Low, high = High) supaya konsisten dengan pencarian bar
+    low = (l - entry_price) / entry_price
+    high = (h - entry_price) / entry_price
+    worst = np.where(side > 0, low, -high)
+    best = np.where(side > 0, high, -low)
+    at_open = side * (o - entry_price) / entry_price
+    sl_touch = (sl_pct > 0) & (worst <= -sl_pct)
+    tp_touch = (tp_pct > 0) & (best >= tp_pct)
+    gap_sl = sl_touch & (at_open <= -sl_pct)
+    gap_tp = tp_touch & (at_open >= tp_pct)
+
+    is_sl = sl_touch & ~gap_tp
+    sl_price = entry_price * (1 - side * sl_pct)
+    tp_price = entry_price * (1 + side * tp_pct)
+    ambiguous = np.flatnonzero(sl_touch & tp_touch & ~gap_sl & ~gap_tp)
+    if len(ambiguous) and resolve is not None:
+        is_sl[ambiguous] = resolve(bars[ambiguous], side[ambiguous], sl_price[ambiguous], tp_price[ambiguous])
+
+    exit_price = np.where(is_sl, np.where(gap_sl, o, sl_price), np.where(gap_tp, o, tp_price))
+    return is_sl, exit_price
+
+def _find_position_trades(close, signal, sl_pct, tp_pct, slippage_pct, allow_short, max_positions, pyramid_bars,
+                          ohlc=None, resolve=None):
+    """
+    Trade semua slot & arah sekaligus. Return structured array TRADE_DTYPE (urut entry)
+    dengan return kotor (sebelum fee); harga entry/exit sudah termasuk slippage.
+    ohlc = (open, high, low) untuk SL/TP intrabar, None = cek di Close saja.
+    """
+    n = len(close)
+    sides = (1, -1) if allow_short else (1,)
+    run_start, run_end, run_side, run_slot = [], [], [], []
+    for slot in range(max_positions):
+        for side in sides:
+            starts, ends = _eligible_runs(signal, side, slot * pyramid_bars + 1)
+            run_start.append(starts)
+            run_end.append(ends)
+            run_side.append(np.full(len(starts), side, dtype=np.int8))
+            run_slot.append(np.full(len(starts), slot, dtype=np.int16))
+    run_start = np.concatenate(run_start)
+    run_end = np.concatenate(run_end)
+    run_side = np.concatenate(run_side)
+    run_slot = np.concatenate(run_slot)
+    if n < 2 or not len(run_start):
+        return np.empty(0, dtype=TRADE_DTYPE)
+
+    use_risk = sl_pct > 0 or tp_pct > 0
+    table = None
+    if use_risk:
+        table = _BlockTable(close) if ohlc is None else _BlockTable(ohlc[2], high=ohlc[1])
+    rounds = []
+    # Bar sinyal entry pertama tiap run; re-entry hanya selama masih di dalam run
+    active = np.arange(len(run_start))
+    k = run_start.copy()
+
+    while len(active):
+        found = (k[active] <= run_end[active]) & (k[active] < n - 1)
+        active = active[found]
+        if not len(active):
+            break
+
+        # 1. ENTRY: bar setelah bar sinyal
+        side = run_side[active]
+        entry = k[active] + 1
+        entry_price = close[entry]
+        if slippage_pct:
+            entry_price = entry_price * (1 + side * slippage_pct)
+
+        # 2. EXIT SINYAL: bar setelah run sinyal selesai
+        sig_exit = run_end[active] + 2
+        last = np.minimum(sig_exit, n - 1)
+
+        # 3. SL/TP: hit pertama di (entry, last]
+        if use_risk:
+            hit = _first_hit(table, entry + 1, last + 1, entry_price, np.full(len(active), sl_pct),
+                             np.full(len(active), tp_pct), side)
+        else:
+            hit = last + 1
+        by_risk = hit <= last
+        closed = by_risk | (sig_exit <= n - 1)
+        exit_bar = np.where(by_risk, hit, np.where(closed, sig_exit, -1))
+
+        safe_exit = np.where(closed, exit_bar, n - 1)
+        if ohlc is None:
+            pnl_at_exit = side * (close[safe_exit] - entry_price) / entry_price
+            is_sl = by_risk & (sl_pct > 0) & (pnl_at_exit <= -sl_pct)
+            exit_price = np.where(is_sl, entry_price * (1 - side * sl_pct),
+                                  np.where(by_risk, entry_price * (1 + side * tp_pct), close[safe_exit]))
+        else:
+            is_sl = np.zeros(len(active), dtype=bool)
+            exit_price = close[safe_exit]
+            risk = np.flatnonzero(by_risk)
+            if len(risk):
+                is_sl[risk], exit_price[risk] = _intrabar_exits(ohlc, safe_exit[risk], side[risk], entry_price[risk],
+                                                                sl_pct, tp_pct, resolve)
+        if slippage_pct:
+            exit_price = exit_price * (1 - side * slippage_pct)
+        exit_price = np.where(closed, exit_price, np.nan)
+
+        records = np.empty(len(active), dtype=TRADE_DTYPE)
+        records['entry_bar'] = entry
+        records['exit_bar'] = exit_bar
+        records['entry_price'] = entry_price
+        records['exit_price'] = exit_price
+        records['reason'] = np.where(is_sl, EXIT_SL, np.where(by_risk, EXIT_TP, EXIT_SIGNAL))
+        records['return'] = side * (exit_price - entry_price) / entry_price
+        records['side'] = side
+        records['slot'] = run_slot[active]
+        rounds.append(records)
+
+        # 4. Re-entry setelah SL/TP (bar exit tidak bisa langsung entry lagi)
+        k[active] = exit_bar
+        active = active[by_risk]
+
+    records = np.concatenate(rounds) if rounds else np.empty(0, dtype=TRADE_DTYPE)
+    return records[np.lexsort((records['side'], records['slot'], records['entry_bar']))]
+
+def simulate_positions(close, signal, initial_capital=1000, sl_pct=0.0, tp_pct=0.0, fee_pct=0.0,
+                       slippage_pct=0.0, allow_short=False, max_positions=1, pyramid_bars=1,
+                       ohlc=None, resolve=None):
+    """
+    Core eksekusi long/short + pyramiding + fee/slippage (murni array).
+
+    Konvensi equity sama dengan simulate: bar hold dikali return harian (dibalik untuk short),
+    bar exit dikali (1 + return trade). Fee dipotong di bar entry & exit. Dengan opsi default
+    hasilnya identik dengan simulate.
+
+    ohlc = (open, high, low): SL/TP intrabar; resolve(bars, side, sl_price, tp_price) -> bool
+    (True = SL duluan) dipanggil hanya untuk bar yang menyentuh SL & TP sekaligus.
+
+    Return (equity, records TRADE_DTYPE dengan return bersih setelah fee).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal, dtype=np.float64)
+    if max_positions < 1 or pyramid_bars < 1:
+        raise ValueError("max_positions & pyramid_bars minimal 1")
+    n = len(close)
+    records = _find_position_trades(close, signal, sl_pct, tp_pct, slippage_pct, allow_short,
+                                    max_positions, pyramid_bars, ohlc, resolve)
+    gross = records['return'].copy()
+    if fee_pct:
+        records['return'] = (1 + gross) * (1 - fee_pct) ** 2 - 1
+
+    daily = (close[1:] - close[:-1]) / close[:-1] if n > 1 else np.zeros(0)
+    equity = None
+    for slot in range(max_positions):
+        mine = records['slot'] == slot
+        entries, exits = records['entry_bar'][mine], records['exit_bar'][mine]
+        side = records['side'][mine].astype(np.int64)
+        closed = exits >= 0
+
+        # Arah posisi per bar hold (entry, exit): +1 long, -1 short, 0 flat
+        holding = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(holding, entries + 1, side)
+        np.add.at(holding, np.where(closed, exits, n), -side)
+        holding = np.cumsum(holding[:n])
+
+        factors = np.ones(n, dtype=np.float64)
+        if n > 1:
+            factors[1:] = np.where(holding[1:] != 0, 1 + holding[1:] * daily, 1.0)
+        factors[exits[closed]] = 1 + gross[mine][closed]
+        if fee_pct:
+            factors[exits[closed]] *= 1 - fee_pct
+            # Exit & entry bisa jatuh di bar yang sama (flip long <-> short)
+            np.multiply.at(factors, entries, 1 - fee_pct)
+        if n:
+            factors[0] = initial_capital / max_positions
+
+        slot_equity = np.multiply.accumulate(factors)
+        equity = slot_equity if equity is None else equity + slot_equity
+    return equity, records
+
+def _run_backtest_positions(df, initial_capital, sl_pct, tp_pct, intrabar=False, drill_down=None, **execution):
+    close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64))
+    signal = np.ascontiguousarray(df['Signal'].to_numpy(dtype=np.float64))
+    ohlc, resolve = None, None
+    if intrabar:
+        ohlc = tuple(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)) for col in ('Open', 'High', 'Low'))
+        if drill_down is not None:
+            resolve = bar_resolver(drill_down, df.index)
+    equity, records = simulate_positions(close, signal, initial_capital, sl_pct, tp_pct, ohlc=ohlc, resolve=resolve,
+                                         **execution)
+    return BacktestResult(df, equity, TradeLog(records, df.index, equity), initial_capital)
+
+# --- CORE LOOP (REFERENSI) ---
+
+def _run_backtest_loop(df, initial_capital, sl_pct, tp_pct):
+    """Loop bar-per-bar versi awal. Lambat, tapi jadi acuan parity mode vectorized."""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    signal = df['Signal'].to_numpy(dtype=np.float64)
+
+    position = 0 # 0: Cash, 1: Long (referensi long-only)
     entry_price = 0
-    entry_date = None
-    
+
     equity = [initial_capital]
-    trade_log = [] 
-    
+    entries, exits, reasons, exit_prices = [], [], [], []
+
     for i in range(1, len(df)):
-        current_date = df.index[i]
-        current_price = df['Close'].iloc[i]
-        prev_signal = df['Signal'].iloc[i-1] 
-        
-        action_taken = False 
-        
+        current_price = close[i]
+        prev_signal = signal[i-1]
+
+        action_taken = False
+
         # 1. CEK EXIT (JUAL)
         if position == 1:
             pnl_pct = (current_price - entry_price) / entry_price
-            exit_reason = ""
+            exit_reason = EXIT_SIGNAL
             exit_price = current_price
-            
+
             # Cek Stop Loss
             if sl_pct > 0 and pnl_pct <= -sl_pct:
                 exit_price = entry_price * (1 - sl_pct)
-                exit_reason = "Stop Loss (SL)"
+                exit_reason = EXIT_SL
                 action_taken = True
-                
+
             # Cek Take Profit
             elif tp_pct > 0 and pnl_pct >= tp_pct:
                 exit_price = entry_price * (1 + tp_pct)
-                exit_reason = "Take Profit (TP)"
+                exit_reason = EXIT_TP
                 action_taken = True
-                
-            # Cek Sinyal Jual Strategi
-            elif prev_signal == 0:
+
+            # Cek Sinyal Jual Strategi (-1 = flat di mode long-only)
+            elif prev_signal <= 0:
                 exit_price = current_price
-                exit_reason = "Signal Sell (Strategy)"
                 action_taken = True
-            
+
             # EKSEKUSI JUAL
             if action_taken:
                 position = 0
                 actual_return = (exit_price - entry_price) / entry_price
-                current_equity = equity[-1] * (1 + actual_return)
-                equity.append(current_equity)
-                
-                trade_log.append({
-                    'Tanggal': current_date,
-                    'Tipe': 'SELL',
-                    'Harga': exit_price,
-                    'Alasan': exit_reason,
-                    'Profit/Loss %': round(actual_return * 100, 2),
-                    'Saldo Akhir': round(current_equity, 2)
-                })
-                continue 
+                equity.append(equity[-1] * (1 + actual_return))
+                exits.append(i)
+                reasons.append(exit_reason)
+                exit_prices.append(exit_price)
+                continue
 
         # 2. CEK ENTRY (BELI)
         if position == 0 and prev_signal == 1:
             position = 1
             entry_price = current_price
-            entry_date = current_date
-            equity.append(equity[-1]) 
-            
-            trade_log.append({
-                'Tanggal': current_date,
-                'Tipe': 'BUY',
-                'Harga': entry_price,
-                'Alasan': 'Signal Buy (Strategy)',
-                'Profit/Loss %': 0.0,
-                'Saldo Akhir': round(equity[-1], 2)
-            })
+            equity.append(equity[-1])
+            entries.append(i)
             action_taken = True
 
         # 3. HOLD
         if not action_taken:
             if position == 1:
-                daily_change = (current_price - df['Close'].iloc[i-1]) / df['Close'].iloc[i-1]
+                daily_change = (current_price - close[i-1]) / close[i-1]
                 equity.append(equity[-1] * (1 + daily_change))
             else:
                 equity.append(equity[-1])
 
+    # Posisi yang masih terbuka di bar terakhir
+    if position == 1:
+        exits.append(-1)
+        reasons.append(EXIT_SIGNAL)
+        exit_prices.append(np.nan)
+
     # Rapikan Data
     if len(equity) > len(df): equity = equity[1:]
-    df['Equity_Curve'] = equity
-    
-    running_max = df['Equity_Curve'].cummax()
-    df['Drawdown'] = (df['Equity_Curve'] - running_max) / running_max
-    
-    total_return = (df['Equity_Curve'].iloc[-1] / initial_capital) - 1
-    max_drawdown = df['Drawdown'].min()
-    
-    # --- HITUNG WIN RATE (BARU) ---
-    # Kita hanya menghitung transaksi SELL (yang sudah realisasi untung/rugi)
-    # Transaksi BUY belum dihitung karena belum selesai
-    closed_trades = [t for t in trade_log if t['Tipe'] == 'SELL']
-    total_trades = len(closed_trades)
-    winning_trades = len([t for t in closed_trades if t['Profit/Loss %'] > 0])
-    
-    if total_trades > 0:
-        win_rate = (winning_trades / total_trades) * 100
-    else:
-        win_rate = 0.0
-    
-    return {
-        "total_return_pct": total_return * 100,
-        "max_drawdown_pct": max_drawdown * 100,
-        "win_rate": win_rate, # <--- Dikirim ke app.py
-        "equity_curve": df['Equity_Curve'],
-        "dataframe": df,
-        "trade_log": pd.DataFrame(trade_log)
-    }
\ No newline at end of file
+    equity = np.asarray(equity, dtype=np.float64)
+
+    trades = TradeLog.from_arrays(df.index, close, equity, entries, exits, reasons, exit_prices)
+    return BacktestResult(df, equity, trades, initial_capital)
@@ -0,0 +1,204 @@
+import itertools
+import json
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from engine.backtester import run_backtest
+from engine.data_loader import get_binance_data, timeframe_to_ms
+from engine import registry
+
+# --- JOB SPEC ---
+# Contoh (JSON):
+# {
+#   "symbols": ["BTC/USDT", "ETH/USDT"],
+#   "timeframes": ["1h", "4h"],
+#   "strategies": ["supertrend", {"name": "simple_ma", "params": {"fast": 20, "slow": 100}}],
+#   "ranges": [["2023-01-01", "2023-12-31"], ["2024-01-01", null]],   (atau "start" / "end")
+#   "sl_pct": [0.0, 0.02], "tp_pct": 0.05, "initial_capital": 1000,
+#   "fee_pct": 0.001, "allow_short": true, "max_positions": 2       (opsional, lihat run_backtest)
+# }
+# Tiap field list di-expand jadi kombinasi (product) job; opsi eksekusi berlaku untuk semua job.
+
+EXECUTION_KEYS = ('fee_pct', 'slippage_pct', 'allow_short', 'max_positions', 'pyramid_bars')
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+def expand_jobs(spec):
+    """Expand job spec jadi list job (dict) satu per kombinasi symbol x timeframe x strategi x range x SL x TP."""
+    strategies = []
+    for item in _as_list(spec['strategies']):
+        if isinstance(item, str):
+            item = {'name': item}
+        strategy = registry.get(item['name'])
+        params = item.get('params', {})
+        try:
+            warmup = strategy.warmup(**params)
+        except ValueError:
+            warmup = 0 # Parameter salah: job-nya gagal sendiri saat dijalankan (baris error)
+        strategies.append({'name': strategy.key, 'params': params, 'warmup': warmup})
+
+    ranges = spec.get('ranges') or [[spec.get('start', '2024-01-01'), spec.get('end')]]
+
+    jobs = []
+    combos = itertools.product(_as_list(spec['symbols']), _as_list(spec.get('timeframes', '1h')), strategies,
+                               ranges, _as_list(spec.get('sl_pct', 0.0)), _as_list(spec.get('tp_pct', 0.0)))
+    for i, (symbol, timeframe, strategy, (start, end), sl_pct, tp_pct) in enumerate(combos):
+        jobs.append({
+            'job_id': f"{i:04d}_{symbol.replace('/', '')}_{timeframe}_{strategy['name']}",
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'strategy': strategy['name'],
+            'params': strategy['params'],
+            'warmup': strategy['warmup'],
+            'start': start,
+            'end': end,
+            'sl_pct': sl_pct,
+            'tp_pct': tp_pct,
+            'initial_capital': spec.get('initial_capital', 1000),
+            **{key: spec[key] for key in EXECUTION_KEYS if key in spec},
+        })
+    return jobs
+
+def load_spec(path):
+    with open(path) as f:
+        return json.load(f)
+
+# --- EKSEKUSI ---
+
+def _slice(df, start, end, warmup=0):
+    """
+    Potong sesuai range job; `end` inklusif sampai akhir hari (sama dengan app.py).
+    `warmup` bar sebelum `start` ikut disertakan untuk memanaskan indikator
+    (None = strategi tanpa warm-up terbatas: mulai tepat di `start`, sama seperti dashboard).
+    """
+    lo = max(int(df.index.searchsorted(pd.to_datetime(start))) - (warmup or 0), 0)
+    hi = int(df.index.searchsorted(pd.to_datetime(end) + pd.Timedelta(days=1), side='right')) if end else len(df)
+    return df.iloc[lo:hi]
+
+def _run_job(job, df):
+    """
+    Satu job di worker: apply_strategy (termasuk bar warm-up) lalu run_backtest
+    hanya di range job. Return (metrik, trade_log, equity_curve).
+    """
+    started = time.perf_counter()
+    df_s = registry.get(job['strategy']).apply(df, **job['params'])
+    df_s = df_s.loc[df_s.index >= pd.to_datetime(job['start'])]
+    strategy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    res = run_backtest(df_s, initial_capital=job['initial_capital'], sl_pct=job['sl_pct'], tp_pct=job['tp_pct'],
+                       **{key: job[key] for key in EXECUTION_KEYS if key in job})
+    backtest_s = time.perf_counter() - started
+
+    log = res['trade_log']
+    metrics = {
+        **{k: v for k, v in job.items() if k != 'params'},
+        'params': json.dumps(job['params'], sort_keys=True),
+        'bars': len(df_s),
+        'total_return_pct': res['total_return_pct'],
+        'max_drawdown_pct': res['max_drawdown_pct'],
+        'win_rate': res['win_rate'],
+        'trades': len(res.trades.closed),
+        'strategy_s': strategy_s,
+        'backtest_s': backtest_s,
+    }
+    return metrics, log, res['equity_curve']
+
+def _failed_job(job, error):
+    """Hasil job yang gagal: baris metrik dengan kolom 'error', tanpa trade & equity."""
+    return ({**job, 'params': json.dumps(job['params'], sort_keys=True), 'bars': 0, 'error': error},
+            pd.DataFrame(), pd.Series(dtype=float))
+
+def run_batch(spec, max_workers=None, progress=None, loader=get_binance_data, **loader_kwargs):
+    """
+    Jalankan semua job dari spec. Data tiap (symbol, timeframe) diambil sekali di proses
+    utama (lewat cache candle), mulai dari range paling awal dikurangi warm-up strategi
+    yang paling panjang, lalu job dibagi ke worker pool.
+    `progress(done, total, text)` opsional; return (metrics DataFrame, {job_id: trade_log}, {job_id: equity}).
+    Job yang gagal (data tidak bisa diambil, parameter salah, error strategi) tidak menghentikan
+    batch: job lain tetap jalan, job itu jadi baris dengan kolom 'error' terisi.
+    """
+    jobs = expand_jobs(spec)
+    total = len(jobs)
+    frames, errors = {}, {}
+    for symbol, timeframe in dict.fromkeys((j['symbol'], j['timeframe']) for j in jobs):
+        # Mulai dari range paling awal yang dibutuhkan job untuk pasangan ini, plus warm-up-nya
+        tf = pd.Timedelta(milliseconds=timeframe_to_ms(timeframe))
+        start = min(registry.warmup_start(j['start'], tf, j['warmup'])
+                    for j in jobs if (j['symbol'], j['timeframe']) == (symbol, timeframe))
+        if progress:
+            progress(0, total, f"Mengambil data {symbol} {timeframe}...")
+        try:
+            frames[(symbol, timeframe)] = loader(symbol, timeframe, str(start), **loader_kwargs)
+        except Exception as e:
+            # Gagal ambil satu pasangan tidak menghentikan batch: job-nya dicatat error
+            frames[(symbol, timeframe)] = pd.DataFrame()
+            errors[(symbol, timeframe)] = f"gagal ambil data: {type(e).__name__}: {e}"
+
+    metrics, logs, equities = [], {}, {}
+    max_workers = max_workers or os.cpu_count() or 1
+
+    def collect(result):
+        row, log, equity = result
+        metrics.append(row)
+        logs[row['job_id']] = log
+        equities[row['job_id']] = equity
+        if progress:
+            progress(len(metrics), total, f"Selesai {row['job_id']}")
+
+    runnable = []
+    for job in jobs:
+        df = frames[(job['symbol'], job['timeframe'])]
+        df = _slice(df, job['start'], job['end'], job['warmup']) if not df.empty else df
+        # Kosong = tidak ada bar di range job (bar warm-up saja tidak cukup)
+        if df.empty or df.index[-1] < pd.to_datetime(job['start']):
+            collect(_failed_job(job, errors.get((job['symbol'], job['timeframe']), 'data kosong')))
+        else:
+            runnable.append((job, df))
+
+    if max_workers > 1 and len(runnable) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_run_job, job, df): job for job, df in runnable}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = _failed_job(futures[future], f"{type(e).__name__}: {e}")
+                collect(result)
+    else:
+        for job, df in runnable:
+            try:
+                result = _run_job(job, df)
+            except Exception as e:
+                result = _failed_job(job, f"{type(e).__name__}: {e}")
+            collect(result)
+
+    table = pd.DataFrame(metrics).sort_values('job_id').reset_index(drop=True)
+    return table, logs, equities
+
+def write_results(out_dir, metrics, logs, equities, fmt='csv'):
+    """
+    Simpan hasil: metrics.<fmt> (satu baris per job), trades/<job_id>.<fmt>,
+    equity/<job_id>.<fmt>. fmt = 'csv' atau 'parquet' (parquet butuh pyarrow / fastparquet).
+    """
+    if fmt not in ('csv', 'parquet'):
+        raise ValueError(f"Format output tidak dikenal: {fmt}")
+
+    def save(df, path):
+        if fmt == 'parquet':
+            df.to_parquet(path)
+        else:
+            df.to_csv(path)
+
+    os.makedirs(os.path.join(out_dir, 'trades'), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, 'equity'), exist_ok=True)
+    save(metrics.set_index('job_id'), os.path.join(out_dir, f"metrics.{fmt}"))
+    for job_id, log in logs.items():
+        if len(log):
+            save(log, os.path.join(out_dir, 'trades', f"{job_id}.{fmt}"))
+    for job_id, equity in equities.items():
+        if len(equity):
+            save(equity.rename('Equity').to_frame(), os.path.join(out_dir, 'equity', f"{job_id}.{fmt}"))
+    return out_dir
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "crypto-backtester", "ohlcv")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3 # 2 GB
+DEFAULT_MAX_ENTRIES = 200
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class CandleStore:
+    """
+    Penyimpanan candle OHLCV lokal di disk, per (exchange, symbol, timeframe).
+
+    Layout per key (satu folder):
+    - timestamps.npy : int64 (ms), terurut naik & unik
+    - ohlcv.npy      : float64 [n, 5] (Open, High, Low, Close, Volume)
+    - meta.json      : rentang yang sudah ter-cover + waktu akses & update terakhir
+
+    Array dibaca dengan memory-map, jadi membuka histori panjang tidak
+    langsung memakan RAM. Eviction LRU berdasarkan total ukuran & jumlah key.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.root = root or os.getenv("BACKTESTER_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(self.root, exist_ok=True)
+
+    # --- PATH & META ---
+
+    def _key_dir(self, exchange_id, symbol, timeframe):
+        safe_symbol = symbol.replace('/', '-').replace(':', '_')
+        return os.path.join(self.root, f"{exchange_id}__{safe_symbol}__{timeframe}")
+
+    def _read_meta(self, path):
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path, meta):
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    def coverage(self, exchange_id, symbol, timeframe):
+        """Rentang (covered_from, covered_to) dalam ms yang sudah pernah diambil, atau None."""
+        meta = self._read_meta(self._key_dir(exchange_id, symbol, timeframe))
+        if not meta:
+            return None
+        return meta['covered_from'], meta['covered_to']
+
+    def updated_at(self, exchange_id, symbol, timeframe):
+        """Waktu (epoch detik) terakhir key ini ditulis merge(), atau None."""
+        meta = self._read_meta(self._key_dir(exchange_id, symbol, timeframe))
+        return meta.get('updated_at') if meta else None
+
+    # --- BACA / TULIS ---
+
+    def load(self, exchange_id, symbol, timeframe):
+        """Return (timestamps, ohlcv) versi memory-map, atau None jika belum ada."""
+        path = self._key_dir(exchange_id, symbol, timeframe)
+        meta = self._read_meta(path)
+        if not meta:
+            return None
+        try:
+            ts = np.load(os.path.join(path, "timestamps.npy"), mmap_mode='r')
+            ohlcv = np.load(os.path.join(path, "ohlcv.npy"), mmap_mode='r')
+        except (OSError, ValueError):
+            # File rusak / setengah tertulis -> anggap cache kosong
+            self.delete(exchange_id, symbol, timeframe)
+            return None
+
+        meta['last_access'] = time.time()
+        self._write_meta(path, meta)
+        return ts, ohlcv
+
+    def merge(self, exchange_id, symbol, timeframe, candles, covered_from, covered_to):
+        """
+        Gabungkan candle baru (list [ts, o, h, l, c, v]) ke store.
+        Candle dengan timestamp sama ditimpa versi terbaru (candle berjalan ikut ter-update).
+        """
+        path = self._key_dir(exchange_id, symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+
+        new = np.asarray(candles, dtype=np.float64).reshape(-1, 6)
+        new_ts = new[:, 0].astype(np.int64)
+        new_ohlcv = new[:, 1:]
+
+        old = self.load(exchange_id, symbol, timeframe)
+        meta = self._read_meta(path)
+        if old is not None:
+            # Urutan: data baru dulu, supaya np.unique ambil versi terbaru
+            all_ts = np.concatenate([new_ts, np.asarray(old[0])])
+            all_ohlcv = np.concatenate([new_ohlcv, np.asarray(old[1])])
+            covered_from = min(covered_from, meta['covered_from'])
+            covered_to = max(covered_to, meta['covered_to'])
+        else:
+            all_ts, all_ohlcv = new_ts, new_ohlcv
+
+        ts, first = np.unique(all_ts, return_index=True)
+        ohlcv = np.ascontiguousarray(all_ohlcv[first])
+
+        self._atomic_save(path, "timestamps.npy", ts)
+        self._atomic_save(path, "ohlcv.npy", ohlcv)
+        self._write_meta(path, {
+            'exchange': exchange_id,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'covered_from': int(covered_from),
+            'covered_to': int(covered_to),
+            'rows': int(len(ts)),
+            'last_access': time.time(),
+            'updated_at': time.time(),
+        })
+        self.evict(keep=path)
+        return ts, ohlcv
+
+    def _atomic_save(self, path, name, arr):
+        tmp = os.path.join(path, name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, os.path.join(path, name))
+
+    def delete(self, exchange_id, symbol, timeframe):
+        shutil.rmtree(self._key_dir(exchange_id, symbol, timeframe), ignore_errors=True)
+
+    # --- EVICTION ---
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            meta = self._read_meta(path) or {}
+            size = sum(
+                os.path.getsize(os.path.join(path, f))
+                for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))
+            )
+            entries.append((meta.get('last_access', 0), size, path))
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        """Hapus key yang paling lama tidak diakses sampai batas ukuran & jumlah terpenuhi."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            count -= 1
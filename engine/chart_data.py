@@ -0,0 +1,189 @@
+import numpy as np
+from engine.results import exit_reason_names
+
+DEFAULT_POINTS = 2000 # Titik garis yang dikirim ke browser per chart
+DEFAULT_CANDLES = 500 # Candle yang dikirim ke browser per chart
+DEFAULT_MARKERS = 1000 # Di atas ini marker disembunyikan (zoom dulu)
+PYRAMID_FACTOR = 4 # Rasio jumlah titik antar level pyramid
+
+# --- DOWNSAMPLING ---
+
+def minmax_indices(y, n_out):
+    """
+    Index titik min & max per bucket (n_out/2 bucket sama besar), terurut.
+    Full vektor; spike tidak pernah hilang karena ekstrem tiap bucket selalu ikut.
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = max(n_out // 2, 1)
+    size = -(-n // n_buckets)
+    padded = np.empty(n_buckets * size, dtype=np.float64)
+    padded[:n] = y
+    padded[n:] = y[-1] # Bucket terakhir di-pad dengan nilai terakhir
+    blocks = padded.reshape(n_buckets, size)
+    offset = np.arange(n_buckets) * size
+    idx = np.concatenate([blocks.argmin(axis=1) + offset, blocks.argmax(axis=1) + offset, [0, n - 1]])
+    return np.unique(np.minimum(idx, n - 1))
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: pilih satu titik per bucket yang membentuk segitiga
+    terbesar dengan titik terpilih sebelumnya & rata-rata bucket berikutnya.
+    Titik pertama & terakhir selalu ikut. Loop hanya per bucket (bukan per bar).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    x = x - x[0] # Timestamp ns ~1e18: geser ke 0 supaya luas segitiga tetap presisi
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64) # n_out-2 bucket di [1, n-1)
+    # Rata-rata tiap bucket lewat cumsum; "bucket berikutnya" dari bucket terakhir = titik terakhir
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    counts = np.diff(edges)
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])[1:]
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])[1:]
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+def ohlc_buckets(x, o, h, l, c, size):
+    """Gabung tiap `size` candle berurutan jadi satu (open pertama, high max, low min, close terakhir)."""
+    starts = np.arange(0, len(o), size)
+    ends = np.append(starts[1:], len(o))
+    return (x[starts], o[starts], np.maximum.reduceat(h, starts), np.minimum.reduceat(l, starts), c[ends - 1])
+
+def _to_ns(x):
+    x = np.asarray(x)
+    return x.astype('datetime64[ns]').view(np.int64) if x.dtype.kind == 'M' else x
+
+def _window(x_ns, x0, x1):
+    """Range posisi [lo, hi) untuk x0 <= x <= x1 (None = tanpa batas)."""
+    lo = 0 if x0 is None else int(np.searchsorted(x_ns, _to_ns(np.datetime64(x0, 'ns')), side='left'))
+    hi = len(x_ns) if x1 is None else int(np.searchsorted(x_ns, _to_ns(np.datetime64(x1, 'ns')), side='right'))
+    return lo, hi
+
+# --- PYRAMID LEVEL-OF-DETAIL ---
+
+class LODSeries:
+    """
+    Pyramid garis: level 0 = data asli (referensi, tanpa copy), level berikutnya
+    PYRAMID_FACTOR kali lebih jarang lewat min/max (envelope tetap terjaga).
+    view() memilih level paling detail yang masih murah untuk rentang zoom,
+    lalu LTTB ke jumlah titik target.
+    """
+
+    def __init__(self, x, y, factor=PYRAMID_FACTOR, min_points=DEFAULT_POINTS):
+        x = np.asarray(x)
+        y = np.asarray(y, dtype=np.float64)
+        self.levels = [(x, _to_ns(x), y)]
+        while len(y) > min_points * factor:
+            idx = minmax_indices(y, len(y) // factor)
+            x, y = x[idx], y[idx]
+            self.levels.append((x, _to_ns(x), y))
+
+    def view(self, x0=None, x1=None, n_points=DEFAULT_POINTS):
+        """(x, y) di rentang [x0, x1] dengan maksimal n_points titik."""
+        for x, x_ns, y in self.levels:
+            lo, hi = _window(x_ns, x0, x1)
+            if hi - lo <= n_points * PYRAMID_FACTOR:
+                break
+        idx = lo + lttb_indices(x_ns[lo:hi], y[lo:hi], n_points)
+        return x[idx], y[idx]
+
+class LODCandles:
+    """Pyramid OHLC: tiap level menggabungkan PYRAMID_FACTOR candle level sebelumnya."""
+
+    def __init__(self, x, o, h, l, c, factor=PYRAMID_FACTOR, min_candles=DEFAULT_CANDLES):
+        level = tuple(np.asarray(a) for a in (x, o, h, l, c))
+        self.levels = [(_to_ns(level[0]), level)]
+        while len(level[1]) > min_candles:
+            level = ohlc_buckets(*level, factor)
+            self.levels.append((_to_ns(level[0]), level))
+
+    def view(self, x0=None, x1=None, n_candles=DEFAULT_CANDLES):
+        """(x, open, high, low, close) di rentang [x0, x1]; level terhalus dengan <= n_candles candle."""
+        for x_ns, level in self.levels:
+            lo, hi = _window(x_ns, x0, x1)
+            if hi - lo <= n_candles:
+                break
+        return tuple(a[lo:hi] for a in level)
+
+# --- MARKER ---
+
+def signal_markers(index, close, signal):
+    """Bar saat sinyal berubah: (x, harga, arah) dengan arah 1 = mulai long, -1 = mulai short, 0 = kembali flat."""
+    signal = np.nan_to_num(np.asarray(signal, dtype=np.float64))
+    prev = np.concatenate([[0.0], signal[:-1]])
+    edges = np.flatnonzero(signal != prev)
+    return np.asarray(index)[edges], np.asarray(close)[edges], signal[edges].astype(np.int8)
+
+def trade_markers(trades):
+    """
+    Marker entry & exit dari TradeLog: dict 'entry' / 'exit' berisi x, harga, teks hover, arah
+    (1 = long, -1 = short). Marker diurutkan per waktu supaya bisa dipotong per rentang zoom.
+    """
+    records = trades.records
+    index = np.asarray(trades.index)
+    closed = records[records['exit_bar'] >= 0]
+    closed = closed[np.argsort(closed['exit_bar'], kind='stable')]
+    return {
+        'entry': (index[records['entry_bar']], records['entry_price'],
+                  np.where(records['side'] > 0, 'BUY', 'SHORT').astype(object), records['side']),
+        'exit': (index[closed['exit_bar']], closed['exit_price'],
+                 exit_reason_names(closed['reason'], closed['side'])
+                 + np.char.mod(' (%.2f%%)', closed['return'] * 100).astype(object), closed['side']),
+    }
+
+def _clip_markers(markers, x0, x1, limit):
+    x = markers[0]
+    lo, hi = _window(_to_ns(x), x0, x1)
+    if hi - lo > limit:
+        return None # Terlalu padat, tampilkan setelah zoom
+    return tuple(a[lo:hi] for a in markers)
+
+# --- CHART DATA PER HASIL BACKTEST ---
+
+class ChartData:
+    """
+    Semua data chart satu hasil backtest, dihitung sekali setelah backtest selesai:
+    pyramid equity, pyramid candle (jika frame OHLC tersedia), marker sinyal & trade.
+    view(x0, x1) murah: hanya slice level yang pas + LTTB, jadi aman dipanggil tiap rerun/zoom.
+    """
+
+    def __init__(self, result, frame=None):
+        frame = result.frame if frame is None else frame
+        self.start, self.end = result.index[0], result.index[-1]
+        self.equity = LODSeries(result.index.to_numpy(), result.equity)
+        self.candles = None
+        self.signals = None
+        if frame is not None and {'Open', 'High', 'Low', 'Close'} <= set(frame.columns):
+            x = frame.index.to_numpy()
+            self.candles = LODCandles(x, *(frame[col].to_numpy(dtype=np.float64) for col in ('Open', 'High', 'Low', 'Close')))
+            if 'Signal' in frame.columns:
+                self.signals = signal_markers(x, frame['Close'].to_numpy(), frame['Signal'].to_numpy())
+        self.trades = trade_markers(result.trades)
+
+    def view(self, x0=None, x1=None, n_points=DEFAULT_POINTS, n_candles=DEFAULT_CANDLES, max_markers=DEFAULT_MARKERS):
+        """
+        Data siap plot untuk rentang [x0, x1]. Marker = None jika jumlahnya di rentang
+        itu melebihi max_markers.
+        """
+        view = {
+            'equity': self.equity.view(x0, x1, n_points),
+            'candles': self.candles.view(x0, x1, n_candles) if self.candles else None,
+            'signals': _clip_markers(self.signals, x0, x1, max_markers) if self.signals else None,
+            'entries': _clip_markers(self.trades['entry'], x0, x1, max_markers),
+            'exits': _clip_markers(self.trades['exit'], x0, x1, max_markers),
+        }
+        return view
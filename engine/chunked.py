@@ -0,0 +1,131 @@
+import numpy as np
+from engine.backtester import simulate
+from engine.candle_store import OHLCV_COLUMNS
+from engine.results import BacktestResult, TradeLog, TRADE_DTYPE, EXIT_SIGNAL
+from indicators.scratch import Scratch
+
+# Backtest out-of-core: histori candle (engine.dataset) dialirkan per blok melalui strategi
+# dan backtest. State indikator ada di StrategyStream (compute() melanjutkan), state posisi
+# & equity di ChunkedBacktest, jadi RAM sebanding ukuran blok, bukan panjang histori.
+
+DEFAULT_BLOCK = 250_000 # Bar per blok
+
+# --- BACKTEST PER BLOK ---
+
+class ChunkedBacktest:
+    """
+    Backtest long-only satu posisi (model default run_backtest: SL/TP dicek di Close)
+    yang diumpan blok demi blok lewat feed(). State yang dibawa antar blok: Close & Signal
+    bar terakhir, posisi terbuka (bar & harga entry), equity dan puncak equity.
+    Hasilnya identik dengan run_backtest atas seluruh data sekaligus.
+    """
+
+    def __init__(self, initial_capital=1000, sl_pct=0.0, tp_pct=0.0):
+        self.initial_capital = initial_capital
+        self.sl_pct = sl_pct
+        self.tp_pct = tp_pct
+        self.bars = 0 # Bar yang sudah diproses
+        self.max_drawdown = 0.0
+        self._last = None # (close, signal) bar terakhir blok sebelumnya
+        self._equity = initial_capital
+        self._peak = -np.inf
+        self._open = None # (entry_bar global, entry_price) posisi yang masih terbuka
+        self._records = [] # Record trade tertutup per blok
+
+    def feed(self, close, signal):
+        """Proses satu blok bar berikutnya; return (equity, drawdown) untuk bar blok ini."""
+        close = np.asarray(close, dtype=np.float64)
+        signal = np.asarray(signal, dtype=np.float64)
+        if len(close) == 0:
+            return np.zeros(0), np.zeros(0)
+
+        # Bar terakhir blok sebelumnya ikut di depan: eksekusi sinyalnya & return harian bar pertama
+        lead = 0 if self._last is None else 1
+        if lead:
+            close = np.concatenate([[self._last[0]], close])
+            signal = np.concatenate([[self._last[1]], signal])
+        open_price = np.nan if self._open is None else self._open[1]
+        sim = simulate(close, signal, self._equity, self.sl_pct, self.tp_pct, open_price=open_price)
+
+        # Trade: index lokal -> global; lanjutan posisi terbuka memakai bar entry aslinya
+        offset = self.bars - lead
+        entries = sim['entries'] + offset
+        if self._open is not None and len(entries) and sim['entries'][0] == 0:
+            entries[0] = self._open[0]
+        exits = sim['exits']
+        closed = exits >= 0
+        records = np.empty(int(closed.sum()), dtype=TRADE_DTYPE)
+        records['entry_bar'] = entries[closed]
+        records['exit_bar'] = exits[closed] + offset
+        records['entry_price'] = sim['entry_prices'][closed]
+        records['exit_price'] = sim['exit_prices'][closed]
+        records['reason'] = np.asarray(sim['reasons'], dtype=np.int8)[closed]
+        records['return'] = (records['exit_price'] - records['entry_price']) / records['entry_price']
+        records['side'] = 1
+        records['slot'] = 0
+        self._records.append(records)
+        self._open = (int(entries[-1]), float(sim['entry_prices'][-1])) if len(exits) and exits[-1] < 0 else None
+
+        equity = sim['equity'][lead:]
+        running_max = np.maximum.accumulate(np.concatenate([[self._peak], equity]))[1:]
+        drawdown = (equity - running_max) / running_max
+
+        self.bars += len(equity)
+        self.max_drawdown = min(self.max_drawdown, drawdown.min())
+        self._last = (close[-1], signal[-1])
+        self._equity = equity[-1]
+        self._peak = running_max[-1]
+        return equity, drawdown
+
+    def trades(self):
+        """Semua record trade (TRADE_DTYPE); posisi yang masih terbuka di akhir: exit_bar = -1."""
+        records = self._records
+        if self._open is not None:
+            still_open = np.zeros(1, dtype=TRADE_DTYPE)
+            still_open['entry_bar'], still_open['exit_bar'] = self._open[0], -1
+            still_open['entry_price'] = self._open[1]
+            still_open['exit_price'] = still_open['return'] = np.nan
+            still_open['reason'], still_open['side'] = EXIT_SIGNAL, 1
+            records = records + [still_open]
+        return np.concatenate(records) if records else np.zeros(0, dtype=TRADE_DTYPE)
+
+# --- PIPELINE DI ATAS DATASET ---
+
+def run_chunked(spec, dataset, params=None, initial_capital=1000, sl_pct=0.0, tp_pct=0.0,
+                block=DEFAULT_BLOCK, prefix=''):
+    """
+    Jalankan strategi (StrategySpec) + backtest di atas dataset kolumnar (engine.dataset)
+    per `block` bar. Satu StrategyStream untuk seluruh run: compute() melanjutkan state
+    indikator dari blok sebelumnya. Signal, Equity & Drawdown ditulis ke kolom turunan
+    dataset (`prefix` + nama) lalu memmap dilepas tiap blok, jadi RSS tetap terbatas.
+
+    Hasil identik dengan apply_strategy + run_backtest (model long-only default) atas
+    seluruh data. Return BacktestResult yang equity/drawdown-nya memmap kolom dataset.
+    """
+    if len(dataset) == 0:
+        raise ValueError("Dataset kosong")
+    stream = spec.stream(**spec.resolve(params))
+    if not hasattr(stream, 'compute'):
+        raise ValueError(f"Strategi '{spec.key}' belum punya compute() array, tidak bisa dijalankan per blok")
+    names = {name: prefix + name for name in ('Signal', 'Equity', 'Drawdown')}
+    dataset.create_column(names['Signal'], np.int8)
+    dataset.create_column(names['Equity'], np.float64)
+    dataset.create_column(names['Drawdown'], np.float64)
+
+    backtest = ChunkedBacktest(initial_capital, sl_pct, tp_pct)
+    scratch = Scratch()
+    for lo in range(0, len(dataset), block):
+        hi = min(lo + block, len(dataset))
+        candles = dataset.window(lo, hi)
+        signal = stream.compute(candles, scratch)['Signal']
+        equity, drawdown = backtest.feed(candles['Close'], signal)
+        dataset.write(names['Signal'], lo, signal)
+        dataset.write(names['Equity'], lo, equity)
+        dataset.write(names['Drawdown'], lo, drawdown)
+        del candles, signal, equity, drawdown
+        dataset.release() # Blok berikutnya memetakan ulang; RSS tidak menumpuk sepanjang histori
+
+    equity = dataset.column(names['Equity'])
+    frame = dataset.frame(columns=list(OHLCV_COLUMNS) + [names['Signal']])
+    trades = TradeLog(backtest.trades(), frame.index, equity)
+    return BacktestResult(frame, equity, trades, initial_capital, drawdown=dataset.column(names['Drawdown']))
@@ -1,65 +1,320 @@
-import ccxt
 import pandas as pd
+import numpy as np
+import logging
 import time
-import streamlit as st
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from engine.candle_store import CandleStore, OHLCV_COLUMNS
+from engine.resample import bucket_starts, can_resample, resample_ohlcv, update_resampled
 
-def get_binance_data(symbol, timeframe, start_date):
+logger = logging.getLogger(__name__)
+
+# Durasi unit timeframe (ms). 'M' dianggap 30 hari, sama seperti ccxt.
+_TIMEFRAME_UNITS = {
+    's': 1000,
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+    'M': 30 * 24 * 60 * 60 * 1000,
+}
+
+def timeframe_to_ms(timeframe):
+    """'15m' -> 900000, '1h' -> 3600000, dst."""
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]]
+
+def _to_ms(value):
+    """Konversi tanggal (string / datetime) ke epoch milidetik UTC."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return int(ts.timestamp() * 1000)
+
+class RateLimiter:
     """
-    Mengambil data OHLCV dari BINANCE.
+    Budget rate-limit bersama antar thread: tiap request diberi slot waktu
+    minimal `interval_ms` setelah request sebelumnya.
+    """
+
+    def __init__(self, interval_ms):
+        self.interval = interval_ms / 1000
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+class FetchStats:
+    """Counter network vs cache untuk satu panggilan get_binance_data (aman dipakai antar thread)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages_fetched = 0
+        self.rows_fetched = 0
+        self.retries = 0
+        self.rows_cached = 0
+        self.rows_returned = 0
+        self.errors = [] # Fetch yang gagal tapi data cache tetap dipakai (mis. ekor)
+
+    def add_page(self, rows):
+        with self._lock:
+            self.pages_fetched += 1
+            self.rows_fetched += rows
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_error(self, message):
+        with self._lock:
+            self.errors.append(message)
+
+    def as_dict(self):
+        # int() eksplisit: rows_* berasal dari hitungan NumPy, report harus bisa di-JSON-kan
+        return {
+            'pages_fetched': int(self.pages_fetched),
+            'rows_fetched': int(self.rows_fetched),
+            'retries': int(self.retries),
+            'rows_cached': int(self.rows_cached),
+            'rows_returned': int(self.rows_returned),
+            'errors': list(self.errors),
+        }
+
+def _fetch_page(exchange, symbol, timeframe, since, limit, limiter=None,
+                max_retries=5, backoff=0.5, max_backoff=8.0, stats=None):
+    """
+    Satu panggilan fetch_ohlcv dengan retry + exponential backoff.
+    Setelah `max_retries` kali gagal, error terakhir dilempar ke pemanggil.
+    """
+    attempt = 0
+    while True:
+        if limiter:
+            limiter.wait()
+        try:
+            candles = exchange.fetch_ohlcv(symbol, timeframe, since, limit)
+            if stats:
+                stats.add_page(len(candles))
+            return candles
+        except Exception:
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            # Dihitung retry hanya kalau memang ada request berikutnya
+            if stats:
+                stats.add_retry()
+            time.sleep(min(backoff * 2 ** (attempt - 1), max_backoff))
+
+def _fetch_ohlcv_range(exchange, symbol, timeframe, since, until=None, limit=1000, on_page=None, limiter=None,
+                       stats=None):
+    """
+    Ambil candle berurutan per halaman mulai dari `since`.
+    Berhenti jika halaman kosong / tidak penuh, atau sudah melewati `until` (ms).
+    """
+    all_candles = []
+
+    while True:
+        # Fetch Data
+        candles = _fetch_page(exchange, symbol, timeframe, since, limit, limiter, stats=stats)
+
+        if not candles:
+            break
+
+        all_candles.extend(candles)
+
+        # Update Next Timestamp
+        last_time = candles[-1][0]
+        since = last_time + 1
+
+        if on_page:
+            on_page(len(all_candles))
+
+        if len(candles) < limit:
+            break
+        if until is not None and last_time >= until:
+            break
+
+    return all_candles
+
+def _fetch_ohlcv_sharded(exchange, symbol, timeframe, since, until=None, limit=1000,
+                         max_workers=8, on_page=None, limiter=None, stats=None):
+    """
+    Downloader paralel: [since, until) dipecah jadi shard berukuran `limit` candle
+    (dihitung dari durasi timeframe), lalu tiap shard diambil di thread pool.
+    Semua thread berbagi satu RateLimiter. Hasil digabung & di-dedup per timestamp.
+    """
+    if until is None:
+        until = exchange.milliseconds() if hasattr(exchange, 'milliseconds') else int(time.time() * 1000)
+    if since >= until:
+        return []
+
+    if limiter is None:
+        limiter = RateLimiter(getattr(exchange, 'rateLimit', 0) or 0)
+
+    tf_ms = timeframe_to_ms(timeframe)
+    shard_ms = tf_ms * limit
+    shards = [(start, min(start + shard_ms, until)) for start in range(since, until, shard_ms)]
+
+    def fetch_shard(start, end):
+        # Shard penuh berhenti di candle terakhirnya (end - tf), tanpa mengambil halaman shard berikutnya
+        candles = _fetch_ohlcv_range(exchange, symbol, timeframe, start, until=end - tf_ms, limit=limit,
+                                     limiter=limiter, stats=stats)
+        return [c for c in candles if c[0] < end]
+
+    pages = []
+    total = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_shard, start, end) for start, end in shards]
+        # Progress dipanggil dari thread utama (aman untuk UI)
+        for future in as_completed(futures):
+            candles = future.result()
+            pages.append(candles)
+            total += len(candles)
+            if on_page:
+                on_page(total)
+
+    # Merge + dedup: timestamp sama -> simpan satu
+    merged = {}
+    for candles in pages:
+        for c in candles:
+            merged[c[0]] = c
+    return [merged[t] for t in sorted(merged)]
+
+def _to_dataframe(timestamps, ohlcv):
+    df = pd.DataFrame(np.asarray(ohlcv), columns=OHLCV_COLUMNS)
+    df.insert(0, 'Timestamp', pd.to_datetime(np.asarray(timestamps), unit='ms'))
+    df.set_index('Timestamp', inplace=True)
+    return df
+
+def _network_errors():
+    """Tipe error jaringan / exchange (ccxt di-import lazy; exchange palsu cukup melempar OSError)."""
+    try:
+        import ccxt
+    except ImportError:
+        return (OSError,)
+    return (OSError, ccxt.BaseError)
+
+def _sync_store(store, key, since, fetch, refresh_after=None, stats=None):
     """
+    Lengkapi cache `key` di store mulai `since`: hanya kepala / ekor yang belum ada
+    yang diambil. Ekor dilewati jika store diperbarui kurang dari `refresh_after` detik lalu.
+    Ekor yang gagal diambil (retry habis) tidak membuang cache: error dicatat di log & `stats`,
+    histori yang sudah ada tetap dipakai. Gagal di fetch pertama / kepala tetap dilempar.
+    """
+    coverage = store.coverage(*key)
+
+    if coverage is None:
+        # Cache kosong: ambil penuh sekali
+        candles = fetch(since)
+        if candles:
+            store.merge(*key, candles, covered_from=since, covered_to=candles[-1][0])
+        return
+
+    covered_from, covered_to = coverage
+
+    # Kepala: start_date lebih awal dari yang pernah diambil
+    if since < covered_from:
+        head = fetch(since, until=covered_from)
+        store.merge(*key, head, covered_from=since, covered_to=covered_to)
+
+    updated_at = store.updated_at(*key)
+    if refresh_after is not None and updated_at is not None and time.time() - updated_at < refresh_after:
+        return
+
+    # Ekor: mulai dari candle terakhir (bisa jadi candle yang masih berjalan)
     try:
-        # Inisialisasi Binance
+        tail = fetch(covered_to)
+    except Exception as e:
+        if not isinstance(e, _network_errors()):
+            raise
+        message = f"Gagal update ekor {key[1]} {key[2]}: {type(e).__name__}: {e}"
+        logger.warning("%s; memakai data cache", message)
+        if stats:
+            stats.add_error(message)
+        return
+    if tail:
+        store.merge(*key, tail, covered_from=covered_from, covered_to=tail[-1][0])
+
+def get_binance_data(symbol, timeframe, start_date, exchange=None, store=None, use_cache=True,
+                     parallel=False, max_workers=8, stats=None, progress=None,
+                     base_timeframe=None, refresh_after=None):
+    """
+    Mengambil data OHLCV dari BINANCE.
+
+    Dengan use_cache=True, candle disimpan di CandleStore lokal dan request
+    berikutnya hanya mengambil bagian yang belum ada (kepala / ekor).
+    parallel=True memakai downloader sharded (thread pool, `max_workers` thread).
+    `exchange` bisa diganti objek palsu (punya .id & .fetch_ohlcv) untuk tes offline.
+    `stats` (FetchStats, opsional) diisi jumlah halaman network vs baris dari cache.
+    `progress(done, total, text)` opsional dipanggil tiap halaman (total None = tidak diketahui),
+    sehingga modul ini tidak bergantung pada UI tertentu.
+    `base_timeframe` (opsional, mis. '15m'): timeframe yang tersusun dari base dibangun lokal
+    lewat engine.resample (hasilnya di-cache & diperbarui inkremental), bukan diunduh terpisah.
+    `refresh_after` (detik, opsional): lewati fetch ekor jika cache baru saja diperbarui,
+    jadi ganti timeframe berulang kali tidak memicu request network.
+
+    Fetch yang tetap gagal setelah retry dilempar ke pemanggil, kecuali update ekor cache:
+    di situ data cache yang sudah ada dikembalikan dan errornya dicatat (log + stats.errors).
+    """
+    # Inisialisasi Binance (ccxt di-import lazy: berat & tidak perlu untuk exchange palsu / cache)
+    if exchange is None:
+        import ccxt
         exchange = ccxt.binance({
-            'enableRateLimit': True,
-            # 'timeout': 30000, 
+            # Mode paralel memakai RateLimiter bersama, bukan throttle bawaan ccxt
+            'enableRateLimit': not parallel,
+            # 'timeout': 30000,
         })
-        
-        # Konversi Start Date
-        since = exchange.parse8601(start_date)
-        
-        all_candles = []
-        limit = 1000 
-        
-        # UI Progress
-        progress_text = f"Mengambil data {symbol} dari Binance..."
-        my_bar = st.progress(0, text=progress_text)
-        
-        while True:
-            try:
-                # Fetch Data
-                candles = exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-                
-                if not candles:
-                    break
-                
-                all_candles.extend(candles)
-                
-                # Update Next Timestamp
-                last_time = candles[-1][0]
-                since = last_time + 1
-                
-                # Update UI
-                total = len(all_candles)
-                my_bar.progress(min(total % 100, 100), text=f"Terkumpul: {total} candles...")
-                
-                if len(candles) < limit:
-                    break
-                    
-            except Exception as e:
-                time.sleep(1) # Retry logic
-                continue
-        
-        my_bar.empty()
 
+    # Konversi Start Date
+    since = _to_ms(start_date)
+
+    # Timeframe turunan: yang diunduh base, mulai dari awal candle target (candle pertama utuh)
+    derived = bool(base_timeframe) and base_timeframe != timeframe and can_resample(base_timeframe, timeframe)
+    fetch_timeframe = base_timeframe if derived else timeframe
+    fetch_since = int(bucket_starts([since], timeframe)[0]) if derived else since
+
+    # Progress (opsional, UI apa pun)
+    def on_page(total):
+        if progress:
+            progress(total, None, f"Terkumpul: {total} candles...")
+
+    def fetch(start, until=None):
+        if parallel:
+            return _fetch_ohlcv_sharded(exchange, symbol, fetch_timeframe, start, until=until,
+                                        max_workers=max_workers, on_page=on_page, stats=stats)
+        return _fetch_ohlcv_range(exchange, symbol, fetch_timeframe, start, until=until, on_page=on_page, stats=stats)
+
+    if not use_cache:
+        all_candles = fetch(fetch_since)
         if not all_candles:
             return pd.DataFrame()
+        arr = np.asarray(all_candles, dtype=np.float64)
+        timestamps, ohlcv = arr[:, 0].astype(np.int64), arr[:, 1:]
+        if derived:
+            timestamps, ohlcv = resample_ohlcv(timestamps, ohlcv, timeframe)
+    else:
+        store = store or CandleStore()
+        _sync_store(store, (exchange.id, symbol, fetch_timeframe), fetch_since, fetch, refresh_after, stats)
+        if derived:
+            cached = update_resampled(store, exchange.id, symbol, base_timeframe, timeframe)
+        else:
+            cached = store.load(exchange.id, symbol, timeframe)
+        if cached is None:
+            return pd.DataFrame()
+        timestamps, ohlcv = cached
 
-        # Format DataFrame
-        df = pd.DataFrame(all_candles, columns=['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'], unit='ms')
-        df.set_index('Timestamp', inplace=True)
-        
-        return df
-
-    except Exception as e:
+    start = np.searchsorted(timestamps, since)
+    if start >= len(timestamps):
         return pd.DataFrame()
+
+    if stats:
+        stats.rows_returned = int(len(timestamps) - start)
+        stats.rows_cached = int(max(stats.rows_returned - stats.rows_fetched, 0))
+
+    # Format DataFrame
+    return _to_dataframe(timestamps[start:], ohlcv[start:])
+
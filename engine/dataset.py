@@ -0,0 +1,228 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from engine.candle_store import OHLCV_COLUMNS
+from indicators.scratch import Scratch
+
+# Format dataset kolumnar: satu file biner mentah per kolom (little-endian, lebar tetap)
+# + meta.json. File dibuka dengan memory-map, jadi window mana pun berupa view NumPy tanpa copy.
+FORMAT = 'ohlcv-columnar'
+VERSION = 1
+TIMESTAMP = 'Timestamp'
+BASE_COLUMNS = {TIMESTAMP: '<i8', **{name: '<f8' for name in OHLCV_COLUMNS}}
+
+DEFAULT_WINDOW = 500_000 # Bar per window saat strategi dijalankan di atas dataset
+CHUNK_ROWS = 1_000_000 # Bar per potongan saat menulis (RAM tulis terbatas, sumber boleh memmap)
+
+# --- PATH & META ---
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.bin")
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('format') == FORMAT else None
+
+def _write_meta(path, meta):
+    tmp = os.path.join(path, "meta.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+def _write_rows(f, ts, ohlcv, name, dtype):
+    """Tulis satu kolom per potongan CHUNK_ROWS (sumber [n, 5] bisa memmap CandleStore)."""
+    for lo in range(0, len(ts), CHUNK_ROWS):
+        hi = min(lo + CHUNK_ROWS, len(ts))
+        if name == TIMESTAMP:
+            part = ts[lo:hi]
+        else:
+            part = ohlcv[lo:hi, OHLCV_COLUMNS.index(name)]
+        f.write(np.ascontiguousarray(part, dtype=dtype).tobytes())
+
+# --- TULIS ---
+
+def write_dataset(path, ts, ohlcv, symbol=None, timeframe=None):
+    """
+    Tulis (timestamps int64 ms, ohlcv [n, 5]) sebagai dataset baru di folder `path` (menimpa).
+    File kolom ditulis dulu, meta.json terakhir: jumlah baris di meta adalah titik commit,
+    jadi tulisan yang terputus tidak pernah terbaca sebagai data.
+    """
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        old = _read_meta(path) or {}
+        os.remove(meta_path)
+        for name in old.get('columns', {}):
+            if name not in BASE_COLUMNS and os.path.exists(_column_path(path, name)):
+                os.remove(_column_path(path, name))
+
+    for name, dtype in BASE_COLUMNS.items():
+        with open(_column_path(path, name), "wb") as f:
+            _write_rows(f, ts, ohlcv, name, dtype)
+    _write_meta(path, {
+        'format': FORMAT,
+        'version': VERSION,
+        'rows': int(len(ts)),
+        'columns': dict(BASE_COLUMNS),
+        'symbol': symbol,
+        'timeframe': timeframe,
+    })
+    return OHLCVDataset(path)
+
+def append(path, ts, ohlcv):
+    """
+    Tambah candle baru di ujung dataset; hanya timestamp setelah bar terakhir yang dipakai.
+    Sisa byte dari append yang terputus (di luar `rows` meta) ditimpa. Kolom turunan
+    (mis. Signal dari compute_signals) dihapus karena panjangnya tidak lagi sama.
+    Return jumlah baris yang ditambahkan.
+    """
+    meta = _read_meta(path)
+    if meta is None:
+        raise ValueError(f"Dataset tidak ditemukan: {path}")
+    ts = np.asarray(ts, dtype=np.int64)
+    rows = meta['rows']
+    if rows:
+        last = np.fromfile(_column_path(path, TIMESTAMP), dtype=BASE_COLUMNS[TIMESTAMP], count=1, offset=(rows - 1) * 8)[0]
+        keep = ts > last
+        ts, ohlcv = ts[keep], np.asarray(ohlcv)[keep]
+    if len(ts) == 0:
+        return 0
+
+    for name, dtype in BASE_COLUMNS.items():
+        with open(_column_path(path, name), "r+b") as f:
+            f.seek(rows * np.dtype(dtype).itemsize)
+            f.truncate()
+            _write_rows(f, ts, ohlcv, name, dtype)
+    for name in [name for name in meta['columns'] if name not in BASE_COLUMNS]:
+        del meta['columns'][name]
+        os.remove(_column_path(path, name))
+    meta['rows'] = rows + len(ts)
+    _write_meta(path, meta)
+    return len(ts)
+
+def export_store(store, exchange_id, symbol, timeframe, path):
+    """Salin satu key CandleStore ke format dataset (per kolom, per potongan; tanpa memuat semuanya ke RAM)."""
+    loaded = store.load(exchange_id, symbol, timeframe)
+    if loaded is None:
+        raise ValueError(f"Data {exchange_id} {symbol} {timeframe} belum ada di cache")
+    ts, ohlcv = loaded
+    return write_dataset(path, ts, ohlcv, symbol=symbol, timeframe=timeframe)
+
+# --- BACA ---
+
+class OHLCVDataset:
+    """
+    Dataset kolumnar yang dibuka read-only lewat memory-map. Semua akses (window, frame)
+    berupa view ke halaman file, jadi RSS hanya sebesar bagian yang benar-benar disentuh.
+    """
+
+    def __init__(self, path):
+        meta = _read_meta(path)
+        if meta is None:
+            raise ValueError(f"Dataset tidak ditemukan: {path}")
+        self.path = path
+        self.meta = meta
+        self.rows = meta['rows']
+        self.symbol = meta.get('symbol')
+        self.timeframe = meta.get('timeframe')
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __repr__(self):
+        return f"OHLCVDataset({self.path!r}, rows={self.rows}, symbol={self.symbol!r}, timeframe={self.timeframe!r})"
+
+    def column(self, name):
+        """View memmap satu kolom (panjang `rows`, byte sisa append terputus diabaikan)."""
+        if name not in self._columns:
+            dtype = self.meta['columns'].get(name)
+            if dtype is None:
+                raise KeyError(f"Kolom tidak ada di dataset: {name!r}. Tersedia: {list(self.meta['columns'])}")
+            if self.rows == 0:
+                self._columns[name] = np.zeros(0, dtype=dtype)
+            else:
+                self._columns[name] = np.memmap(_column_path(self.path, name), dtype=dtype, mode='r', shape=(self.rows,))
+        return self._columns[name]
+
+    def release(self):
+        """Lepas semua memmap kolom: halaman file yang sudah disentuh keluar dari RSS proses."""
+        self._columns = {}
+
+    @property
+    def timestamps(self):
+        return self.column(TIMESTAMP)
+
+    def bounds(self, start_ms=None, end_ms=None):
+        """Posisi bar (lo, hi) untuk timestamp di [start_ms, end_ms)."""
+        ts = self.timestamps
+        lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms))
+        hi = self.rows if end_ms is None else int(np.searchsorted(ts, end_ms))
+        return lo, hi
+
+    def window(self, lo=0, hi=None, columns=OHLCV_COLUMNS):
+        """Dict {kolom: view} untuk bar [lo, hi); input compute() strategi."""
+        return {name: self.column(name)[lo:hi] for name in columns}
+
+    def frame(self, lo=0, hi=None, columns=OHLCV_COLUMNS):
+        """DataFrame bar [lo, hi) yang berbagi memori dengan file (index DatetimeIndex ms, tanpa copy)."""
+        ts = np.asarray(self.timestamps[lo:hi]).view('datetime64[ms]')
+        index = pd.DatetimeIndex(ts, name='Timestamp', copy=False)
+        data = {name: np.asarray(view) for name, view in self.window(lo, hi, columns).items()}
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def create_column(self, name, dtype):
+        """Buat (atau timpa) kolom turunan sepanjang dataset (isi nol), diisi lewat write()."""
+        if name in BASE_COLUMNS:
+            raise ValueError(f"Kolom dasar tidak boleh ditimpa: {name!r}")
+        dtype = np.dtype(dtype).newbyteorder('<').str
+        with open(_column_path(self.path, name), "wb") as f:
+            f.truncate(self.rows * np.dtype(dtype).itemsize)
+        self.meta['columns'][name] = dtype
+        _write_meta(self.path, self.meta)
+        self._columns.pop(name, None)
+
+    def write(self, name, lo, values):
+        """Tulis `values` ke kolom turunan mulai bar `lo` (langsung ke file, tanpa memetakan seluruh kolom)."""
+        if name in BASE_COLUMNS:
+            raise ValueError(f"Kolom dasar tidak boleh ditimpa: {name!r}")
+        dtype = np.dtype(self.meta['columns'][name])
+        with open(_column_path(self.path, name), "r+b") as f:
+            f.seek(lo * dtype.itemsize)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+# --- STRATEGI DI ATAS DATASET ---
+
+def compute_signals(spec, dataset, params=None, window=DEFAULT_WINDOW, out='Signal'):
+    """
+    Jalankan strategi (StrategySpec) di atas dataset per window dan tulis sinyalnya ke
+    kolom turunan `out` (int8). Strategi dengan StrategyStream.compute() menghitung langsung
+    dari view memmap dengan kolom bantu di Scratch yang dipakai ulang, jadi RAM sebanding
+    `window`, bukan panjang dataset. State strategi dibawa antar window (compute() melanjutkan),
+    jadi sinyalnya identik dengan satu run penuh.
+
+    Plugin tanpa compute() memakai apply() atas frame window yang dihitung ulang mulai
+    `spec.warmup()` bar sebelumnya (perkiraan: histori lebih panjang dari warmup terpotong;
+    warmup None = dihitung ulang dari bar 0).
+    """
+    params = spec.resolve(params)
+    warmup = spec.warmup(**params)
+    dataset.create_column(out, np.int8)
+    stream = spec.stream(**params)
+    scratch = Scratch()
+    for lo in range(0, len(dataset), window):
+        hi = min(lo + window, len(dataset))
+        if hasattr(stream, 'compute'):
+            values = stream.compute(dataset.window(lo, hi), scratch)['Signal']
+        else:
+            start = 0 if warmup is None else max(0, lo - warmup)
+            values = spec.apply(dataset.frame(start, hi), **params)['Signal'].to_numpy()[lo - start:]
+        dataset.write(out, lo, values)
+        del values
+        dataset.release() # Window berikutnya memetakan ulang; RSS tidak menumpuk sepanjang dataset
+    return dataset.column(out)
@@ -0,0 +1,101 @@
+import numpy as np
+from engine.resample import bucket_ends
+
+# --- SUMBER CANDLE TIMEFRAME RENDAH ---
+
+class LowerTimeframe:
+    """
+    Candle timeframe rendah (mis. '1m') dari CandleStore untuk drill-down bar ambigu.
+    `bar_timeframe`: timeframe bar backtest (mis. '4h'), menentukan akhir window tiap bar.
+    Lazy: store baru dibuka saat bar ambigu pertama diminta, dan karena array-nya
+    memory-map, hanya rentang bar yang diminta yang benar-benar dibaca dari disk.
+    """
+
+    def __init__(self, store, symbol, timeframe='1m', exchange_id='binance', bar_timeframe=None):
+        self.store = store
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.exchange_id = exchange_id
+        self.bar_timeframe = bar_timeframe
+        self._data = None
+        self.drilled = 0 # Bar yang di-drill-down
+        self.unresolved = 0 # Bar yang tetap ambigu (data kosong / satu candle kena dua level)
+
+    def fingerprint(self):
+        """Identitas sumber untuk key cache hasil: data timeframe rendah bertambah -> key berubah."""
+        coverage = self.store.coverage(self.exchange_id, self.symbol, self.timeframe)
+        return [self.exchange_id, self.symbol, self.timeframe, self.bar_timeframe, coverage]
+
+    def candles(self, start_ms, end_ms):
+        """OHLCV [n, 5] dengan timestamp di [start_ms, end_ms)."""
+        if self._data is None:
+            loaded = self.store.load(self.exchange_id, self.symbol, self.timeframe)
+            self._data = loaded if loaded is not None else (np.zeros(0, dtype=np.int64), np.zeros((0, 5)))
+        ts, ohlcv = self._data
+        lo, hi = np.searchsorted(ts, [start_ms, end_ms])
+        return ohlcv[lo:hi]
+
+# --- RESOLUSI BAR AMBIGU ---
+
+def first_touch(ohlcv, side, sl_price, tp_price):
+    """
+    Level yang tersentuh lebih dulu di urutan candle: True = SL, False = TP,
+    None jika tidak bisa ditentukan (tidak ada candle yang kena, atau candle pertama
+    yang kena menyentuh keduanya dan open-nya tidak melewati salah satu level).
+    """
+    if len(ohlcv) == 0:
+        return None
+    o, h, l = ohlcv[:, 0], ohlcv[:, 1], ohlcv[:, 2]
+    if side > 0:
+        sl_hit, tp_hit = l <= sl_price, h >= tp_price
+        sl_open, tp_open = o <= sl_price, o >= tp_price
+    else:
+        sl_hit, tp_hit = h >= sl_price, l <= tp_price
+        sl_open, tp_open = o >= sl_price, o <= tp_price
+    hit = sl_hit | tp_hit
+    if not hit.any():
+        return None
+    k = int(np.argmax(hit))
+    if sl_hit[k] and tp_hit[k]:
+        # Open adalah tick pertama candle: kalau sudah lewat level, level itu yang duluan
+        if sl_open[k] or tp_open[k]:
+            return bool(sl_open[k])
+        return None
+    return bool(sl_hit[k])
+
+def resolve_bars(source, starts_ms, ends_ms, side, sl_price, tp_price):
+    """
+    Untuk tiap bar ambigu (SL & TP sama-sama tersentuh di High/Low bar itu), cek candle
+    timeframe rendah di [start, end) bar tersebut. Return bool per bar: True = SL duluan.
+    Bar yang tetap tidak bisa ditentukan dianggap SL (asumsi konservatif, sama dengan tanpa drill-down).
+    """
+    sl_first = np.ones(len(starts_ms), dtype=bool)
+    for i in range(len(starts_ms)):
+        touch = first_touch(source.candles(starts_ms[i], ends_ms[i]), side[i], sl_price[i], tp_price[i])
+        source.drilled += 1
+        if touch is None:
+            source.unresolved += 1
+        else:
+            sl_first[i] = touch
+    return sl_first
+
+def bar_ends(ts, timeframe=None):
+    """
+    Akhir (eksklusif) tiap bar = awal bar + durasi timeframe, bukan awal bar berikutnya:
+    gap di data base tidak boleh memperlebar window drill-down. Tanpa `timeframe`,
+    durasi diambil dari jarak terkecil antar bar (gap hanya memperbesar jarak).
+    """
+    if timeframe is not None:
+        return bucket_ends(ts, timeframe)
+    steps = np.diff(ts)
+    steps = steps[steps > 0]
+    return ts + (steps.min() if len(steps) else 0)
+
+def bar_resolver(source, index):
+    """Callback resolve(bars, side, sl_price, tp_price) untuk simulate_positions atas index bar `index`."""
+    ts = index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    ends = bar_ends(ts, getattr(source, 'bar_timeframe', None))
+
+    def resolve(bars, side, sl_price, tp_price):
+        return resolve_bars(source, ts[bars], ends[bars], side, sl_price, tp_price)
+    return resolve
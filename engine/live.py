@@ -0,0 +1,214 @@
+import csv
+import time
+import numpy as np
+import pandas as pd
+from engine.results import REASON_BUY, REASON_SL, REASON_TP, REASON_SIGNAL
+from engine.data_loader import timeframe_to_ms, _fetch_page
+from engine import registry
+
+class PaperTrader:
+    """
+    Posisi paper-trading dengan aturan yang sama persis dengan run_backtest:
+    sinyal bar sebelumnya dieksekusi di Close bar sekarang, prioritas SL > TP > sinyal,
+    dan bar exit tidak bisa langsung entry lagi.
+    """
+
+    def __init__(self, initial_capital=1000, sl_pct=0.0, tp_pct=0.0, keep_equity=True):
+        self.initial_capital = initial_capital
+        self.sl_pct = sl_pct
+        self.tp_pct = tp_pct
+        self.position = 0 # 0: Cash, 1: Long
+        self.entry_price = 0
+        self.equity = initial_capital
+        self.prev_price = None
+        self.trade_log = []
+        self.equity_curve = [] if keep_equity else None
+
+    def step(self, timestamp, price, prev_signal):
+        """Proses satu bar tertutup. Return dict trade jika ada eksekusi, selain itu None."""
+        price = np.float64(price)
+        if self.prev_price is None:
+            # Bar pertama: belum ada sinyal sebelumnya, equity = modal awal
+            self.prev_price = price
+            self._record(timestamp)
+            return None
+
+        trade = None
+
+        # 1. CEK EXIT (JUAL)
+        if self.position == 1:
+            pnl_pct = (price - self.entry_price) / self.entry_price
+            exit_price, exit_reason = None, None
+
+            if self.sl_pct > 0 and pnl_pct <= -self.sl_pct:
+                exit_price, exit_reason = self.entry_price * (1 - self.sl_pct), REASON_SL
+            elif self.tp_pct > 0 and pnl_pct >= self.tp_pct:
+                exit_price, exit_reason = self.entry_price * (1 + self.tp_pct), REASON_TP
+            elif prev_signal <= 0: # Long-only: sinyal short (-1) = keluar
+                exit_price, exit_reason = price, REASON_SIGNAL
+
+            if exit_reason:
+                self.position = 0
+                actual_return = (exit_price - self.entry_price) / self.entry_price
+                self.equity = self.equity * (1 + actual_return)
+                trade = {
+                    'Tanggal': timestamp,
+                    'Tipe': 'SELL',
+                    'Harga': exit_price,
+                    'Alasan': exit_reason,
+                    'Profit/Loss %': round(actual_return * 100, 2),
+                    'Saldo Akhir': round(self.equity, 2)
+                }
+
+        # 2. CEK ENTRY (BELI)
+        if trade is None and self.position == 0 and prev_signal == 1:
+            self.position = 1
+            self.entry_price = price
+            trade = {
+                'Tanggal': timestamp,
+                'Tipe': 'BUY',
+                'Harga': price,
+                'Alasan': REASON_BUY,
+                'Profit/Loss %': 0.0,
+                'Saldo Akhir': round(self.equity, 2)
+            }
+
+        # 3. HOLD
+        elif trade is None and self.position == 1:
+            daily_change = (price - self.prev_price) / self.prev_price
+            self.equity = self.equity * (1 + daily_change)
+
+        self.prev_price = price
+        self._record(timestamp)
+        if trade:
+            self.trade_log.append(trade)
+        return trade
+
+    def _record(self, timestamp):
+        if self.equity_curve is not None:
+            self.equity_curve.append((timestamp, self.equity))
+
+class StreamingRunner:
+    """
+    Runner streaming: tiap candle tertutup meng-update StrategyStream (O(1) per bar)
+    lalu PaperTrader mengeksekusi sinyal bar sebelumnya, persis seperti run_backtest.
+    """
+
+    def __init__(self, strategy, params=None, sl_pct=0.0, tp_pct=0.0, initial_capital=1000, keep_equity=True):
+        spec = registry.get(strategy)
+        self.stream = spec.stream(**(params or {}))
+        # Jumlah candle histori minimal untuk prime() sebelum mulai streaming (None = seluruh histori)
+        self.warmup = spec.warmup(**(params or {}))
+        self.trader = PaperTrader(initial_capital, sl_pct, tp_pct, keep_equity)
+        self.prev_signal = 0
+        self.bars = 0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    def prime(self, history):
+        """
+        Panaskan indikator dengan histori (tanpa trading). Candle pertama yang
+        di-stream setelah ini langsung bisa mengeksekusi sinyal bar terakhir histori.
+        """
+        df_s = self.stream.prime(history)
+        if len(df_s):
+            self.prev_signal = df_s['Signal'].iloc[-1]
+            self.trader.prev_price = np.float64(df_s['Close'].iloc[-1])
+        return df_s
+
+    def on_candle(self, timestamp, candle):
+        """Proses satu candle tertutup (dict / Series OHLCV). Return trade (dict) atau None."""
+        started = time.perf_counter()
+
+        # Eksekusi pakai sinyal bar sebelumnya di harga Close bar ini
+        trade = self.trader.step(timestamp, candle['Close'], self.prev_signal)
+        # Sinyal bar ini baru dipakai di bar berikutnya
+        self.prev_signal = self.stream.update(candle)
+
+        elapsed = time.perf_counter() - started
+        self.bars += 1
+        self._total_latency += elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+        return trade
+
+    def run(self, feed, on_trade=None):
+        """Konsumsi feed (iterable (timestamp, candle)) sampai habis, return summary()."""
+        for timestamp, candle in feed:
+            trade = self.on_candle(timestamp, candle)
+            if trade and on_trade:
+                on_trade(trade)
+        return self.summary()
+
+    @property
+    def trade_log(self):
+        return pd.DataFrame(self.trader.trade_log)
+
+    def summary(self):
+        closed = [t for t in self.trader.trade_log if t['Tipe'] == 'SELL']
+        wins = len([t for t in closed if t['Profit/Loss %'] > 0])
+        return {
+            'bars': self.bars,
+            'position': self.trader.position,
+            'equity': self.trader.equity,
+            'total_return_pct': (self.trader.equity / self.trader.initial_capital - 1) * 100,
+            'win_rate': wins / len(closed) * 100 if closed else 0.0,
+            'trade_log': self.trade_log,
+            'avg_latency_ms': self._total_latency / self.bars * 1000 if self.bars else 0.0,
+            'max_latency_ms': self.max_latency * 1000,
+        }
+
+# --- FEED ---
+# Feed = iterable (timestamp, candle) dengan candle berisi Open/High/Low/Close/Volume.
+# Adapter websocket cukup menghasilkan format yang sama (candle yang sudah tertutup).
+
+def frame_feed(df):
+    """Replay DataFrame OHLCV bar per bar."""
+    for row in df[['Open', 'High', 'Low', 'Close', 'Volume']].itertuples():
+        yield row.Index, {'Open': row.Open, 'High': row.High, 'Low': row.Low, 'Close': row.Close, 'Volume': row.Volume}
+
+def csv_replay_feed(path, delay=0.0):
+    """
+    Replay file CSV (Timestamp,Open,High,Low,Close,Volume) baris per baris tanpa
+    memuat seluruh file. `delay` (detik) untuk mensimulasikan candle real-time.
+    """
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            candle = {k: float(row[k]) for k in ('Open', 'High', 'Low', 'Close', 'Volume')}
+            yield pd.Timestamp(row['Timestamp']), candle
+            if delay:
+                time.sleep(delay)
+
+def polling_feed(exchange, symbol, timeframe, since=None, poll_interval=None, limit=1000,
+                 max_retries=5, backoff=0.5):
+    """
+    Feed live dari exchange ccxt lewat polling fetch_ohlcv.
+    Hanya candle yang sudah tertutup yang dikirim, masing-masing sekali.
+
+    since=None: hanya candle yang tertutup SETELAH feed dimulai (candle tertutup terakhir
+    dianggap sudah terkirim); histori dimasukkan lewat StreamingRunner.prime(), bukan
+    di-stream sebagai candle live. since (ms) = replay mulai candle itu, termasuk histori.
+    Tiap poll memakai retry + backoff data_loader._fetch_page; error yang tetap gagal
+    setelah `max_retries` dilempar ke pemanggil.
+    """
+    tf_ms = timeframe_to_ms(timeframe)
+    poll_interval = poll_interval or min(tf_ms / 1000 / 4, 30)
+    if since is None:
+        # Awal candle tertutup terakhir: candle [t, t + tf) tertutup jika t + tf <= now
+        last_sent = exchange.milliseconds() // tf_ms * tf_ms - tf_ms
+    else:
+        last_sent = since - 1
+
+    while True:
+        now = exchange.milliseconds()
+        candles = _fetch_page(exchange, symbol, timeframe, last_sent + 1, limit,
+                              max_retries=max_retries, backoff=backoff)
+        for ts, o, h, l, c, v in candles:
+            if ts + tf_ms > now:
+                break # Candle masih berjalan
+            if ts <= last_sent:
+                continue
+            last_sent = ts
+            yield pd.Timestamp(ts, unit='ms'), {'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v}
+        # Halaman penuh yang sudah tertutup semua = masih ada backlog: ambil lanjutannya tanpa menunggu
+        if len(candles) < limit or candles[-1][0] + tf_ms > now:
+            time.sleep(poll_interval)
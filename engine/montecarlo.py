@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from engine.results import TradeLog
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# --- INPUT ---
+
+def closed_trade_returns(trade_log):
+    """
+    Return desimal per trade tertutup (presisi penuh, bukan kolom 'Profit/Loss %' yang sudah
+    dibulatkan). Terima TradeLog (res.trades) atau tabel BUY/SELL: Harga SELL / Harga BUY - 1.
+    """
+    if isinstance(trade_log, TradeLog):
+        return trade_log.closed_returns()
+    if trade_log is None or trade_log.empty:
+        return np.zeros(0)
+    kind = trade_log['Tipe'].to_numpy()
+    price = trade_log['Harga'].to_numpy(dtype=np.float64)
+    sells = np.flatnonzero(kind == 'SELL')
+    # Baris tepat sebelum SELL selalu BUY pasangannya (long-only, satu posisi)
+    return price[sells] / price[sells - 1] - 1
+
+def bar_returns(equity_curve):
+    """Return per bar dari kurva equity (bar pertama dibuang)."""
+    equity = np.asarray(equity_curve, dtype=np.float64)
+    return equity[1:] / equity[:-1] - 1
+
+# --- RESAMPLING (2-D: satu baris = satu path) ---
+
+def resample_trades(returns, n_paths, method="bootstrap", rng=None):
+    """
+    [n_paths, n_trades] return trade sintetis.
+    method "shuffle": urutan trade diacak (return akhir sama, drawdown & streak berubah),
+    "bootstrap": sampling dengan pengembalian.
+    """
+    rng = rng or np.random.default_rng()
+    returns = np.asarray(returns, dtype=np.float64)
+    if method == "shuffle":
+        return rng.permuted(np.broadcast_to(returns, (n_paths, len(returns))), axis=1)
+    if method == "bootstrap":
+        return returns[rng.integers(0, len(returns), (n_paths, len(returns)))]
+    raise ValueError(f"Metode resampling tidak dikenal: {method}")
+
+def block_bootstrap(returns, n_paths, block_size=24, length=None, rng=None):
+    """
+    Moving-block bootstrap return per bar: blok `block_size` bar berurutan diambil acak
+    lalu disambung, jadi autokorelasi (tren, cluster volatilitas) di dalam blok tetap terjaga.
+    """
+    rng = rng or np.random.default_rng()
+    returns = np.asarray(returns, dtype=np.float64)
+    length = length or len(returns)
+    block_size = max(1, min(block_size, len(returns)))
+    n_blocks = -(-length // block_size)
+    starts = rng.integers(0, len(returns) - block_size + 1, (n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :length]
+    return returns[idx]
+
+# --- STATISTIK PER PATH ---
+
+def equity_paths(returns_2d, initial_capital=1.0):
+    """Kurva equity [n_paths, n+1] (kolom 0 = modal awal) dari matriks return."""
+    paths = np.empty((returns_2d.shape[0], returns_2d.shape[1] + 1))
+    paths[:, 0] = initial_capital
+    np.add(returns_2d, 1, out=paths[:, 1:])
+    np.cumprod(paths, axis=1, out=paths)
+    return paths
+
+def max_drawdowns(paths):
+    """Max drawdown (desimal, negatif) per baris kurva equity."""
+    ratio = np.maximum.accumulate(paths, axis=1)
+    np.divide(paths, ratio, out=ratio)
+    return ratio.min(axis=1) - 1
+
+def max_streaks(mask):
+    """
+    (run True terpanjang, run False terpanjang) per baris matriks boolean.
+    Vektor penuh: semua run dipecah lewat titik perubahan nilai, panjangnya dihitung
+    dari selisih posisi awal, lalu diambil maksimum per baris dengan reduceat.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    n_rows, n_cols = mask.shape
+    if n_cols == 0:
+        empty = np.zeros(n_rows, dtype=np.int64)
+        return empty, empty.copy()
+    change = np.empty_like(mask)
+    change[:, 0] = True # Tiap baris selalu mulai run baru, jadi run tidak nyambung antar baris
+    np.not_equal(mask[:, 1:], mask[:, :-1], out=change[:, 1:])
+    starts = np.flatnonzero(change)
+    lengths = np.diff(starts, append=mask.size)
+    values = mask.ravel()[starts]
+    row_first = np.flatnonzero(starts % n_cols == 0)
+    longest_true = np.maximum.reduceat(np.where(values, lengths, 0), row_first)
+    longest_false = np.maximum.reduceat(np.where(values, 0, lengths), row_first)
+    return longest_true, longest_false
+
+# --- ENTRY POINT ---
+
+def monte_carlo(returns, n_paths=10000, method="bootstrap", block_size=24, chunk_paths=2000,
+                initial_capital=1000, seed=None, keep_paths=False):
+    """
+    Simulasi Monte Carlo atas return trade ("shuffle" / "bootstrap") atau return per bar
+    ("block"). Path diproses per chunk `chunk_paths` baris supaya memori tetap terbatas.
+
+    Return dict array per path: final_return_pct, max_drawdown_pct, max_win_streak,
+    max_loss_streak (+ 'paths' [n_paths, n+1] kalau keep_paths=True).
+    """
+    rng = np.random.default_rng(seed)
+    returns = np.asarray(returns, dtype=np.float64)
+    out = {
+        'final_return_pct': np.empty(n_paths),
+        'max_drawdown_pct': np.empty(n_paths),
+        'max_win_streak': np.empty(n_paths, dtype=np.int64),
+        'max_loss_streak': np.empty(n_paths, dtype=np.int64),
+    }
+    if keep_paths:
+        out['paths'] = np.empty((n_paths, len(returns) + 1))
+    if len(returns) == 0:
+        for name in ('final_return_pct', 'max_drawdown_pct', 'max_win_streak', 'max_loss_streak'):
+            out[name][:] = 0
+        if keep_paths:
+            out['paths'][:] = initial_capital
+        return out
+
+    for lo in range(0, n_paths, chunk_paths):
+        hi = min(lo + chunk_paths, n_paths)
+        if method == "block":
+            sampled = block_bootstrap(returns, hi - lo, block_size, rng=rng)
+        else:
+            sampled = resample_trades(returns, hi - lo, method, rng)
+        paths = equity_paths(sampled, initial_capital)
+
+        out['final_return_pct'][lo:hi] = (paths[:, -1] / initial_capital - 1) * 100
+        out['max_drawdown_pct'][lo:hi] = max_drawdowns(paths) * 100
+        # Sama dengan win rate backtester: trade untung = return > 0
+        out['max_win_streak'][lo:hi], out['max_loss_streak'][lo:hi] = max_streaks(sampled > 0)
+        if keep_paths:
+            out['paths'][lo:hi] = paths
+    return out
+
+def summarize(mc, percentiles=DEFAULT_PERCENTILES):
+    """Tabel distribusi: persentil tiap metrik + peluang rugi (return akhir < 0)."""
+    metrics = ['final_return_pct', 'max_drawdown_pct', 'max_win_streak', 'max_loss_streak']
+    table = pd.DataFrame({m: np.percentile(mc[m], percentiles) for m in metrics},
+                         index=[f"p{p}" for p in percentiles])
+    table.loc['mean'] = [mc[m].mean() for m in metrics]
+    table.attrs['prob_loss'] = float((mc['final_return_pct'] < 0).mean())
+    return table
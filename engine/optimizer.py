@@ -0,0 +1,192 @@
+import itertools
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from engine.backtester import run_backtest_grid
+from engine.candle_store import OHLCV_COLUMNS
+from engine import registry
+from engine.shm import share_arrays, attach_arrays, release
+from indicators.graph import IndicatorGraph
+
+# Kolom metrik hasil sweep, urutan ranking: return tertinggi, drawdown terkecil, win rate tertinggi
+RANK_COLUMNS = ['total_return_pct', 'max_drawdown_pct', 'win_rate']
+
+# --- SHARED MEMORY ---
+# OHLCV disimpan sekali di shared memory (float64 [n, 5] + index),
+# worker cukup attach & membangun DataFrame sekali per proses. Tiap proses juga punya
+# satu IndicatorGraph atas frame itu: node indikator (EMA(200), RSI(14), TR, ...) dipakai
+# ulang oleh semua task strategi x parameter di proses tersebut.
+
+_WORKER = {}
+
+def _share_frame(df):
+    return share_arrays({
+        'values': df[OHLCV_COLUMNS].to_numpy(dtype=np.float64),
+        'index': df.index.to_numpy(),
+    })
+
+def _attach_frame(spec):
+    """Initializer worker: bangun DataFrame dari shared memory (tanpa pickle data)."""
+    arrays, segments = attach_arrays(spec)
+    idx = pd.Index(arrays['index'], name='Timestamp')
+    _WORKER['df'] = pd.DataFrame(arrays['values'], index=idx, columns=OHLCV_COLUMNS, copy=False)
+    _WORKER['graph'] = IndicatorGraph(_WORKER['df'])
+    # Simpan referensi supaya buffer tidak ditutup selama worker hidup
+    _WORKER['shm'] = segments
+
+# --- EVALUASI ---
+
+def _evaluate(strategy, params, sl_values, tp_values, df=None, graph=None):
+    """
+    Satu task: apply_strategy SEKALI untuk `params`, lalu semua pasangan SL/TP
+    dievaluasi sekaligus lewat run_backtest_grid. Indikator (RSI, ATR, ...)
+    otomatis dipakai ulang oleh semua SL/TP, dan lewat `graph` oleh task lain.
+    """
+    if df is None:
+        df, graph = _WORKER['df'], _WORKER['graph']
+    df_s = registry.get(strategy).apply(df, graph=graph, **params)
+    grid = run_backtest_grid(df_s, sl_values, tp_values)
+
+    rows = []
+    for i, sl_pct in enumerate(sl_values):
+        for j, tp_pct in enumerate(tp_values):
+            rows.append({
+                'strategy': strategy,
+                'params': params,
+                'sl_pct': sl_pct,
+                'tp_pct': tp_pct,
+                'total_return_pct': grid['total_return_pct'][i, j],
+                'max_drawdown_pct': grid['max_drawdown_pct'][i, j],
+                'win_rate': grid['win_rate'][i, j],
+                'trades': int(grid['trades'][i, j]),
+            })
+    return rows
+
+# --- SEARCH SPACE ---
+# Format space per strategi: {'param': [nilai, ...]} untuk grid / kategori,
+# atau {'param': (low, high)} untuk rentang (int jika dua-duanya int) pada random/bayes.
+
+def _grid(space):
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            raise ValueError(f"Grid search butuh list nilai untuk '{name}', bukan rentang {values}")
+    keys = list(space)
+    for combo in itertools.product(*(space[k] for k in keys)):
+        yield dict(zip(keys, combo))
+
+def _sample(space, rng):
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, tuple):
+            low, high = spec
+            if isinstance(low, int) and isinstance(high, int):
+                params[name] = int(rng.integers(low, high + 1))
+            else:
+                params[name] = float(rng.uniform(low, high))
+        else:
+            params[name] = spec[int(rng.integers(len(spec)))]
+    return params
+
+def _encode(space, params):
+    """Normalisasi parameter ke [0, 1] supaya bisa dihitung jaraknya (untuk bayes)."""
+    x = []
+    for name, spec in space.items():
+        if isinstance(spec, tuple):
+            low, high = spec
+            x.append((params[name] - low) / (high - low) if high != low else 0.0)
+        else:
+            x.append(list(spec).index(params[name]) / max(len(spec) - 1, 1))
+    return np.array(x)
+
+def _propose_bayes(space, history, n, rng, n_candidates=64, gamma=0.25, bandwidth=0.15):
+    """
+    Bayesian search sederhana ala TPE: pisahkan histori jadi 'bagus' (top gamma)
+    dan 'jelek', lalu pilih kandidat random dengan rasio densitas l(x)/g(x) tertinggi.
+    """
+    scores = np.array([score for _, score in history])
+    order = np.argsort(-scores)
+    n_good = max(1, int(np.ceil(gamma * len(history))))
+    good = np.array([_encode(space, history[i][0]) for i in order[:n_good]])
+    bad = np.array([_encode(space, history[i][0]) for i in order[n_good:]]) if len(history) > n_good else good
+
+    def density(points, x):
+        d2 = ((points - x) ** 2).sum(axis=1)
+        return np.exp(-d2 / (2 * bandwidth ** 2)).mean() + 1e-12
+
+    candidates = [_sample(space, rng) for _ in range(n_candidates)]
+    ratio = [density(good, _encode(space, c)) / density(bad, _encode(space, c)) for c in candidates]
+    return [candidates[i] for i in np.argsort(ratio)[::-1][:n]]
+
+# --- ENTRY POINT ---
+
+def run_sweep(df, space, sl_values=(0.0,), tp_values=(0.0,), method="grid", n_iter=50,
+              max_workers=None, seed=None):
+    """
+    Parameter sweep: strategi x parameter x SL/TP di process pool.
+
+    space    : {'bb_rsi': {'rsi_period': [7, 14]}, 'supertrend': {...}}
+               (nama strategi = key di engine.registry, mis. nama modul di folder strategies/)
+    method   : "grid" | "random" | "bayes" (random & bayes memakai n_iter per strategi)
+    Return DataFrame terurut: return tertinggi, drawdown terkecil, win rate tertinggi.
+    """
+    rng = np.random.default_rng(seed)
+    for strategy in space:
+        registry.get(strategy) # Nama salah -> KeyError sebelum pool dibuat
+    sl_values, tp_values = list(sl_values), list(tp_values)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    pool, segments, graph = None, [], None
+    if max_workers <= 1:
+        graph = IndicatorGraph(df)
+    else:
+        spec, segments = _share_frame(df)
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_frame, initargs=(spec,))
+
+    def run_batch(tasks):
+        if pool is None:
+            return [_evaluate(s, p, sl_values, tp_values, df=df, graph=graph) for s, p in tasks]
+        futures = [pool.submit(_evaluate, s, p, sl_values, tp_values) for s, p in tasks]
+        return [f.result() for f in futures]
+
+    results = []
+    try:
+        if method in ("grid", "random"):
+            tasks = []
+            for strategy, strat_space in space.items():
+                if method == "grid":
+                    combos = list(_grid(strat_space))
+                else:
+                    combos = [_sample(strat_space, rng) for _ in range(n_iter)]
+                tasks.extend((strategy, p) for p in combos)
+            for rows in run_batch(tasks):
+                results.extend(rows)
+
+        elif method == "bayes":
+            batch = max(max_workers, 4)
+            for strategy, strat_space in space.items():
+                history = []
+                n_init = min(n_iter, batch * 2)
+                proposals = [_sample(strat_space, rng) for _ in range(n_init)]
+                while proposals:
+                    for params, rows in zip(proposals, run_batch([(strategy, p) for p in proposals])):
+                        results.extend(rows)
+                        history.append((params, max(r['total_return_pct'] for r in rows)))
+                    remaining = n_iter - len(history)
+                    proposals = _propose_bayes(strat_space, history, min(batch, remaining), rng) if remaining > 0 else []
+        else:
+            raise ValueError(f"Metode sweep tidak dikenal: {method}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        release(segments)
+
+    return rank_results(pd.DataFrame(results))
+
+def rank_results(results):
+    """Urutkan hasil sweep & tambahkan kolom 'rank' (1 = terbaik)."""
+    if results.empty:
+        return results
+    ranked = results.sort_values(RANK_COLUMNS, ascending=False, kind='mergesort').reset_index(drop=True)
+    ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+    return ranked
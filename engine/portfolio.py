@@ -0,0 +1,198 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from engine.backtester import simulate
+from engine.candle_store import OHLCV_COLUMNS
+from engine.data_loader import get_binance_data
+from engine import registry
+from engine.shm import share_arrays, attach_arrays, release
+
+CLOSE = OHLCV_COLUMNS.index('Close')
+
+class Panel:
+    """
+    OHLCV banyak simbol di satu kalender bersama.
+    data[field, symbol, bar] dengan field mengikuti OHLCV_COLUMNS; bar sebelum
+    simbol listing bernilai NaN.
+    """
+
+    def __init__(self, symbols, index, data):
+        self.symbols = list(symbols)
+        self.index = index
+        self.data = data
+
+    @property
+    def close(self):
+        return self.data[CLOSE]
+
+    def first_valid(self):
+        """Bar pertama yang punya data per simbol (len(index) jika kosong)."""
+        valid = ~np.isnan(self.close)
+        return np.where(valid.any(axis=1), valid.argmax(axis=1), len(self.index))
+
+    def frame(self, i, start=None):
+        """DataFrame float64 satu simbol, mulai dari bar valid pertamanya."""
+        if start is None:
+            start = self.first_valid()[i]
+        values = self.data[:, i, start:].T.astype(np.float64)
+        return pd.DataFrame(values, index=self.index[start:], columns=OHLCV_COLUMNS)
+
+def align_panel(frames, dtype=np.float64):
+    """
+    Satukan {symbol: DataFrame OHLCV} ke satu Panel di atas union timestamp.
+    Celah di tengah histori diisi harga Close terakhir (Volume 0).
+    """
+    symbols = list(frames)
+    index = pd.DatetimeIndex(np.unique(np.concatenate([frames[s].index.to_numpy() for s in symbols])), name='Timestamp')
+    n = len(index)
+
+    data = np.full((len(OHLCV_COLUMNS), len(symbols), n), np.nan, dtype=dtype)
+    for i, symbol in enumerate(symbols):
+        df = frames[symbol]
+        pos = index.get_indexer(df.index)
+        data[:, i, pos] = df[OHLCV_COLUMNS].to_numpy(dtype=dtype).T
+
+    # Forward-fill Close lalu isi O/H/L dengan Close itu (candle datar tanpa volume)
+    close = data[CLOSE]
+    valid = ~np.isnan(close)
+    last = np.maximum.accumulate(np.where(valid, np.arange(n), 0), axis=1)
+    filled = np.take_along_axis(close, last, axis=1)
+    started = np.maximum.accumulate(valid, axis=1)
+    gap = started & ~valid
+    for f, name in enumerate(OHLCV_COLUMNS):
+        data[f][gap] = 0 if name == 'Volume' else filled[gap]
+
+    return Panel(symbols, index, data)
+
+def load_panel(symbols, timeframe, start_date, end_date=None, dtype=np.float64, loader=get_binance_data, **loader_kwargs):
+    """Ambil semua simbol (lewat cache get_binance_data) lalu align ke satu Panel."""
+    frames = {}
+    for symbol in symbols:
+        df = loader(symbol, timeframe, start_date, **loader_kwargs)
+        if df.empty:
+            continue
+        if end_date is not None:
+            df = df.loc[df.index <= pd.to_datetime(end_date) + pd.Timedelta(days=1)]
+        frames[symbol] = df
+    return align_panel(frames, dtype=dtype)
+
+# --- EKSEKUSI PER SIMBOL ---
+
+_WORKER = {}
+
+def _attach_panel(spec):
+    arrays, segments = attach_arrays(spec)
+    _WORKER['arrays'] = arrays
+    _WORKER['segments'] = segments
+
+def _run_symbol(i, strategy, params, sl_pct, tp_pct, initial_capital, arrays=None):
+    """
+    Jalankan strategi + backtest untuk simbol ke-i, tulis equity & sinyal langsung
+    ke array output bersama (tidak dikirim balik lewat pickle).
+    """
+    arrays = arrays or _WORKER['arrays']
+    panel = Panel([], pd.DatetimeIndex(arrays['index'], name='Timestamp'), arrays['data'])
+    equity_out, signal_out = arrays['equity'], arrays['signal']
+
+    start = panel.first_valid()[i]
+    equity_out[i, :] = initial_capital
+    signal_out[i, :] = 0
+    if start >= len(panel.index) - 1:
+        return {'total_return_pct': 0.0, 'win_rate': 0.0, 'trades': 0, 'wins': 0}
+
+    df_s = registry.get(strategy).apply(panel.frame(i, start), **params)
+    close = df_s['Close'].to_numpy(dtype=np.float64)
+    signal = df_s['Signal'].to_numpy(dtype=np.float64)
+    sim = simulate(close, signal, initial_capital, sl_pct, tp_pct)
+
+    equity_out[i, start:] = sim['equity']
+    signal_out[i, start:] = signal
+
+    trades = len(sim['trade_returns'])
+    wins = int((np.round(sim['trade_returns'] * 100, 2) > 0).sum())
+    return {
+        'total_return_pct': (sim['equity'][-1] / initial_capital - 1) * 100,
+        'win_rate': wins / trades * 100 if trades else 0.0,
+        'trades': trades,
+        'wins': wins,
+    }
+
+def _drawdown(equity):
+    running_max = np.maximum.accumulate(equity, axis=-1)
+    return (equity - running_max) / running_max
+
+def run_portfolio(panel, strategy, params=None, sl_pct=0.0, tp_pct=0.0, initial_capital=1000,
+                  weights=None, rebalance=False, max_workers=None):
+    """
+    Backtest satu strategi di semua simbol Panel.
+
+    Alokasi modal:
+    - weights   : {symbol: bobot} (dinormalisasi), default sama rata.
+    - rebalance : False -> tiap simbol jadi 'kantong' modal sendiri (buy & hold per kantong);
+                  True  -> bobot dikembalikan tiap bar (return portfolio = rata-rata berbobot).
+    Simbol diproses paralel di process pool; Panel dibagi lewat shared memory.
+    """
+    params = params or {}
+    n_sym, n = len(panel.symbols), len(panel.index)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    arrays = {
+        'data': panel.data,
+        'index': panel.index.to_numpy(),
+        'equity': np.empty((n_sym, n), dtype=np.float64),
+        'signal': np.empty((n_sym, n), dtype=np.float32),
+    }
+    args = (strategy, params, sl_pct, tp_pct, initial_capital)
+
+    if max_workers > 1 and n_sym > 1:
+        spec, segments = share_arrays(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=min(max_workers, n_sym), initializer=_attach_panel, initargs=(spec,)) as pool:
+                stats = list(pool.map(_run_symbol, range(n_sym), *([a] * n_sym for a in args)))
+            shared, attached = attach_arrays(spec)
+            equity = shared['equity'].copy()
+            signals = shared['signal'].copy()
+            for shm in attached:
+                shm.close()
+        finally:
+            release(segments)
+    else:
+        stats = [_run_symbol(i, *args, arrays=arrays) for i in range(n_sym)]
+        equity, signals = arrays['equity'], arrays['signal']
+
+    # --- GABUNGKAN ---
+    if weights is None:
+        w = np.full(n_sym, 1.0 / n_sym)
+    else:
+        w = np.array([weights.get(s, 0.0) for s in panel.symbols], dtype=np.float64)
+        w = w / w.sum()
+
+    if rebalance:
+        bar_returns = np.zeros((n_sym, n))
+        bar_returns[:, 1:] = equity[:, 1:] / equity[:, :-1] - 1
+        port = initial_capital * np.cumprod(1 + w @ bar_returns)
+    else:
+        port = w @ equity
+
+    drawdown = _drawdown(equity)
+    port_dd = _drawdown(port)
+
+    per_symbol = pd.DataFrame(stats, index=pd.Index(panel.symbols, name='Symbol'))
+    per_symbol['max_drawdown_pct'] = drawdown.min(axis=1) * 100
+    per_symbol['weight'] = w
+
+    total_trades = per_symbol['trades'].sum()
+    return {
+        'symbols': panel.symbols,
+        'index': panel.index,
+        'equity': equity,
+        'drawdown': drawdown,
+        'signals': signals,
+        'per_symbol': per_symbol.drop(columns='wins'),
+        'portfolio_equity': pd.Series(port, index=panel.index, name='Equity_Curve'),
+        'portfolio_drawdown': pd.Series(port_dd, index=panel.index, name='Drawdown'),
+        'total_return_pct': (port[-1] / initial_capital - 1) * 100,
+        'max_drawdown_pct': port_dd.min() * 100,
+        'win_rate': per_symbol['wins'].sum() / total_trades * 100 if total_trades else 0.0,
+    }
@@ -0,0 +1,111 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+class RunReport:
+    """
+    Laporan per-run: tiap tahap pipeline (load -> strategi -> backtest) dicatat
+    wall time, CPU time dan jumlah baris. track_memory=True (opt-in) menambah peak memory
+    yang dialokasikan (tracemalloc); tracing memperlambat kode Python hingga belasan kali,
+    jadi jangan dinyalakan saat yang diukur adalah kecepatan.
+    """
+
+    def __init__(self, track_memory=False, **meta):
+        self.track_memory = track_memory
+        self.meta = meta
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows=None, **extra):
+        """
+        Context manager satu tahap. Dict yang di-yield boleh diisi selama tahap
+        berjalan (mis. info['rows'] = len(df), counter halaman network, dsb).
+        """
+        info = {'stage': name, 'rows': rows, **extra}
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield info
+        finally:
+            info['wall_s'] = time.perf_counter() - wall
+            info['cpu_s'] = time.process_time() - cpu
+            if self.track_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                info['peak_alloc_mb'] = max(peak - mem_start, 0) / 1024 ** 2
+                if started_tracing:
+                    tracemalloc.stop()
+            if info.get('rows') and info['wall_s'] > 0:
+                info['rows_per_s'] = info['rows'] / info['wall_s']
+            self.stages.append(info)
+
+    @property
+    def total_wall(self):
+        return sum(s['wall_s'] for s in self.stages)
+
+    def to_dict(self):
+        return {'meta': self.meta, 'total_wall_s': self.total_wall, 'stages': self.stages}
+
+    def to_json(self, path=None):
+        text = json.dumps(self.to_dict(), indent=2, default=str)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_frame(self):
+        """Tabel ringkas untuk dashboard: satu baris per tahap."""
+        return pd.DataFrame(self.stages).set_index('stage') if self.stages else pd.DataFrame()
+
+class Profiler:
+    """
+    Opt-in cProfile untuk satu run: start() ... stop() menyimpan statistik mentah ke
+    `path` (.prof, bisa dibuka snakeviz / pstats) dan ringkasan teks ke `path` + '.txt'.
+    """
+
+    def __init__(self, path, sort='cumulative', limit=40):
+        self.path = path
+        self.sort = sort
+        self.limit = limit
+        self.summary = None
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+        return self
+
+    def stop(self):
+        self._profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._profiler.dump_stats(self.path)
+        buffer = io.StringIO()
+        pstats.Stats(self._profiler, stream=buffer).sort_stats(self.sort).print_stats(self.limit)
+        self.summary = buffer.getvalue()
+        with open(self.path + '.txt', 'w') as f:
+            f.write(self.summary)
+        return self.summary
+
+@contextmanager
+def profiled(path, enabled=True, **kwargs):
+    """Versi context manager Profiler; yield None jika enabled=False."""
+    if not enabled:
+        yield None
+        return
+    profiler = Profiler(path, **kwargs).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
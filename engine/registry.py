@@ -0,0 +1,164 @@
+import ast
+import importlib
+import importlib.util
+import os
+from importlib.metadata import entry_points
+
+# Folder strategi bawaan. Plugin luar bisa mendaftar lewat entry point grup ini
+# (value = nama modul, mis. "my_pkg.my_strategy = my_pkg.my_strategy").
+STRATEGY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'strategies')
+ENTRY_POINT_GROUP = 'crypto_backtester.strategies'
+
+_CASTS = {'int': int, 'float': float, 'bool': bool, 'str': str}
+
+class StrategySpec:
+    """
+    Deskripsi satu strategi dari dict STRATEGY di modulnya: label (nama tampilan),
+    skema parameter, indikator yang dipakai. Modul baru di-import saat pertama dipakai
+    (apply / stream / warmup), jadi daftar strategi bisa dibangun tanpa import apa pun.
+    """
+
+    def __init__(self, key, module_name, meta):
+        self.key = key
+        self.module_name = module_name
+        self.label = meta.get('label', key)
+        self.params = meta.get('params', {})
+        self.indicators = meta.get('indicators', [])
+        self.version = meta.get('version') # Opsional, naikkan untuk membatalkan cache hasil lama
+        self._module = None
+
+    def __repr__(self):
+        return f"StrategySpec({self.key!r}, label={self.label!r})"
+
+    @property
+    def module(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.module_name)
+        return self._module
+
+    def defaults(self):
+        return {name: schema.get('default') for name, schema in self.params.items()}
+
+    def resolve(self, params=None):
+        """Gabung params dengan default + cast tipe sesuai skema. Parameter tak dikenal -> ValueError."""
+        params = dict(params or {})
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise ValueError(f"Parameter tidak dikenal untuk strategi '{self.key}': {sorted(unknown)}")
+        resolved = self.defaults()
+        for name, value in params.items():
+            cast = _CASTS.get(self.params[name].get('type'))
+            resolved[name] = cast(value) if cast and value is not None else value
+        return resolved
+
+    def apply(self, df, graph=None, **params):
+        """
+        apply_strategy(df). Dengan `graph` (indicators.graph.IndicatorGraph atas df yang sama),
+        indikator yang dideklarasikan strategi diambil dari graf bersama, bukan dihitung ulang.
+        """
+        keys = self.inputs(**params) if graph is not None else []
+        if not keys:
+            return self.module.apply_strategy(df, **self.resolve(params))
+        if graph.rows != len(df):
+            raise ValueError(f"Graf indikator ({graph.rows} bar) bukan untuk data ini ({len(df)} bar)")
+        return self.stream(**params).prime(df, inputs=graph.inputs(keys))
+
+    def stream(self, **params):
+        return self.module.StrategyStream(**self.resolve(params))
+
+    def inputs(self, **params):
+        """Node indikator bersama (indicator_inputs modul) untuk params ini; kosong jika tidak dideklarasikan."""
+        func = getattr(self.module, 'indicator_inputs', None)
+        return [tuple(key) for key in func(**self.resolve(params))] if func else []
+
+    def warmup(self, **params):
+        """
+        Jumlah bar histori yang dibutuhkan sebelum sinyal strategi valid.
+        None = state strategi bergantung seluruh histori (mis. SMC): tidak ada jumlah bar warm-up
+        yang cukup. Dashboard & batch menjalankannya mulai tanggal start yang dipilih (sinyalnya
+        bergantung tanggal itu); pemanggil yang sudah memegang histori lebih panjang
+        (walk-forward, dataset) menjalankannya dari awal data, bukan dari potongan `warmup` bar.
+        """
+        func = getattr(self.module, 'warmup_bars', None)
+        if func is None:
+            return 0
+        bars = func(**self.resolve(params))
+        return None if bars is None else int(bars)
+
+def warmup_start(start, bar, warmup):
+    """
+    Awal data yang perlu diambil untuk mulai trading di `start` (`bar` = durasi satu bar).
+    warmup None: mulai tepat di `start` (tanpa warm-up), jadi sinyal bergantung tanggal mulai.
+    """
+    import pandas as pd # Import di sini: registry tetap ringan
+
+    return pd.to_datetime(start) - (warmup or 0) * bar
+
+def _read_meta(path):
+    """Ambil literal STRATEGY = {...} dari file modul lewat AST (tanpa menjalankan modul)."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'STRATEGY' for t in node.targets):
+            return ast.literal_eval(node.value)
+    return None
+
+def discover(strategy_dir=STRATEGY_DIR, group=ENTRY_POINT_GROUP):
+    """Scan folder strategi + entry point plugin. Return {key: StrategySpec} (urut nama file)."""
+    found = {}
+    for filename in sorted(os.listdir(strategy_dir)):
+        if not filename.endswith('.py') or filename.startswith('_'):
+            continue
+        key = filename[:-3]
+        meta = _read_meta(os.path.join(strategy_dir, filename))
+        if meta is not None:
+            found[key] = StrategySpec(key, f"strategies.{key}", meta)
+
+    for ep in entry_points(group=group):
+        spec = importlib.util.find_spec(ep.value)
+        meta = _read_meta(spec.origin) if spec and spec.origin else None
+        if meta is not None and ep.name not in found:
+            found[ep.name] = StrategySpec(ep.name, ep.value, meta)
+    return found
+
+_REGISTRY = None
+
+def registry():
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = discover()
+    return _REGISTRY
+
+def get(name):
+    """Cari strategi lewat key modul ('supertrend') atau label tampilan ('Supertrend (Trend Follower)')."""
+    strategies = registry()
+    if name in strategies:
+        return strategies[name]
+    for spec in strategies.values():
+        if spec.label == name:
+            return spec
+    raise KeyError(f"Strategi tidak ditemukan: {name!r}. Tersedia: {sorted(strategies)}")
+
+def names():
+    return list(registry())
+
+def labels():
+    return [spec.label for spec in registry().values()]
+
+def apply_shared(df, strategies, graph=None):
+    """
+    Jalankan beberapa strategi atas df yang sama dengan satu graf indikator: tiap node
+    (RSI(14), TR, ATR(10), ...) dihitung sekali dan dibuang setelah konsumen terakhirnya
+    selesai. `strategies` = list nama atau (nama, params). Return list frame sinyal (urutan sama).
+    """
+    from indicators.graph import IndicatorGraph # Import di sini: registry tetap ringan tanpa indikator
+
+    items = [(item, {}) if isinstance(item, str) else item for item in strategies]
+    specs = [(get(name), params or {}) for name, params in items]
+    graph = graph or IndicatorGraph(df)
+    graph.plan([spec.inputs(**params) for spec, params in specs])
+    frames = []
+    for spec, params in specs:
+        frames.append(spec.apply(df, graph=graph, **params))
+        graph.release(spec.inputs(**params))
+    return frames
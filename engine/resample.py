@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from engine.candle_store import OHLCV_COLUMNS
+
+# Satu resolusi dasar per simbol; timeframe lain dibangun lokal dari sini.
+DEFAULT_BASE_TIMEFRAME = '15m'
+
+_MINUTE = 60 * 1000
+_DAY = 24 * 60 * _MINUTE
+_WEEK = 7 * _DAY
+_MONDAY = 4 * _DAY # Epoch (1970-01-01) hari Kamis; candle mingguan Binance mulai Senin 00:00 UTC
+
+_FIXED_UNITS = {'s': 1000, 'm': _MINUTE, 'h': 60 * _MINUTE, 'd': _DAY, 'w': _WEEK}
+
+# --- BUCKET ---
+
+def _parse(timeframe):
+    return int(timeframe[:-1]), timeframe[-1]
+
+def bucket_starts(ts, timeframe):
+    """
+    Timestamp awal candle `timeframe` (ms UTC) untuk tiap timestamp `ts`, selaras dengan
+    candle native Binance: jam/hari dari 00:00 UTC, minggu dari Senin, bulan kalender ('M').
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    n, unit = _parse(timeframe)
+    if unit == 'M':
+        months = ts.astype('datetime64[ms]').astype('datetime64[M]').astype(np.int64)
+        months -= months % n
+        return months.astype('datetime64[M]').astype('datetime64[ms]').astype(np.int64)
+    period = n * _FIXED_UNITS[unit]
+    offset = _MONDAY if unit == 'w' else 0
+    return ts - (ts - offset) % period
+
+def bucket_ends(starts, timeframe):
+    """Timestamp akhir (eksklusif, ms UTC) candle `timeframe` yang mulai di `starts`; 'M' = awal bulan berikutnya."""
+    starts = np.asarray(starts, dtype=np.int64)
+    n, unit = _parse(timeframe)
+    if unit == 'M':
+        months = starts.astype('datetime64[ms]').astype('datetime64[M]') + n
+        return months.astype('datetime64[ms]').astype(np.int64)
+    return starts + n * _FIXED_UNITS[unit]
+
+def can_resample(base_timeframe, timeframe):
+    """True jika setiap candle `timeframe` tepat tersusun dari candle `base_timeframe` utuh."""
+    base_n, base_unit = _parse(base_timeframe)
+    if base_unit not in _FIXED_UNITS:
+        return False
+    base_ms = base_n * _FIXED_UNITS[base_unit]
+    n, unit = _parse(timeframe)
+    if unit in ('w', 'M'):
+        # Batas minggu/bulan selalu jatuh di 00:00 UTC
+        return _DAY % base_ms == 0
+    target_ms = n * _FIXED_UNITS[unit]
+    return target_ms > base_ms and target_ms % base_ms == 0
+
+def derived_timeframe(timeframe, base_timeframe):
+    """Nama key CandleStore untuk series hasil resample, mis. '4h@15m'."""
+    return f"{timeframe}@{base_timeframe}"
+
+# --- AGREGASI ---
+
+def resample_ohlcv(ts, ohlcv, timeframe):
+    """
+    Agregasi OHLCV terurut ke `timeframe` (full vektor, tanpa groupby):
+    Open pertama, High max, Low min, Close terakhir, Volume dijumlah.
+    Return (bucket_ts int64 ms, ohlcv float64 [n, 5]). Bucket terakhir bisa belum lengkap
+    (sama seperti candle native yang masih berjalan).
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    if len(ts) == 0:
+        return ts, ohlcv.reshape(0, 5)
+    buckets = bucket_starts(ts, timeframe)
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.append(starts[1:], len(ts))
+
+    out = np.empty((len(starts), 5), dtype=np.float64)
+    out[:, 0] = ohlcv[starts, 0]
+    out[:, 1] = np.maximum.reduceat(ohlcv[:, 1], starts)
+    out[:, 2] = np.minimum.reduceat(ohlcv[:, 2], starts)
+    out[:, 3] = ohlcv[ends - 1, 3]
+    out[:, 4] = np.add.reduceat(ohlcv[:, 4], starts)
+    return buckets[starts], out
+
+def resample_frame(df, timeframe):
+    """Versi DataFrame (index Timestamp) dari resample_ohlcv."""
+    ts = df.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    bucket_ts, ohlcv = resample_ohlcv(ts, df[OHLCV_COLUMNS].to_numpy(dtype=np.float64), timeframe)
+    index = pd.DatetimeIndex(bucket_ts.astype('datetime64[ms]').astype('datetime64[ns]'), name='Timestamp')
+    return pd.DataFrame(ohlcv, index=index, columns=OHLCV_COLUMNS)
+
+# --- CACHE INKREMENTAL ---
+
+def update_resampled(store, exchange_id, symbol, base_timeframe, timeframe):
+    """
+    Perbarui series `timeframe` hasil resample dari base di CandleStore, lalu return
+    (timestamps, ohlcv). Hanya bucket terakhir yang tersimpan (mungkin belum lengkap)
+    dan bucket baru yang dihitung ulang; hitung penuh hanya saat belum ada cache
+    atau base diperluas ke belakang.
+    """
+    base = store.load(exchange_id, symbol, base_timeframe)
+    if base is None:
+        return None
+    base_ts, base_ohlcv = base
+    base_from, base_to = store.coverage(exchange_id, symbol, base_timeframe)
+
+    key = (exchange_id, symbol, derived_timeframe(timeframe, base_timeframe))
+    coverage = store.coverage(*key)
+    cached = store.load(*key) if coverage else None
+
+    if cached is None or len(cached[0]) == 0 or base_from < coverage[0]:
+        store.delete(*key)
+        ts, ohlcv = resample_ohlcv(base_ts, base_ohlcv, timeframe)
+    else:
+        pos = int(np.searchsorted(base_ts, cached[0][-1]))
+        ts, ohlcv = resample_ohlcv(base_ts[pos:], base_ohlcv[pos:], timeframe)
+        unchanged = (coverage[1] == base_to and len(ts) == 1 and ts[0] == cached[0][-1]
+                     and np.array_equal(ohlcv[0], cached[1][-1]))
+        if unchanged:
+            return cached
+
+    if len(ts) == 0:
+        return None
+    candles = np.column_stack([ts.astype(np.float64), ohlcv])
+    return store.merge(*key, candles, covered_from=base_from, covered_to=base_to)
+
+# --- PARITY vs CANDLE NATIVE ---
+
+def compare_native(native, resampled, rtol=1e-9):
+    """
+    Bandingkan candle native exchange vs hasil resample (DataFrame index Timestamp).
+    Return dict: bars (dibandingkan), missing (ada di native tapi tidak di resample),
+    extra, max_rel_diff per kolom, mismatched_bars (selisih relatif > rtol di kolom mana pun).
+    """
+    common = native.index.intersection(resampled.index)
+    a = native.loc[common, OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    b = resampled.loc[common, OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel = np.where(a == b, 0.0, np.abs(a - b) / np.maximum(np.abs(a), np.abs(b)))
+    return {
+        'bars': len(common),
+        'missing': len(native.index.difference(resampled.index)),
+        'extra': len(resampled.index.difference(native.index)),
+        'max_rel_diff': dict(zip(OHLCV_COLUMNS, rel.max(axis=0) if len(common) else np.zeros(5))),
+        'mismatched_bars': int((rel > rtol).any(axis=1).sum()),
+    }
+
+def check_parity(symbol, timeframes, start_date, base_timeframe=DEFAULT_BASE_TIMEFRAME, exchange=None, rtol=1e-9):
+    """
+    Ambil candle native tiap timeframe langsung dari exchange dan bandingkan dengan hasil
+    resample dari base. Bucket terakhir (masih berjalan) tidak ikut dibandingkan.
+    Return DataFrame satu baris per timeframe.
+    """
+    # Import di sini: data_loader sendiri memakai modul ini
+    from engine.data_loader import get_binance_data
+
+    base = get_binance_data(symbol, base_timeframe, start_date, exchange=exchange, use_cache=False)
+    if base.empty:
+        raise ValueError(f"Data {symbol} {base_timeframe} sejak {start_date} kosong")
+    rows = []
+    for timeframe in timeframes:
+        native = get_binance_data(symbol, timeframe, start_date, exchange=exchange, use_cache=False)
+        if native.empty:
+            native = pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='Timestamp'), dtype=np.float64)
+        resampled = resample_frame(base, timeframe)
+        # Bucket pertama base bisa terpotong start_date, bucket terakhir bisa masih berjalan
+        resampled = resampled.iloc[1:-1] if len(resampled) > 2 else resampled.iloc[0:0]
+        native = native.loc[(native.index >= resampled.index.min()) & (native.index <= resampled.index.max())] \
+            if len(resampled) else native.iloc[0:0]
+        stats = compare_native(native, resampled, rtol)
+        rows.append({'timeframe': timeframe, 'base': base_timeframe,
+                     **{k: v for k, v in stats.items() if k != 'max_rel_diff'},
+                     **{f"max_rel_{col.lower()}": v for col, v in stats['max_rel_diff'].items()}})
+    return pd.DataFrame(rows)
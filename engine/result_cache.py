@@ -0,0 +1,200 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+from engine.backtester import run_backtest
+from engine.candle_store import OHLCV_COLUMNS
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "crypto-backtester", "results")
+DEFAULT_MAX_BYTES = 1024 ** 3 # 1 GB
+DEFAULT_MEMORY_ITEMS = 32
+
+# Layer cache: output strategi (frame sinyal) & output backtest disimpan terpisah,
+# jadi ganti SL/TP saja tetap memakai frame sinyal yang sama.
+SIGNALS = 'signals'
+BACKTEST = 'backtest'
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _hash(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).view(np.uint8))
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        h.update(b'|')
+    return h.hexdigest()
+
+def frame_fingerprint(df, columns=OHLCV_COLUMNS):
+    """Hash isi slice OHLCV (index + kolom), bukan identitas objek: data sama -> key sama."""
+    index = df.index.to_numpy()
+    if index.dtype.kind == 'M':
+        index = index.astype('datetime64[ns]').view(np.int64)
+    values = df[columns].to_numpy(dtype=np.float64)
+    return _hash(list(columns), index, values)
+
+def _source_hash(paths):
+    h = hashlib.blake2b(digest_size=8)
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+_VERSIONS = {}
+
+def code_version(*relative_globs):
+    """Versi kode = hash source file (relatif root repo). Kode berubah -> cache lama otomatis tidak terpakai."""
+    if relative_globs not in _VERSIONS:
+        paths = [p for pattern in relative_globs for p in glob.glob(os.path.join(_PACKAGE_ROOT, pattern))]
+        _VERSIONS[relative_globs] = _source_hash(paths)
+    return _VERSIONS[relative_globs]
+
+def strategy_version(spec):
+    """Versi strategi: STRATEGY['version'] kalau ada, plus hash source modul & library indikator."""
+    module_path = os.path.relpath(spec.module.__file__, _PACKAGE_ROOT)
+    return f"{spec.version or ''}:{code_version(module_path, 'indicators/*.py')}"
+
+class ResultCache:
+    """
+    Cache hasil content-addressed dua tingkat:
+    - memori: LRU `memory_items` entri terakhir (per proses)
+    - disk  : satu file pickle per key di `root/<layer>/`, eviction LRU (mtime) saat
+              total ukuran melewati `max_bytes`.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, memory_items=DEFAULT_MEMORY_ITEMS):
+        self.root = root or os.getenv("BACKTESTER_RESULT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {'memory': 0, 'disk': 0, 'miss': 0}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, layer, key):
+        return os.path.join(self.root, layer, f"{key}.pkl")
+
+    def _remember(self, layer, key, value):
+        if self.memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[(layer, key)] = value
+            self._memory.move_to_end((layer, key))
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, layer, key):
+        """Return (found, value). Cek memori dulu, lalu disk (hasil disk dinaikkan ke memori)."""
+        with self._lock:
+            if (layer, key) in self._memory:
+                self._memory.move_to_end((layer, key))
+                self.hits['memory'] += 1
+                return True, self._memory[(layer, key)]
+
+        path = self._path(layer, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.hits['miss'] += 1
+            return False, None
+        os.utime(path) # Tandai baru diakses (LRU disk)
+        self.hits['disk'] += 1
+        self._remember(layer, key, value)
+        return True, value
+
+    def put(self, layer, key, value):
+        self._remember(layer, key, value)
+        path = self._path(layer, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def get_or_compute(self, layer, key, compute):
+        """Return (value, hit). compute() hanya dipanggil kalau key belum ada di dua tingkat cache."""
+        found, value = self.get(layer, key)
+        if found:
+            return value, True
+        value = compute()
+        self.put(layer, key, value)
+        return value, False
+
+    def _entries(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.root, '*', '*.pkl')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        """Hapus file yang paling lama tidak diakses sampai total ukuran <= max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for _, _, path in self._entries():
+            os.remove(path)
+
+# --- PIPELINE ---
+
+def signals_key(df, spec, params):
+    return _hash(SIGNALS, frame_fingerprint(df), spec.key, strategy_version(spec), spec.resolve(params))
+
+def cached_signals(cache, df, spec, params=None):
+    """Frame sinyal spec.apply(df, **params), dari cache kalau data + strategi + param sama. Return (df_s, hit)."""
+    params = params or {}
+    key = signals_key(df, spec, params)
+    return cache.get_or_compute(SIGNALS, key, lambda: spec.apply(df, **params))
+
+def backtest_key(df_s, initial_capital, sl_pct, tp_pct, **execution):
+    # Backtest hanya membaca Close & Signal (+ Open/High/Low untuk SL/TP intrabar), jadi cukup kolom itu yang di-hash
+    index = df_s.index.to_numpy()
+    if index.dtype.kind == 'M':
+        index = index.astype('datetime64[ns]').view(np.int64)
+    columns = ['Close', 'Signal'] + (['Open', 'High', 'Low'] if execution.get('intrabar') else [])
+    drill_down = execution.pop('drill_down', None)
+    if drill_down is not None:
+        execution['drill_down'] = drill_down.fingerprint()
+    return _hash(BACKTEST, code_version('engine/backtester.py', 'engine/results.py', 'engine/intrabar.py'), index,
+                 *(df_s[col].to_numpy(dtype=np.float64) for col in columns),
+                 float(initial_capital), float(sl_pct), float(tp_pct), sorted(execution.items()))
+
+def cached_backtest(cache, df_s, initial_capital=1000, sl_pct=0.0, tp_pct=0.0, **execution):
+    """
+    run_backtest dengan cache (key = isi Close/Signal + SL/TP + modal + opsi eksekusi
+    seperti fee_pct / allow_short / max_positions). Return (results, hit).
+    """
+    key = backtest_key(df_s, initial_capital, sl_pct, tp_pct, **execution)
+    results, hit = cache.get_or_compute(BACKTEST, key,
+                                        lambda: run_backtest(df_s, initial_capital=initial_capital, sl_pct=sl_pct,
+                                                             tp_pct=tp_pct, **execution))
+    # Hasil dari disk di-pickle tanpa frame input: pasang lagi supaya view 'dataframe' tetap tersedia
+    if results.frame is None:
+        results.frame = df_s
+    return results, hit
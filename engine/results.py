@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+# --- ALASAN TRADE ---
+# Disimpan sebagai kode int8 di record trade; teks hanya dibuat saat view DataFrame diminta.
+REASON_BUY = 'Signal Buy (Strategy)'
+REASON_SL = 'Stop Loss (SL)'
+REASON_TP = 'Take Profit (TP)'
+REASON_SIGNAL = 'Signal Sell (Strategy)'
+REASON_SHORT = 'Signal Short (Strategy)'
+REASON_COVER = 'Signal Cover (Strategy)'
+
+EXIT_SIGNAL, EXIT_SL, EXIT_TP = 0, 1, 2
+EXIT_REASONS = np.array([REASON_SIGNAL, REASON_SL, REASON_TP], dtype=object)
+SHORT_EXIT_REASONS = np.array([REASON_COVER, REASON_SL, REASON_TP], dtype=object)
+
+# Satu record = satu trade (entry + exit). exit_bar = -1 & exit_price/return = NaN jika masih terbuka.
+# entry/exit_price = harga fill (sudah termasuk slippage), return = bersih setelah fee.
+# side: 1 = long, -1 = short; slot: index posisi saat pyramiding (0 = posisi pertama).
+TRADE_DTYPE = np.dtype([
+    ('entry_bar', np.int64),
+    ('exit_bar', np.int64),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('reason', np.int8),
+    ('return', np.float64),
+    ('side', np.int8),
+    ('slot', np.int16),
+])
+
+def exit_reason_names(reason, side):
+    """Teks alasan exit per trade (exit sinyal posisi short = 'Cover')."""
+    return np.where(side > 0, EXIT_REASONS[reason], SHORT_EXIT_REASONS[reason])
+
+class TradeLog:
+    """
+    Trade log kolumnar: structured array TRADE_DTYPE + referensi index & equity
+    (bukan salinan). Tabel BUY/SELL lama dibangun lewat to_frame() saat dibutuhkan saja.
+    """
+    __slots__ = ('records', 'index', 'equity')
+
+    def __init__(self, records, index, equity):
+        self.records = records
+        self.index = index
+        self.equity = equity
+
+    @classmethod
+    def from_arrays(cls, index, close, equity, entries, exits, reasons, exit_prices):
+        records = np.empty(len(entries), dtype=TRADE_DTYPE)
+        records['entry_bar'] = entries
+        records['exit_bar'] = exits
+        records['entry_price'] = close[np.asarray(entries, dtype=np.int64)]
+        records['exit_price'] = exit_prices
+        records['reason'] = reasons
+        records['return'] = (records['exit_price'] - records['entry_price']) / records['entry_price']
+        records['side'] = 1
+        records['slot'] = 0
+        return cls(records, index, equity)
+
+    def __len__(self):
+        return len(self.records)
+
+    def n_rows(self):
+        """Jumlah baris to_frame() (entry + exit) tanpa membangun tabelnya; sama dengan len(trade_log) lama."""
+        return len(self.records) + int((self.records['exit_bar'] >= 0).sum())
+
+    @property
+    def closed(self):
+        return self.records[self.records['exit_bar'] >= 0]
+
+    def closed_returns(self):
+        """Return desimal trade tertutup (presisi penuh)."""
+        return self.closed['return']
+
+    def to_frame(self):
+        """
+        Tabel entry/exit per baris, urut waktu (format trade log lama, kolom berbahasa Indonesia).
+        Long: BUY -> SELL, short: SHORT -> COVER. Kolom 'Slot' hanya ada jika ada pyramiding.
+        """
+        records = self.records
+        if len(records) == 0:
+            return pd.DataFrame()
+
+        closed = records['exit_bar'] >= 0
+        entries = records['entry_bar']
+        exits = records['exit_bar'][closed]
+        long_entry = records['side'] > 0
+        long_exit = long_entry[closed]
+
+        # Baris entry dulu lalu exit, kemudian diurutkan per bar (exit sebelum entry di bar yang sama)
+        n_entry = len(records)
+        n_rows = n_entry + int(closed.sum())
+        bars = np.concatenate([entries, exits])
+        tipe = np.concatenate([np.where(long_entry, 'BUY', 'SHORT'), np.where(long_exit, 'SELL', 'COVER')]).astype(object)
+        harga = np.concatenate([records['entry_price'], records['exit_price'][closed]])
+        alasan = np.concatenate([np.where(long_entry, REASON_BUY, REASON_SHORT).astype(object),
+                                 exit_reason_names(records['reason'][closed], records['side'][closed])])
+        pnl = np.zeros(n_rows, dtype=np.float64)
+        pnl[n_entry:] = np.round(records['return'][closed] * 100, 2)
+        saldo = self.equity[bars]
+        slot = np.concatenate([records['slot'], records['slot'][closed]])
+
+        is_exit = np.arange(n_rows) >= n_entry
+        order = np.lexsort((~is_exit, bars))
+
+        frame = pd.DataFrame({
+            'Tanggal': self.index[bars[order]],
+            'Tipe': tipe[order],
+            'Harga': harga[order],
+            'Alasan': alasan[order],
+            'Profit/Loss %': pnl[order],
+            'Saldo Akhir': np.round(saldo[order], 2)
+        })
+        if slot.max() > 0:
+            frame['Slot'] = slot[order]
+        return frame
+
+class BacktestResult:
+    """
+    Hasil run_backtest yang ramping: metrik ringkasan, equity & drawdown (float64 per bar,
+    berbagi index dengan frame input) dan TradeLog. View pandas (equity_curve, trade_log,
+    dataframe) dibuat saat pertama diakses lalu disimpan; tidak ikut di-pickle.
+
+    Tetap bisa dibaca seperti dict lama: res['total_return_pct'], res.get('trade_log').
+    """
+    __slots__ = ('total_return_pct', 'max_drawdown_pct', 'win_rate', 'index', 'equity',
+                 'drawdown', 'trades', 'frame', '_views')
+
+    KEYS = ('total_return_pct', 'max_drawdown_pct', 'win_rate', 'equity_curve', 'dataframe', 'trade_log')
+
+    def __init__(self, frame, equity, trades, initial_capital, drawdown=None):
+        self.frame = frame # Referensi frame input (tanpa copy), hanya untuk view 'dataframe'
+        self.index = frame.index
+        self.equity = equity
+        self.trades = trades
+        self._views = {}
+
+        if drawdown is None:
+            running_max = np.maximum.accumulate(equity)
+            drawdown = (equity - running_max) / running_max
+        self.drawdown = drawdown # Backtest per blok menghitungnya sambil jalan (engine.chunked)
+
+        self.total_return_pct = (equity[-1] / initial_capital - 1) * 100
+        self.max_drawdown_pct = self.drawdown.min() * 100
+
+        # Win rate hanya dari trade tertutup, menang = P/L % (dibulatkan 2 desimal) > 0
+        returns = trades.closed_returns()
+        self.win_rate = (np.round(returns * 100, 2) > 0).mean() * 100 if len(returns) else 0.0
+
+    # --- VIEW PANDAS (LAZY) ---
+
+    def _view(self, name, build):
+        if name not in self._views:
+            self._views[name] = build()
+        return self._views[name]
+
+    @property
+    def equity_curve(self):
+        return self._view('equity_curve', lambda: pd.Series(self.equity, index=self.index, name='Equity_Curve', copy=False))
+
+    @property
+    def trade_log(self):
+        return self._view('trade_log', self.trades.to_frame)
+
+    @property
+    def dataframe(self):
+        """Frame input + kolom Equity_Curve & Drawdown (format lama). Ini satu-satunya view yang menyalin candle."""
+        if self.frame is None:
+            raise ValueError("Frame input tidak tersedia (hasil dimuat dari cache); pakai equity_curve / trade_log")
+        return self._view('dataframe', lambda: self.frame.assign(Equity_Curve=self.equity, Drawdown=self.drawdown))
+
+    # --- KOMPATIBILITAS DICT ---
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        return self[key] if key in self.KEYS else default
+
+    def keys(self):
+        return list(self.KEYS)
+
+    # --- PICKLE (cache hasil): tanpa frame input & view ---
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ('frame', '_views')}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.frame = None
+        self._views = {}
+
+    def nbytes(self):
+        """Perkiraan memori array hasil (tanpa frame input & view)."""
+        return self.equity.nbytes + self.drawdown.nbytes + self.trades.records.nbytes
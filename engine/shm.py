@@ -0,0 +1,33 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+def share_arrays(arrays):
+    """
+    Salin dict {nama: ndarray} ke shared memory.
+    Return (spec, segments): spec kecil & picklable untuk dikirim ke worker,
+    segments wajib di-close + unlink oleh pemilik setelah selesai.
+    """
+    spec = {}
+    segments = []
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+        segments.append(shm)
+    return spec, segments
+
+def attach_arrays(spec):
+    """Buka array dari spec share_arrays tanpa menyalin data. Segments harus tetap direferensikan."""
+    arrays = {}
+    segments = []
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        segments.append(shm)
+    return arrays, segments
+
+def release(segments):
+    for shm in segments:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from engine.backtester import run_backtest
+from engine.optimizer import run_sweep, _share_frame, _attach_frame, _WORKER
+from engine.shm import release
+from engine import registry
+
+# --- FOLD ---
+
+def make_folds(n_bars, train_bars, test_bars, step_bars=None, anchored=False):
+    """
+    Bagi [0, n_bars) jadi fold walk-forward (posisi bar):
+    (train_start, train_end, test_start, test_end), end eksklusif, test = tepat setelah train.
+    Rolling: jendela train bergeser `step_bars` (default = test_bars).
+    Anchored: train selalu mulai dari bar 0 dan terus memanjang.
+    """
+    step_bars = step_bars or test_bars
+    folds = []
+    train_start, train_end = 0, train_bars
+    while train_end < n_bars:
+        test_end = min(train_end + test_bars, n_bars)
+        folds.append((0 if anchored else train_start, train_end, train_end, test_end))
+        train_start += step_bars
+        train_end += step_bars
+    return folds
+
+def oos_signals(df, spec, params, test_start, test_end):
+    """
+    Frame sinyal jendela test [test_start, test_end). Strategi dijalankan dari bar 0, jadi
+    state yang dibawa dari histori (swing & Order Block SMC, arah Supertrend, EMA) sama
+    dengan satu run penuh: sinyal OOS yang disambung antar fold = sinyal seluruh histori.
+    """
+    return spec.apply(df.iloc[:test_end], **params).iloc[test_start:]
+
+def _run_fold(fold, space, sl_values, tp_values, method, n_iter, initial_capital, seed, df=None):
+    """
+    Satu fold: optimasi parameter + SL/TP di jendela train, lalu jalankan pemenangnya
+    di jendela test (sinyal lewat oos_signals, state strategi dari awal data).
+    """
+    if df is None:
+        df = _WORKER['df']
+    train_start, train_end, test_start, test_end = fold
+
+    ranked = run_sweep(df.iloc[train_start:train_end], space, sl_values, tp_values, method=method,
+                       n_iter=n_iter, max_workers=1, seed=seed)
+    best = ranked.iloc[0]
+
+    df_s = oos_signals(df, registry.get(best['strategy']), best['params'], test_start, test_end)
+    oos = run_backtest(df_s, initial_capital=initial_capital, sl_pct=best['sl_pct'], tp_pct=best['tp_pct'])
+
+    return {
+        'train_start': df.index[train_start],
+        'train_end': df.index[train_end - 1],
+        'test_start': df.index[test_start],
+        'test_end': df.index[test_end - 1],
+        'strategy': best['strategy'],
+        'params': best['params'],
+        'sl_pct': best['sl_pct'],
+        'tp_pct': best['tp_pct'],
+        'is_return_pct': best['total_return_pct'],
+        'is_max_drawdown_pct': best['max_drawdown_pct'],
+        'oos_return_pct': oos['total_return_pct'],
+        'oos_max_drawdown_pct': oos['max_drawdown_pct'],
+        'oos_win_rate': oos['win_rate'],
+    }, oos['equity_curve'], oos['trade_log']
+
+# --- ENTRY POINT ---
+
+def walk_forward(df, space, train_bars, test_bars, step_bars=None, anchored=False,
+                 sl_values=(0.0,), tp_values=(0.0,), method="grid", n_iter=50,
+                 initial_capital=1000, max_workers=None, seed=None):
+    """
+    Walk-forward analysis: tiap fold dioptimasi (run_sweep) di train lalu diuji
+    out-of-sample di test. Fold independen, dijalankan paralel di process pool
+    (OHLCV dibagi lewat shared memory seperti optimizer).
+
+    Return dict: folds (DataFrame per fold), equity (kurva OOS tersambung),
+    trade_log (semua trade OOS + kolom 'Fold'), total_return_pct, max_drawdown_pct,
+    win_rate, efficiency (rata-rata return OOS / rata-rata return IS).
+    """
+    folds = make_folds(len(df), train_bars, test_bars, step_bars, anchored)
+    if not folds:
+        raise ValueError("Data terlalu pendek untuk satu fold train + test")
+    seeds = [None if seed is None else seed + i for i in range(len(folds))]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(folds))
+
+    if max_workers > 1:
+        spec, segments = _share_frame(df)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_frame, initargs=(spec,)) as pool:
+                futures = [pool.submit(_run_fold, fold, space, sl_values, tp_values, method, n_iter,
+                                       initial_capital, s) for fold, s in zip(folds, seeds)]
+                results = [f.result() for f in futures]
+        finally:
+            release(segments)
+    else:
+        results = [_run_fold(fold, space, sl_values, tp_values, method, n_iter, initial_capital, s, df=df)
+                   for fold, s in zip(folds, seeds)]
+
+    # Sambung kurva equity OOS: tiap fold mulai dari saldo akhir fold sebelumnya
+    pieces, logs = [], []
+    capital = initial_capital
+    for i, (_, equity, log) in enumerate(results):
+        scale = capital / initial_capital
+        pieces.append(equity * scale)
+        capital = pieces[-1].iloc[-1]
+        if len(log):
+            log = log.copy()
+            log['Saldo Akhir'] = (log['Saldo Akhir'] * scale).round(2)
+            log.insert(0, 'Fold', i)
+            logs.append(log)
+    equity = pd.concat(pieces)
+    trade_log = pd.concat(logs, ignore_index=True) if logs else pd.DataFrame()
+
+    drawdown = (equity - equity.cummax()) / equity.cummax()
+    closed = trade_log[trade_log['Tipe'] == 'SELL'] if len(trade_log) else trade_log
+    win_rate = (closed['Profit/Loss %'] > 0).mean() * 100 if len(closed) else 0.0
+
+    table = pd.DataFrame([r[0] for r in results])
+    table.insert(0, 'fold', np.arange(len(table)))
+    is_mean = table['is_return_pct'].mean()
+
+    return {
+        'folds': table,
+        'equity': equity,
+        'trade_log': trade_log,
+        'total_return_pct': (equity.iloc[-1] / initial_capital - 1) * 100,
+        'max_drawdown_pct': drawdown.min() * 100,
+        'win_rate': win_rate,
+        'efficiency': table['oos_return_pct'].mean() / is_mean if is_mean else np.nan,
+    }
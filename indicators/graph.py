@@ -0,0 +1,153 @@
+from collections import OrderedDict
+import numpy as np
+from indicators.moving import SMA, RollingStd, EMA
+from indicators.momentum import RSI, ADX
+from indicators.volatility import ATR, Supertrend, true_range
+
+# Graf indikator bersama: strategi mendeklarasikan node input (indicator_inputs di modulnya,
+# mis. [('RSI', 14), ('EMA', 200)]), planner menghitung tiap node distinct sekali per
+# dataset lalu membagikannya ke semua konsumen. Node = tuple (jenis, *parameter).
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2 # Batas memori cache node per graf
+
+SOURCES = ('Open', 'High', 'Low', 'Close', 'Volume') # Node sumber: ('Close',) = kolom candle
+HIGH, LOW, CLOSE = ('High',), ('Low',), ('Close',)
+TR = ('TR',)
+
+# --- DEFINISI NODE ---
+# jenis: (parents(*param) -> list node, compute(*nilai parent, *param) -> array / dict array)
+
+NODES = {
+    'TR': (lambda: [HIGH, LOW, CLOSE], true_range),
+    'ATR': (lambda period: [HIGH, LOW, CLOSE, TR],
+            lambda h, l, c, tr, period: ATR(period).bulk(h, l, c, tr=tr)),
+    'Supertrend': (lambda period, multiplier: [HIGH, LOW, CLOSE, ('ATR', period)],
+                   lambda h, l, c, atr, period, multiplier: Supertrend(period, multiplier).bulk(h, l, c, atr=atr)),
+    'ADX': (lambda period: [HIGH, LOW, CLOSE, TR],
+            lambda h, l, c, tr, period: ADX(period).bulk(h, l, c, tr=tr)),
+    'RSI': (lambda period: [CLOSE], lambda c, period: RSI(period).bulk(c)),
+    'EMA': (lambda span: [CLOSE], lambda c, span: EMA(span).bulk(c)),
+    'SMA': (lambda period: [CLOSE], lambda c, period: SMA(period).bulk(c)),
+    'STD': (lambda period: [CLOSE], lambda c, period: RollingStd(period).bulk(c)),
+}
+
+def parents(key):
+    """Node parent langsung dari `key` (node sumber tidak punya parent)."""
+    kind, *params = key
+    if kind in SOURCES:
+        return []
+    if kind not in NODES:
+        raise KeyError(f"Node indikator tidak dikenal: {key!r}. Tersedia: {sorted(NODES)}")
+    return NODES[kind][0](*params)
+
+def _nbytes(value):
+    if isinstance(value, dict):
+        return sum(v.nbytes for v in value.values())
+    return value.nbytes
+
+def _freeze(value):
+    """Array node dibagi ke banyak konsumen: dibuat read-only supaya tidak bisa diubah di tempat."""
+    for array in (value.values() if isinstance(value, dict) else [value]):
+        array.flags.writeable = False
+    return value
+
+# --- GRAF PER DATASET ---
+
+class IndicatorGraph:
+    """
+    Cache node indikator untuk satu dataset (`candles` = DataFrame / dict kolom OHLCV).
+    Node dihitung saat pertama diminta (parent dulu) lalu disimpan:
+    - plan(): daftarkan input semua konsumen -> tiap node dibuang begitu konsumen
+      terakhirnya selesai (release) atau node anaknya sudah dihitung.
+    - tanpa plan (mis. worker optimizer): node disimpan sampai tergeser LRU.
+    Total ukuran node tersimpan dibatasi `max_bytes` (LRU); node yang tergeser dihitung ulang
+    kalau diminta lagi, jadi batas memori tidak mengubah hasil.
+    """
+
+    def __init__(self, candles, max_bytes=DEFAULT_MAX_BYTES):
+        self.candles = candles
+        self.rows = len(candles['Close'])
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._refs = {} # Sisa konsumen terencana per node
+        self._pending = set() # Node terencana yang belum dihitung (sudah tercatat sebagai konsumen parent-nya)
+        self.stats = {'computed': 0, 'hits': 0, 'evicted': 0}
+
+    def __repr__(self):
+        return f"IndicatorGraph(rows={self.rows}, nodes={len(self._cache)}, bytes={self.nbytes()})"
+
+    def nbytes(self):
+        return sum(_nbytes(value) for value in self._cache.values())
+
+    def plan(self, requests):
+        """
+        `requests` = list input per konsumen (list node). Return urutan topologis node distinct
+        (parent sebelum anak) dan catat jumlah konsumen tiap node untuk release().
+        """
+        order, seen = [], set()
+
+        def visit(key):
+            if key in seen:
+                return
+            seen.add(key)
+            for parent in parents(key):
+                visit(parent)
+            order.append(key)
+
+        for keys in requests:
+            for key in keys:
+                visit(tuple(key))
+                self._refs[tuple(key)] = self._refs.get(tuple(key), 0) + 1
+        for key in order:
+            if key[0] not in SOURCES and key not in self._cache and key not in self._pending:
+                self._pending.add(key)
+                for parent in parents(key):
+                    if parent[0] not in SOURCES:
+                        self._refs[parent] = self._refs.get(parent, 0) + 1
+        return order
+
+    def get(self, key):
+        key = tuple(key)
+        kind, *params = key
+        if kind in SOURCES:
+            return np.asarray(self.candles[kind], dtype=np.float64) # View kolom, tidak disimpan
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._cache[key]
+
+        inputs = [self.get(parent) for parent in parents(key)]
+        value = _freeze(NODES[kind][1](*inputs, *params))
+        self.stats['computed'] += 1
+        if key in self._pending:
+            # Node anak sudah ada: parent yang tidak dibutuhkan konsumen lain boleh dibuang
+            self._pending.discard(key)
+            self.release(parents(key))
+        self._cache[key] = value
+        self._evict(keep=key)
+        return value
+
+    def inputs(self, keys):
+        """Dict {node: nilai} untuk argumen `inputs` StrategyStream.compute()."""
+        return {tuple(key): self.get(key) for key in keys}
+
+    def release(self, keys):
+        """Satu konsumen selesai memakai `keys`: node terencana tanpa sisa konsumen dibuang."""
+        for key in keys:
+            key = tuple(key)
+            if key not in self._refs:
+                continue
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                self._cache.pop(key, None)
+
+    def _evict(self, keep=None):
+        total = self.nbytes()
+        for key in list(self._cache):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= _nbytes(self._cache.pop(key))
+            self.stats['evicted'] += 1
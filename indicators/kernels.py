@@ -0,0 +1,317 @@
+import os
+import math
+import numpy as np
+
+# Numba opsional: kalau tidak terpasang (atau BACKTESTER_NO_NUMBA=1), kernel di bawah
+# jalan sebagai fungsi Python biasa atas array NumPy (= versi referensi).
+try:
+    if os.environ.get('BACKTESTER_NO_NUMBA'):
+        raise ImportError
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+def _jit(func):
+    """Compile dengan Numba (cache di disk, tanpa fastmath supaya bit-identik), selain itu apa adanya."""
+    if HAS_NUMBA:
+        return njit(cache=True)(func)
+    return func
+
+def hold_state(raw, initial=0):
+    """
+    Ffill posisi: 1 = long, -1 = short (backtester long-only: keluar/cash), 0 = pertahankan posisi sebelumnya.
+    `initial` = posisi sebelum bar pertama (lanjutan dari blok sebelumnya).
+    """
+    return _hold_state(np.ascontiguousarray(raw, dtype=np.int64), initial)
+
+@_jit
+def _hold_state(raw, initial):
+    out = np.zeros(len(raw), dtype=np.int64)
+    current_signal = initial
+    for i in range(len(raw)):
+        if raw[i] != 0:
+            current_signal = raw[i]
+        out[i] = current_signal
+    return out
+
+@_jit
+def wilder_recurrence(series, res, period):
+    """res[i] = res[i-1] - res[i-1]/period + series[i] untuk i >= period (res[period-1] sudah diisi)."""
+    for i in range(period, len(series)):
+        res[i] = res[i-1] - (res[i-1] / period) + series[i]
+    return res
+
+# --- ROLLING & EWM BERSTATE (BISA DILANJUTKAN PER BLOK) ---
+# State disimpan di array kecil & di-update in-place, jadi memproses data per blok
+# memberi hasil bit-identik dengan satu kali proses atas seluruh data.
+
+@_jit
+def rolling_mean(values, tail, period, state, out):
+    """
+    Rolling mean dengan rekurensi yang sama persis dengan pandas rolling(period).mean()
+    (jumlah berjalan Kahan terpisah untuk tambah & buang). tail = nilai sebelum blok
+    (maks `period` terakhir). state = [sum, comp_add, comp_remove, nobs, neg_ct, same_ct, prev_value].
+    """
+    sum_x, comp_add, comp_remove = state[0], state[1], state[2]
+    nobs, neg_ct, same_ct, prev_value = state[3], state[4], state[5], state[6]
+    n_tail = len(tail)
+    for i in range(len(values)):
+        # Buang nilai yang keluar window dulu, baru tambah yang masuk (urutan pandas)
+        j = i - period
+        if j >= 0 or n_tail + j >= 0:
+            old = values[j] if j >= 0 else tail[n_tail + j]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    neg_ct -= 1
+        val = values[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, val) < 0:
+                neg_ct += 1
+            same_ct = same_ct + 1 if val == prev_value else 1
+            prev_value = val
+
+        if nobs >= period and nobs > 0:
+            result = sum_x / nobs
+            if same_ct >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+
+    state[0], state[1], state[2] = sum_x, comp_add, comp_remove
+    state[3], state[4], state[5], state[6] = nobs, neg_ct, same_ct, prev_value
+    return out
+
+@_jit
+def rolling_std(values, tail, period, state, out):
+    """
+    Rolling std (ddof=1) lewat Welford + kompensasi Kahan, rekurensi yang sama dengan
+    pandas rolling(period).std(). state = [mean, ssqdm, nobs, comp_add, comp_remove].
+    """
+    mean_x, ssqdm_x, nobs, comp_add, comp_remove = state[0], state[1], state[2], state[3], state[4]
+    n_tail = len(tail)
+    for i in range(len(values)):
+        j = i - period
+        if j >= 0 or n_tail + j >= 0:
+            old = values[j] if j >= 0 else tail[n_tail + j]
+            if old == old:
+                nobs -= 1
+                if nobs:
+                    prev_mean = mean_x - comp_remove
+                    y = old - comp_remove
+                    t = y - mean_x
+                    comp_remove = t + mean_x - y
+                    mean_x = mean_x - t / nobs
+                    ssqdm_x = ssqdm_x - (old - prev_mean) * (old - mean_x)
+                else:
+                    mean_x = 0.0
+                    ssqdm_x = 0.0
+        val = values[i]
+        if val == val:
+            nobs += 1
+            prev_mean = mean_x - comp_add
+            y = val - comp_add
+            t = y - mean_x
+            comp_add = t + mean_x - y
+            mean_x = mean_x + t / nobs
+            ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+
+        if nobs >= period and nobs > 1:
+            var = ssqdm_x / (nobs - 1.0)
+            out[i] = math.sqrt(var) if var > 0 else 0.0
+        else:
+            out[i] = np.nan
+
+    state[0], state[1], state[2], state[3], state[4] = mean_x, ssqdm_x, nobs, comp_add, comp_remove
+    return out
+
+@_jit
+def ewm_recurrence(values, alpha, adjust, min_periods, state, out):
+    """Lanjutan EWM.update() atas array (rekurensi pandas ewm().mean()). state = [weighted, old_wt, nobs]."""
+    weighted, old_wt, nobs = state[0], state[1], state[2]
+    new_wt = 1.0 if adjust else alpha
+    for i in range(len(values)):
+        x = values[i]
+        is_obs = x == x
+        if weighted != weighted:
+            if is_obs:
+                weighted = x
+                old_wt = 1.0
+                nobs = 1.0
+        else:
+            old_wt *= 1.0 - alpha
+            if is_obs:
+                nobs += 1
+                if weighted != x:
+                    weighted = (old_wt * weighted + new_wt * x) / (old_wt + new_wt)
+                old_wt = old_wt + new_wt if adjust else 1.0
+        out[i] = weighted if nobs >= min_periods else np.nan
+    state[0], state[1], state[2] = weighted, old_wt, nobs
+    return out
+
+@_jit
+def supertrend_bands(basic_upper, basic_lower, close, first_trend):
+    """
+    Final band, Supertrend & arah tren (sama dengan Supertrend._final_bands / _direction).
+    Bar 0 dipakai apa adanya (band final = band dasar, arah = first_trend), jadi blok
+    lanjutan cukup diawali bar terakhir blok sebelumnya.
+    """
+    n = len(close)
+    final_upper = np.zeros(n)
+    final_lower = np.zeros(n)
+    supertrend = np.zeros(n)
+    trend_dir = np.ones(n, dtype=np.int64)
+    if n:
+        trend_dir[0] = first_trend
+
+    for i in range(n):
+        if i == 0:
+            final_upper[i] = basic_upper[i]
+            final_lower[i] = basic_lower[i]
+            continue
+        if (basic_upper[i] < final_upper[i-1]) or (close[i-1] > final_upper[i-1]):
+            final_upper[i] = basic_upper[i]
+        else:
+            final_upper[i] = final_upper[i-1]
+        if (basic_lower[i] > final_lower[i-1]) or (close[i-1] < final_lower[i-1]):
+            final_lower[i] = basic_lower[i]
+        else:
+            final_lower[i] = final_lower[i-1]
+
+    for i in range(1, n):
+        if trend_dir[i-1] == 1:
+            trend_dir[i] = -1 if close[i] < final_lower[i] else 1
+        else:
+            trend_dir[i] = 1 if close[i] > final_upper[i] else -1
+        supertrend[i] = final_lower[i] if trend_dir[i] == 1 else final_upper[i]
+
+    return final_upper, final_lower, supertrend, trend_dir
+
+# Order Block SMC: obs[:n_live] = [top, bottom, seq] terurut menurut bottom (sama dengan
+# smc.OrderBlockBook). Mitigasi hanya menscan OB dengan bottom di [lower - tinggi OB maks, upper]
+# lewat binary search, bukan semua OB hidup (di pasar trending bisa ribuan).
+
+@_jit
+def _bisect_bottom(obs, lo, hi, x, right):
+    """Posisi sisip x di obs[lo:hi, 1] (bisect_right jika right, selain itu bisect_left)."""
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if obs[mid, 1] < x or (right and obs[mid, 1] == x):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+@_jit
+def _add_ob(obs, n_live, top, bottom, seq):
+    """Sisipkan OB ke obs[:n_live] (setelah OB dengan bottom sama). Return n_live baru."""
+    k = _bisect_bottom(obs, 0, n_live, bottom, True)
+    for j in range(n_live, k, -1):
+        obs[j, 0], obs[j, 1], obs[j, 2] = obs[j - 1, 0], obs[j - 1, 1], obs[j - 1, 2]
+    obs[k, 0], obs[k, 1], obs[k, 2] = top, bottom, seq
+    return n_live + 1
+
+@_jit
+def _take_obs(obs, n_live, upper, lower, max_height):
+    """
+    Buang OB dengan bottom <= upper dan top >= lower dari obs[:n_live] (compact in-place).
+    max_height = batas atas top - bottom OB hidup. Return (n_live, seq terbesar / -1).
+    """
+    hi = _bisect_bottom(obs, 0, n_live, upper, True)
+    # top >= lower butuh bottom >= lower - tinggi; kelonggaran kecil untuk pembulatan top - bottom
+    lo = _bisect_bottom(obs, 0, hi, lower - max_height - 1e-9 * abs(lower), False)
+    hit = -1.0
+    keep = lo
+    for k in range(lo, hi):
+        if obs[k, 0] >= lower:
+            if obs[k, 2] > hit:
+                hit = obs[k, 2]
+        else:
+            if keep != k:
+                obs[keep, 0], obs[keep, 1], obs[keep, 2] = obs[k, 0], obs[k, 1], obs[k, 2]
+            keep += 1
+    removed = hi - keep
+    if removed:
+        for k in range(hi, n_live):
+            obs[k - removed, 0], obs[k - removed, 1], obs[k - removed, 2] = obs[k, 0], obs[k, 1], obs[k, 2]
+    return n_live - removed, hit
+
+@_jit
+def smc_scan(o, h, l, c, is_swing_high, is_swing_low, swing_length, start, base, state, last_red, last_green,
+             bull_obs, bear_obs, n_obs, holding):
+    """
+    Loop utama smc.StrategyStream._step atas array mentah, mulai dari index `start`
+    (bar sebelumnya = ekor blok lalu, hanya untuk cek swing). Index global bar i = base + i.
+    state = [swing_high_price, swing_low_price, swing_high_idx, swing_low_idx, signal, prev_close, ob_seq],
+    last_red / last_green = [idx, high, low] (idx -1 = belum ada),
+    bull_obs / bear_obs = OB hidup [top, bottom, seq] terurut menurut bottom, jumlah di n_obs[0] / n_obs[1].
+    Semua state di-update in-place; holding[i - start] = posisi bar i.
+    """
+    window = 2 * swing_length + 1
+    sh_price, sl_price, sh_idx, sl_idx = state[0], state[1], state[2], state[3]
+    position, prev_close, ob_seq = state[4], state[5], state[6]
+    n_bull, n_bear = n_obs[0], n_obs[1]
+    # Tinggi OB maksimum (cukup batas atas: tidak diturunkan saat OB dibuang)
+    bull_height, bear_height = 0.0, 0.0
+    for k in range(n_bull):
+        bull_height = max(bull_height, bull_obs[k, 0] - bull_obs[k, 1])
+    for k in range(n_bear):
+        bear_height = max(bear_height, bear_obs[k, 0] - bear_obs[k, 1])
+
+    for i in range(start, len(c)):
+        if base + i >= window:
+            # A. UPDATE SWING
+            check_idx = i - swing_length
+            if is_swing_high[check_idx]:
+                sh_price = h[check_idx]
+                sh_idx = base + check_idx
+            if is_swing_low[check_idx]:
+                sl_price = l[check_idx]
+                sl_idx = base + check_idx
+
+            # B. BOS -> ORDER BLOCK
+            if sh_price > 0 and c[i] > sh_price and prev_close <= sh_price:
+                if last_red[0] >= 0 and last_red[0] >= sl_idx:
+                    n_bull = _add_ob(bull_obs, n_bull, last_red[1], last_red[2], ob_seq)
+                    bull_height = max(bull_height, last_red[1] - last_red[2])
+                    ob_seq += 1
+            if sl_price > 0 and c[i] < sl_price and prev_close >= sl_price:
+                if last_green[0] >= 0 and last_green[0] >= sh_idx:
+                    n_bear = _add_ob(bear_obs, n_bear, last_green[1], last_green[2], ob_seq)
+                    bear_height = max(bear_height, last_green[1] - last_green[2])
+                    ob_seq += 1
+
+            # C. MITIGATION (OB yang kena dibuang)
+            n_bull, bull_hit = _take_obs(bull_obs, n_bull, c[i], l[i], bull_height)
+            n_bear, bear_hit = _take_obs(bear_obs, n_bear, h[i], c[i], bear_height)
+            if bull_hit > bear_hit:
+                position = 1
+            elif bear_hit > bull_hit:
+                position = -1
+
+        if c[i] < o[i]:
+            last_red[0], last_red[1], last_red[2] = base + i, h[i], l[i]
+        elif c[i] > o[i]:
+            last_green[0], last_green[1], last_green[2] = base + i, h[i], l[i]
+
+        prev_close = c[i]
+        holding[i - start] = position
+
+    state[0], state[1], state[2], state[3] = sh_price, sl_price, sh_idx, sl_idx
+    state[4], state[5], state[6] = position, prev_close, ob_seq
+    n_obs[0], n_obs[1] = n_bull, n_bear
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+from indicators.moving import EWM, NAN
+from indicators.volatility import true_range
+from indicators.kernels import wilder_recurrence
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    # Semantik pembagian sama dengan pandas: x/0 -> inf, 0/0 -> NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.float64(avg_gain) / np.float64(avg_loss)
+        return 100 - (100 / (1 + rs))
+
+class RSI:
+    """
+    RSI Wilder versi repo ini: gain/loss di-smooth dengan
+    ewm(com=period-1, min_periods=period) (adjust=True), delta pertama dianggap 0.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self._gain = EWM(com=period - 1, min_periods=period)
+        self._loss = EWM(com=period - 1, min_periods=period)
+        self._prev_close = NAN
+        self.value = NAN
+
+    def bulk(self, close):
+        self.__init__(self.period)
+        return self.extend(close)
+
+    def extend(self, close):
+        close = np.asarray(close, dtype=np.float64)
+        # Delta bar pertama memakai close terakhir blok sebelumnya (NaN -> 0 di awal data)
+        delta = np.diff(close, prepend=self._prev_close)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
+
+        avg_gain = self._gain.extend(gain)
+        avg_loss = self._loss.extend(loss)
+        out = _rsi_from_averages(avg_gain, avg_loss)
+
+        if len(close):
+            self._prev_close = close[-1]
+            self.value = out[-1]
+        return out
+
+    def update(self, close):
+        delta = close - self._prev_close
+        self._prev_close = close
+        if delta != delta:
+            delta = 0.0
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.value = _rsi_from_averages(self._gain.update(gain), self._loss.update(loss))
+        return self.value
+
+class _WilderSum:
+    """
+    Smoothing Wilder versi trend_ema.calculate_adx:
+    nilai awal = rata-rata `period` data pertama (NaN diabaikan, seperti Series.mean()),
+    lalu res = res - res / period + x.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self._warmup = []
+        self.value = NAN
+
+    def bulk(self, series):
+        series = np.asarray(series, dtype=np.float64)
+        period = self.period
+        res = np.full(len(series), np.nan)
+        if len(series) > period:
+            res[period-1] = pd.Series(series[0:period]).mean()
+            wilder_recurrence(series, res, period)
+        if len(series) < period:
+            self._warmup = list(series)
+            self.value = NAN
+        else:
+            # Histori sudah melewati warm-up: lanjutkan rekurensi dari nilai terakhir
+            self._warmup = None
+            self.value = res[-1] if len(series) > period else pd.Series(series).mean()
+        return res
+
+    def extend(self, series):
+        series = np.asarray(series, dtype=np.float64)
+        period = self.period
+        res = np.full(len(series), np.nan)
+        pos = 0
+        if self._warmup is not None:
+            pos = min(period - len(self._warmup), len(series))
+            self._warmup.extend(series[:pos])
+            if len(self._warmup) < period:
+                return res
+            self.value = pd.Series(self._warmup).mean()
+            self._warmup = None
+            res[pos - 1] = self.value
+        if pos < len(series):
+            # Rekurensi lanjutan: slot period-1 diisi nilai terakhir
+            smoothed = np.empty(period + len(series) - pos)
+            smoothed[period - 1] = self.value
+            wilder_recurrence(np.concatenate([np.zeros(period), series[pos:]]), smoothed, period)
+            res[pos:] = smoothed[period:]
+            self.value = res[-1]
+        return res
+
+    def update(self, x):
+        if self._warmup is not None and len(self._warmup) < self.period:
+            self._warmup.append(x)
+            if len(self._warmup) == self.period:
+                self.value = pd.Series(self._warmup).mean()
+                self._warmup = None
+            return self.value
+        self.value = self.value - (self.value / self.period) + x
+        return self.value
+
+class ADX:
+    """ADX (Wilder) incremental, identik dengan trend_ema.calculate_adx."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self._tr = _WilderSum(period)
+        self._plus = _WilderSum(period)
+        self._minus = _WilderSum(period)
+        self._adx = _WilderSum(period)
+        self._prev = None
+        self.value = NAN
+
+    @staticmethod
+    def _directional(high, low, prev_high, prev_low):
+        up_move = high - prev_high
+        down_move = prev_low - low
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+        return plus_dm, minus_dm
+
+    @staticmethod
+    def _dx(tr14, plus14, minus14):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * (plus14 / tr14)
+            minus_di = 100 * (minus14 / tr14)
+            return 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+
+    def bulk(self, high, low, close, tr=None):
+        """tr (opsional): true range yang sudah dihitung (node bersama indicators.graph)."""
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+
+        if tr is None:
+            tr = true_range(high, low, close)
+        prev_high = np.r_[np.nan, high[:-1]]
+        prev_low = np.r_[np.nan, low[:-1]]
+        plus_dm, minus_dm = self._directional(high, low, prev_high, prev_low)
+
+        dx = self._dx(self._tr.bulk(tr), self._plus.bulk(plus_dm), self._minus.bulk(minus_dm))
+        out = self._adx.bulk(dx)
+
+        if len(high) <= self.period:
+            # Histori terlalu pendek untuk batch: isi ulang state lewat update()
+            self.__init__(self.period)
+            for h, l, c in zip(high, low, close):
+                self.update(h, l, c)
+        else:
+            self._prev = (high[-1], low[-1], close[-1])
+            self.value = out[-1]
+        return out
+
+    def extend(self, high, low, close):
+        if self._prev is None:
+            return self.bulk(high, low, close)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        prev_high, prev_low, prev_close = self._prev
+
+        tr = true_range(high, low, close, prev_close)
+        plus_dm, minus_dm = self._directional(high, low, np.r_[prev_high, high[:-1]], np.r_[prev_low, low[:-1]])
+
+        dx = self._dx(self._tr.extend(tr), self._plus.extend(plus_dm), self._minus.extend(minus_dm))
+        out = self._adx.extend(dx)
+        if len(high):
+            self._prev = (high[-1], low[-1], close[-1])
+            self.value = out[-1]
+        return out
+
+    def update(self, high, low, close):
+        if self._prev is None:
+            tr = high - low
+            plus_dm = minus_dm = 0.0
+        else:
+            prev_high, prev_low, prev_close = self._prev
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            plus_dm, minus_dm = self._directional(high, low, prev_high, prev_low)
+        self._prev = (high, low, close)
+
+        tr14 = self._tr.update(tr)
+        plus14 = self._plus.update(float(plus_dm))
+        minus14 = self._minus.update(float(minus_dm))
+        # DX NaN selama warm-up tetap dikirim: mean awal ADX mengabaikan NaN (seperti batch)
+        dx = self._dx(np.float64(tr14), np.float64(plus14), np.float64(minus14))
+        self.value = self._adx.update(float(dx))
+        return self.value
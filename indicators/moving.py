@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from indicators.kernels import rolling_mean, rolling_std, ewm_recurrence
+
+NAN = float('nan')
+
+# Semua indikator punya bulk() (hitung dari nol), extend() (lanjutkan dari state terakhir:
+# bulk(a) lalu extend(b) == bulk(a + b), untuk data yang diproses per blok) dan update() per candle.
+
+class _RollingKernel:
+    """Basis indikator rolling yang state-nya dibawa kernel: ekor `period` nilai + akumulator."""
+
+    _kernel = None
+    _state_size = 0
+
+    def __init__(self, period):
+        self.period = period
+        self._tail = np.zeros(0)
+        self._state = np.zeros(self._state_size)
+        self.value = NAN
+
+    def bulk(self, values):
+        self.__init__(self.period)
+        return self.extend(values)
+
+    def extend(self, values):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        out = type(self)._kernel(values, self._tail, self.period, self._state, np.empty(len(values)))
+        self._tail = np.concatenate([self._tail, values[-self.period:]])[-self.period:]
+        if len(out):
+            self.value = out[-1]
+        return out
+
+    def update(self, x):
+        return self.extend(np.array([x], dtype=np.float64))[0]
+
+class SMA(_RollingKernel):
+    """
+    Simple Moving Average incremental. Rekurensinya sama persis dengan pandas
+    rolling().mean() (jumlah Kahan berjalan), jadi bulk, extend & update bit-identik.
+    """
+
+    _kernel = staticmethod(rolling_mean)
+    _state_size = 7
+
+    def __init__(self, period):
+        super().__init__(period)
+        self._state[6] = NAN # prev_value: belum ada nilai
+
+class RollingStd(_RollingKernel):
+    """
+    Standar deviasi rolling (ddof=1) dengan rekurensi Welford + Kahan seperti pandas
+    rolling().std(). Satu kernel untuk bulk, extend & update supaya hasil per blok identik
+    (pandas sendiri kadang mereset akumulatornya di window yang nilainya konstan).
+    """
+
+    _kernel = staticmethod(rolling_std)
+    _state_size = 5
+
+class EWM:
+    """
+    Exponential weighted mean incremental dengan rekurensi yang sama persis
+    dengan pandas .ewm(...).mean() (adjust True/False, min_periods), sehingga
+    update() menghasilkan nilai bit-identik dengan batch.
+    """
+
+    def __init__(self, com=None, span=None, alpha=None, adjust=True, min_periods=0):
+        self._kwargs = {'com': com, 'span': span, 'alpha': alpha}
+        if com is not None:
+            alpha = 1. / (1. + com)
+        elif span is not None:
+            alpha = 2. / (span + 1.)
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self._weighted = NAN
+        self._old_wt = 1.0
+        self._nobs = 0
+        self.value = NAN
+
+    def bulk(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        kwargs = {k: v for k, v in self._kwargs.items() if v is not None}
+        raw = pd.Series(values).ewm(adjust=self.adjust, **kwargs).mean().to_numpy()
+
+        # State rekurensi diambil dari nilai mentah terakhir (tanpa mask min_periods)
+        self._nobs = int((~np.isnan(values)).sum())
+        self._weighted = raw[-1] if len(raw) else NAN
+        self._old_wt = 1.0
+        if self.adjust:
+            # old_wt = sum (1 - alpha)^i -> konvergen, cukup iterasi sampai stabil
+            for _ in range(len(values) - 1):
+                nxt = self._old_wt * (1. - self.alpha) + 1.
+                if nxt == self._old_wt:
+                    break
+                self._old_wt = nxt
+
+        out = raw.copy()
+        out[np.cumsum(~np.isnan(values)) < self.min_periods] = np.nan
+        self.value = out[-1] if len(out) else NAN
+        return out
+
+    def extend(self, values):
+        if self._weighted != self._weighted and self._nobs == 0:
+            return self.bulk(values)
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        state = np.array([self._weighted, self._old_wt, self._nobs], dtype=np.float64)
+        out = ewm_recurrence(values, self.alpha, self.adjust, self.min_periods, state, np.empty(len(values)))
+        self._weighted, self._old_wt, self._nobs = state[0], state[1], int(state[2])
+        if len(out):
+            self.value = out[-1]
+        return out
+
+    def update(self, x):
+        is_obs = x == x
+        if self._weighted != self._weighted:
+            if is_obs:
+                self._weighted = x
+                self._old_wt = 1.0
+                self._nobs = 1
+        else:
+            self._old_wt *= 1. - self.alpha
+            if is_obs:
+                self._nobs += 1
+                new_wt = 1. if self.adjust else self.alpha
+                if self._weighted != x:
+                    self._weighted = (self._old_wt * self._weighted + new_wt * x) / (self._old_wt + new_wt)
+                self._old_wt = self._old_wt + new_wt if self.adjust else 1.
+        self.value = self._weighted if self._nobs >= self.min_periods else NAN
+        return self.value
+
+class EMA(EWM):
+    """EMA klasik (adjust=False) seperti df['Close'].ewm(span=..., adjust=False)."""
+
+    def __init__(self, span):
+        super().__init__(span=span, adjust=False)
+        self.span = span
@@ -0,0 +1,25 @@
+import numpy as np
+
+class Scratch:
+    """
+    Kumpulan buffer kerja bernama yang dipakai ulang antar window (strategi di atas
+    dataset besar): buffer hanya dialokasikan ulang kalau window berikutnya lebih panjang,
+    jadi memori sebanding panjang window, bukan panjang dataset.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def take(self, name, n, dtype=np.float64):
+        buf = self._buffers.get(name)
+        if buf is None or len(buf) < n or buf.dtype != dtype:
+            buf = np.empty(n, dtype=dtype)
+            self._buffers[name] = buf
+        return buf[:n]
+
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+def take(scratch, name, n, dtype=np.float64):
+    """Buffer `name` dari scratch, atau array baru kalau scratch None (hasil dipakai jadi kolom DataFrame)."""
+    return np.empty(n, dtype=dtype) if scratch is None else scratch.take(name, n, dtype)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from indicators.moving import EWM, NAN
+from indicators.kernels import supertrend_bands
+
+def true_range(high, low, close, prev_close=np.nan):
+    """
+    TR = max(H-L, |H-PC|, |L-PC|); bar pertama memakai `prev_close` (close terakhir blok
+    sebelumnya), atau H-L saja jika belum ada close sebelumnya.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    prev_close = np.r_[prev_close, close[:-1]]
+    ranges = pd.DataFrame({
+        'H-L': high - low,
+        'H-PC': np.abs(high - prev_close),
+        'L-PC': np.abs(low - prev_close),
+    })
+    return ranges.max(axis=1).to_numpy()
+
+class ATR:
+    """ATR = TR.ewm(alpha=1/period, adjust=False).mean(), seperti di supertrend."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self._ewm = EWM(alpha=1/period, adjust=False)
+        self._prev_close = None
+        self.value = NAN
+
+    def bulk(self, high, low, close, tr=None):
+        self.__init__(self.period)
+        return self.extend(high, low, close, tr)
+
+    def extend(self, high, low, close, tr=None):
+        """tr (opsional): true range blok ini yang sudah dihitung (node bersama indicators.graph)."""
+        if tr is None:
+            tr = true_range(high, low, close, np.nan if self._prev_close is None else self._prev_close)
+        out = self._ewm.extend(tr)
+        if len(close):
+            self._prev_close = float(close[-1])
+        self.value = self._ewm.value
+        return out
+
+    def update(self, high, low, close):
+        if self._prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        self.value = self._ewm.update(tr)
+        return self.value
+
+class Supertrend:
+    """
+    Final band & arah Supertrend incremental.
+    Band final hanya boleh mendekati harga (atau datar), arah berganti saat
+    Close menembus band final.
+    """
+
+    def __init__(self, period=10, multiplier=3):
+        self.period = period
+        self.multiplier = multiplier
+        self.atr = ATR(period)
+        self._final_upper = None
+        self._final_lower = None
+        self._prev_close = None
+        self.trend = 1
+        self.value = 0.0
+
+    def bulk(self, high, low, close, atr=None):
+        """Return dict array: ATR, Basic/Final Upper & Lower, Supertrend, Trend_Dir."""
+        self.__init__(self.period, self.multiplier)
+        return self.extend(high, low, close, atr)
+
+    def extend(self, high, low, close, atr=None):
+        """
+        Lanjutan bulk() untuk blok berikutnya (band final, arah & ATR dibawa dari blok lalu).
+        atr (opsional): ATR yang sudah dihitung (node bersama indicators.graph); state ATR
+        objek ini tidak ikut maju, jadi hanya untuk hitungan sekali jalan.
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        n = len(close)
+
+        atr = self.atr.extend(high, low, close) if atr is None else np.asarray(atr, dtype=np.float64)
+        hl2 = (high + low) / 2
+        basic_upper = hl2 + (self.multiplier * atr)
+        basic_lower = hl2 - (self.multiplier * atr)
+
+        # Rekurensi band & arah dijalankan di kernel (Numba kalau ada)
+        if self._final_upper is None:
+            final_upper, final_lower, supertrend, trend_dir = supertrend_bands(basic_upper, basic_lower, close, 1)
+        else:
+            # Bar terakhir blok lalu jadi bar 0 kernel: band final & arahnya sudah final
+            bands = supertrend_bands(np.r_[self._final_upper, basic_upper], np.r_[self._final_lower, basic_lower],
+                                     np.r_[self._prev_close, close], self.trend)
+            final_upper, final_lower, supertrend, trend_dir = (band[1:] for band in bands)
+
+        if n:
+            self._final_upper = final_upper[-1]
+            self._final_lower = final_lower[-1]
+            self._prev_close = close[-1]
+            self.trend = int(trend_dir[-1])
+            self.value = supertrend[-1]
+
+        return {
+            'ATR': atr,
+            'Basic_Upper': basic_upper,
+            'Basic_Lower': basic_lower,
+            'Final_Upper': final_upper,
+            'Final_Lower': final_lower,
+            'Supertrend': supertrend,
+            'Trend_Dir': trend_dir,
+        }
+
+    @staticmethod
+    def _final_bands(basic_upper, basic_lower, prev_upper, prev_lower, prev_close):
+        # Kalkulasi Final Upper
+        if (basic_upper < prev_upper) or (prev_close > prev_upper):
+            upper = basic_upper
+        else:
+            upper = prev_upper
+        # Kalkulasi Final Lower
+        if (basic_lower > prev_lower) or (prev_close < prev_lower):
+            lower = basic_lower
+        else:
+            lower = prev_lower
+        return upper, lower
+
+    @staticmethod
+    def _direction(prev_trend, close, final_upper, final_lower):
+        if prev_trend == 1: # Sedang Uptrend
+            return -1 if close < final_lower else 1
+        # Sedang Downtrend
+        return 1 if close > final_upper else -1
+
+    def update(self, high, low, close):
+        """Update satu candle; return (supertrend, trend_dir)."""
+        atr = self.atr.update(high, low, close)
+        hl2 = (high + low) / 2
+        basic_upper = hl2 + (self.multiplier * atr)
+        basic_lower = hl2 - (self.multiplier * atr)
+
+        if self._final_upper is None:
+            self._final_upper, self._final_lower = basic_upper, basic_lower
+        else:
+            self._final_upper, self._final_lower = self._final_bands(
+                basic_upper, basic_lower, self._final_upper, self._final_lower, self._prev_close)
+            self.trend = self._direction(self.trend, close, self._final_upper, self._final_lower)
+            self.value = self._final_lower if self.trend == 1 else self._final_upper
+
+        self._prev_close = close
+        return self.value, self.trend
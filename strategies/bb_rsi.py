@@ -1,7 +1,31 @@
 import pandas as pd
 import numpy as np
+from indicators.moving import SMA, RollingStd
+from indicators.momentum import RSI
+from indicators.scratch import take
 
-def apply_strategy(df):
+# Metadata registry (dibaca tanpa import modul, lihat engine/registry.py)
+STRATEGY = {
+    'label': "Bollinger Bands + RSI",
+    'params': {
+        'bb_period': {'type': 'int', 'default': 20, 'min': 2, 'max': 200},
+        'bb_std_dev': {'type': 'float', 'default': 2.0, 'min': 0.5, 'max': 5.0},
+        'rsi_period': {'type': 'int', 'default': 14, 'min': 2, 'max': 100},
+        'rsi_lower': {'type': 'float', 'default': 30, 'min': 1, 'max': 50},
+        'rsi_upper': {'type': 'float', 'default': 70, 'min': 50, 'max': 99},
+    },
+    'indicators': ['SMA', 'RollingStd', 'RSI'],
+}
+
+def warmup_bars(bb_period=20, rsi_period=14, **_):
+    """Band terisi penuh dan RSI (EWM alpha=1/period) sudah ~95% lepas dari nilai awal."""
+    return max(bb_period, 3 * rsi_period)
+
+def indicator_inputs(bb_period=20, rsi_period=14, **_):
+    """Node indikator bersama (indicators.graph) yang dibaca compute()."""
+    return [('SMA', bb_period), ('STD', bb_period), ('RSI', rsi_period)]
+
+def apply_strategy(df, bb_period=20, bb_std_dev=2.0, rsi_period=14, rsi_lower=30, rsi_upper=70):
     """
     Strategi Mean Reversion: Bollinger Bands + RSI
     
@@ -9,52 +33,95 @@ def apply_strategy(df):
     - Entry: Close < Lower Band DAN RSI < 30
     - Exit : Close > Upper Band DAN RSI > 70 (Wajib Keduanya)
     """
-    df = df.copy()
-    
-    # --- 1. SETTING PARAMETER ---
-    bb_period = 20      
-    bb_std_dev = 2.0    
-    rsi_period = 14     
-    rsi_lower = 30      
-    rsi_upper = 70      
-
-    # --- 2. HITUNG INDIKATOR ---
-    
-    # A. Hitung Bollinger Bands
-    df['SMA_20'] = df['Close'].rolling(window=bb_period).mean()
-    df['Std_Dev'] = df['Close'].rolling(window=bb_period).std()
-    df['BB_Upper'] = df['SMA_20'] + (bb_std_dev * df['Std_Dev'])
-    df['BB_Lower'] = df['SMA_20'] - (bb_std_dev * df['Std_Dev'])
-    
-    # B. Hitung RSI (Rumus Manual Pandas)
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).fillna(0)
-    loss = (-delta.where(delta < 0, 0)).fillna(0)
-    
-    avg_gain = gain.ewm(com=rsi_period-1, min_periods=rsi_period).mean()
-    avg_loss = loss.ewm(com=rsi_period-1, min_periods=rsi_period).mean()
-    
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    return StrategyStream(bb_period, bb_std_dev, rsi_period, rsi_lower, rsi_upper).prime(df)
 
-    # --- 3. LOGIKA SINYAL (SIGNAL LOGIC) ---
-    
-    df['Signal'] = np.nan 
+class StrategyStream:
+    """
+    Versi incremental apply_strategy: prime() dengan histori (hasil sama dengan
+    apply_strategy), lalu update() per candle baru dalam O(1).
+    """
 
-    # KONDISI BUY (Tetap sama)
-    # Harga murah banget (Tembus Bawah) DAN Oversold
-    buy_condition = (df['Close'] < df['BB_Lower']) & (df['RSI'] < rsi_lower)
-    
-    # KONDISI SELL (YANG DIUBAH)
-    # Dulu: Pakai | (OR) -> Salah satu terpenuhi langsung jual.
-    # Sekarang: Pakai & (AND) -> Dua-duanya WAJIB terpenuhi baru jual.
-    sell_condition = (df['Close'] > df['BB_Upper']) & (df['RSI'] > rsi_upper)
-
-    # Terapkan Sinyal
-    df.loc[buy_condition, 'Signal'] = 1
-    df.loc[sell_condition, 'Signal'] = 0
-    
-    # Forward Fill (Pertahankan posisi sampai sinyal berubah)
-    df['Signal'] = df['Signal'].ffill().fillna(0)
-    
-    return df
\ No newline at end of file
+    def __init__(self, bb_period=20, bb_std_dev=2.0, rsi_period=14, rsi_lower=30, rsi_upper=70):
+        # --- 1. SETTING PARAMETER ---
+        # Default: BB 20/2.0, RSI 14 (30/70). Bisa diubah lewat argumen (optimizer).
+        self.bb_period = bb_period
+        self.bb_std_dev = bb_std_dev
+        self.rsi_lower = rsi_lower
+        self.rsi_upper = rsi_upper
+
+        self.sma = SMA(bb_period)
+        self.std = RollingStd(bb_period)
+        self.rsi = RSI(rsi_period)
+        self.input_keys = indicator_inputs(bb_period, rsi_period)
+        self.signal = 0
+
+    def prime(self, df, inputs=None):
+        df = df.copy()
+        for name, values in self.compute(df, inputs=inputs).items():
+            df[name] = values
+        return df
+
+    def compute(self, candles, scratch=None, inputs=None):
+        """
+        Inti prime() atas array: `candles` = DataFrame atau dict kolom OHLCV (mis. view dataset).
+        Return dict kolom indikator + 'Signal'; dengan `scratch`, band & sinyal memakai buffer kerja.
+        Panggilan berikutnya melanjutkan state (data per blok = hasil satu run penuh).
+        `inputs` (opsional): {node: array} dari indicators.graph.IndicatorGraph atas data yang sama,
+        dipakai menggantikan hitungan indikator sendiri (sekali jalan: state indikator tidak ikut maju).
+        """
+        close = np.asarray(candles['Close'], dtype=np.float64)
+        n = len(close)
+
+        # --- 2. HITUNG INDIKATOR ---
+        # SMA & Std Dev untuk band, RSI Wilder (smoothing ewm)
+        if inputs is None:
+            sma, std, rsi = self.sma.extend(close), self.std.extend(close), self.rsi.extend(close)
+        else:
+            sma, std, rsi = (inputs[key] for key in self.input_keys)
+        
+        # A. Hitung Bollinger Bands
+        width = np.multiply(self.bb_std_dev, std, out=take(scratch, 'bb_width', n))
+        upper = np.add(sma, width, out=take(scratch, 'bb_upper', n))
+        lower = np.subtract(sma, width, out=take(scratch, 'bb_lower', n))
+
+        # --- 3. LOGIKA SINYAL (SIGNAL LOGIC) ---
+        
+        signal = take(scratch, 'signal', n)
+        signal[:] = np.nan
+
+        # KONDISI BUY (Tetap sama)
+        # Harga murah banget (Tembus Bawah) DAN Oversold
+        buy_condition = (close < lower) & (rsi < self.rsi_lower)
+        
+        # KONDISI SELL (YANG DIUBAH)
+        # Dulu: Pakai | (OR) -> Salah satu terpenuhi langsung jual.
+        # Sekarang: Pakai & (AND) -> Dua-duanya WAJIB terpenuhi baru jual.
+        sell_condition = (close > upper) & (rsi > self.rsi_upper)
+
+        # Terapkan Sinyal
+        signal[buy_condition] = 1
+        signal[sell_condition] = 0
+        
+        # Forward Fill (Pertahankan posisi sampai sinyal berubah), awal tanpa sinyal = posisi sebelumnya
+        last = np.where(np.isnan(signal), 0, np.arange(n))
+        np.maximum.accumulate(last, out=last)
+        signal = np.nan_to_num(signal[last], nan=float(self.signal))
+
+        self.signal = int(signal[-1]) if n else 0
+        return {f'SMA_{self.bb_period}': sma, 'Std_Dev': std, 'BB_Upper': upper, 'BB_Lower': lower,
+                'RSI': rsi, 'Signal': signal}
+
+    def update(self, candle):
+        """Proses satu candle tertutup (dict / Series OHLCV), return sinyal bar itu."""
+        close = float(candle['Close'])
+        sma = self.sma.update(close)
+        std = self.std.update(close)
+        rsi = self.rsi.update(close)
+
+        upper = sma + (self.bb_std_dev * std)
+        lower = sma - (self.bb_std_dev * std)
+        if close > upper and rsi > self.rsi_upper:
+            self.signal = 0
+        elif close < lower and rsi < self.rsi_lower:
+            self.signal = 1
+        return self.signal
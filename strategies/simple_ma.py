@@ -1,20 +1,79 @@
 import pandas as pd
+import numpy as np
+from indicators.moving import SMA
+from indicators.scratch import take
 
-def apply_strategy(df):
+# Metadata registry (dibaca tanpa import modul, lihat engine/registry.py)
+STRATEGY = {
+    'label': "Simple MA Crossover",
+    'params': {
+        'fast': {'type': 'int', 'default': 50, 'min': 2, 'max': 500},
+        'slow': {'type': 'int', 'default': 200, 'min': 2, 'max': 1000},
+    },
+    'indicators': ['SMA'],
+}
+
+def warmup_bars(fast=50, slow=200):
+    """Bar histori sebelum sinyal valid: kedua SMA sudah terisi."""
+    return max(fast, slow)
+
+def indicator_inputs(fast=50, slow=200):
+    """Node indikator bersama (indicators.graph) yang dibaca compute()."""
+    return [('SMA', fast), ('SMA', slow)]
+
+def apply_strategy(df, fast=50, slow=200):
     """
     Strategi: Golden Cross
     Beli jika MA 50 > MA 200 via Close Price.
     """
-    # Jangan ubah data asli, buat copy
-    df = df.copy()
-    
-    # 1. Hitung Indikator
-    df['SMA_50'] = df['Close'].rolling(window=50).mean()
-    df['SMA_200'] = df['Close'].rolling(window=200).mean()
-    
-    # 2. Buat Sinyal
-    # 1 = Beli/Tahan, 0 = Jual/Cash
-    df['Signal'] = 0 
-    df.loc[df['SMA_50'] > df['SMA_200'], 'Signal'] = 1
-    
-    return df
\ No newline at end of file
+    return StrategyStream(fast, slow).prime(df)
+
+class StrategyStream:
+    """Versi incremental apply_strategy: prime() dengan histori, lalu update() per candle."""
+
+    def __init__(self, fast=50, slow=200):
+        self.fast = fast
+        self.slow = slow
+        self.sma_fast = SMA(fast)
+        self.sma_slow = SMA(slow)
+        self.input_keys = indicator_inputs(fast, slow)
+        self.signal = 0
+
+    def prime(self, df, inputs=None):
+        # Jangan ubah data asli, buat copy
+        df = df.copy()
+        for name, values in self.compute(df, inputs=inputs).items():
+            df[name] = values
+        return df
+
+    def compute(self, candles, scratch=None, inputs=None):
+        """
+        Inti prime() atas array: `candles` = DataFrame atau dict kolom OHLCV (mis. view dataset).
+        Return dict kolom indikator + 'Signal'; dengan `scratch`, buffer sinyal dipakai ulang.
+        Panggilan berikutnya melanjutkan state (data per blok = hasil satu run penuh).
+        `inputs` (opsional): {node: array} dari indicators.graph.IndicatorGraph atas data yang sama,
+        dipakai menggantikan hitungan indikator sendiri (sekali jalan: state indikator tidak ikut maju).
+        """
+        close = np.asarray(candles['Close'], dtype=np.float64)
+        
+        # 1. Hitung Indikator
+        if inputs is None:
+            sma_fast = self.sma_fast.extend(close)
+            sma_slow = self.sma_slow.extend(close)
+        else:
+            sma_fast, sma_slow = (inputs[key] for key in self.input_keys)
+        
+        # 2. Buat Sinyal
+        # 1 = Beli/Tahan, 0 = Jual/Cash
+        signal = take(scratch, 'signal', len(close), np.int64)
+        np.greater(sma_fast, sma_slow, out=signal, casting='unsafe')
+
+        self.signal = int(signal[-1]) if len(signal) else 0
+        return {f'SMA_{self.fast}': sma_fast, f'SMA_{self.slow}': sma_slow, 'Signal': signal}
+
+    def update(self, candle):
+        close = float(candle['Close'])
+        fast = self.sma_fast.update(close)
+        slow = self.sma_slow.update(close)
+        self.signal = 1 if fast > slow else 0
+        return self.signal
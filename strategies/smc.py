@@ -1,7 +1,27 @@
 import pandas as pd
 import numpy as np
+from bisect import bisect_left, bisect_right
+from collections import deque
+from indicators import kernels
 
-def apply_strategy(df):
+# Metadata registry (dibaca tanpa import modul, lihat engine/registry.py)
+STRATEGY = {
+    'label': "Smart Money Concept (SMC)",
+    'params': {
+        'swing_length': {'type': 'int', 'default': 2, 'min': 1, 'max': 20},
+    },
+    'indicators': ['Swing High/Low', 'Order Block'],
+}
+
+def warmup_bars(swing_length=2):
+    """
+    None = butuh seluruh histori: swing terakhir & Order Block yang belum ter-mitigasi
+    bisa berasal dari bar mana pun sebelumnya, tidak ada jumlah bar yang cukup.
+    Akibatnya sinyal bergantung titik mulai data (di dashboard: tanggal mulai yang dipilih).
+    """
+    return None
+
+def apply_strategy(df, swing_length=2):
     """
     Smart Money Concept (SMC) Strategy
     
@@ -11,138 +31,255 @@ def apply_strategy(df):
     3. Tandai Order Block (OB) yang menyebabkan BOS.
     4. Entry saat harga kembali (Mitigation) ke area OB tersebut.
     """
-    df = df.copy()
-    
-    # --- 1. IDENTIFIKASI SWING (FRACTALS) ---
-    # Window 2 kiri, 2 kanan (Total 5 candle)
-    # Kita pakai shift(-2) karena swing baru valid 2 candle setelahnya
-    
-    df['Swing_High'] = df['High'].rolling(window=5, center=True).max()
-    df['Swing_Low'] = df['Low'].rolling(window=5, center=True).min()
-    
-    # Is_Swing: Boolean jika candle i adalah puncak/lembah
-    # Perlu shift(2) untuk mengembalikan ke posisi asli karena rolling center=True sempat 'mengintip' ke depan
-    # Namun dalam trading real-time, kita baru tahu itu swing di candle i+2.
-    # Jadi kita tandai swing di titik kejadiannya, tapi logikanya baru bisa dipakai nanti.
-    
-    df['Is_Swing_High'] = (df['High'] == df['Swing_High'])
-    df['Is_Swing_Low'] = (df['Low'] == df['Swing_Low'])
+    return StrategyStream(swing_length).prime(df)
 
-    # --- 2. LOGIKA UTAMA (LOOP) ---
-    # Kita butuh loop karena harus menyimpan daftar Order Block yang "Hidup"
-    
-    signals = np.zeros(len(df))
-    
-    # State Variables
-    last_swing_high_price = 0
-    last_swing_low_price = 0
-    last_swing_high_idx = 0
-    last_swing_low_idx = 0
-    
-    # List Order Blocks [Price_Top, Price_Bottom, Type(1/-1), Mitigated(Bool)]
-    active_obs = [] 
-    
-    # Loop dimulai dari candle ke-5
-    for i in range(5, len(df)):
-        current_close = df['Close'].iloc[i]
-        current_low = df['Low'].iloc[i]
-        current_high = df['High'].iloc[i]
-        current_open = df['Open'].iloc[i]
+class OrderBlockBook:
+    """
+    Order Block aktif satu tipe (bullish / bearish), kolom array paralel yang
+    diurutkan menurut batas bawah. OB yang sudah ter-mitigasi langsung dibuang,
+    jadi yang discan hanya OB hidup dengan bottom di [lower - tinggi OB maks, upper]
+    (bisect), sama dengan kernel Numba (indicators.kernels._take_obs).
+    """
+
+    def __init__(self):
+        self.bottom = []
+        self.top = []
+        self.seq = [] # Urutan pembuatan OB (lintas tipe)
+        self.max_height = 0.0 # Batas atas top - bottom (tidak diturunkan saat OB dibuang)
+
+    def __len__(self):
+        return len(self.bottom)
+
+    def add(self, top, bottom, seq):
+        k = bisect_right(self.bottom, bottom)
+        self.bottom.insert(k, bottom)
+        self.top.insert(k, top)
+        self.seq.insert(k, seq)
+        self.max_height = max(self.max_height, top - bottom)
+
+    def take(self, upper, lower):
+        """Buang semua OB dengan bottom <= upper dan top >= lower; return seq terbesar yang kena (-1 jika tidak ada)."""
+        end = bisect_right(self.bottom, upper)
+        # top >= lower butuh bottom >= lower - tinggi; kelonggaran kecil untuk pembulatan top - bottom
+        start = bisect_left(self.bottom, lower - self.max_height - 1e-9 * abs(lower), 0, end)
+        hit = -1
+        keep = None
+        for k in range(start, end):
+            if self.top[k] >= lower:
+                hit = max(hit, self.seq[k])
+                if keep is None:
+                    keep = list(range(k))
+            elif keep is not None:
+                keep.append(k)
+        if keep is not None:
+            keep.extend(range(end, len(self.bottom)))
+            self.bottom = [self.bottom[k] for k in keep]
+            self.top = [self.top[k] for k in keep]
+            self.seq = [self.seq[k] for k in keep]
+        return hit
+
+class StrategyStream:
+    """
+    Versi incremental apply_strategy. Semua state SMC (swing terakhir, candle
+    merah/hijau terakhir, Order Block aktif, posisi) dibawa antar candle, jadi
+    prime() dan update() memakai logika per-bar yang sama (_step).
+    """
+
+    def __init__(self, swing_length=2):
+        self.swing_length = swing_length
+        self.window = 2 * swing_length + 1
+        self._highs = deque(maxlen=self.window)
+        self._lows = deque(maxlen=self.window)
+        self._bars = 0
+        self._prev_close = np.nan
+
+        # State Variables
+        self.last_swing_high_price = 0
+        self.last_swing_low_price = 0
+        self.last_swing_high_idx = 0
+        self.last_swing_low_idx = 0
+
+        # Candle merah / hijau terakhir yang sudah lewat: (index, high, low)
+        self.last_red = None
+        self.last_green = None
+
+        # Order Block aktif per tipe (yang sudah ter-mitigasi tidak disimpan)
+        self.bullish_obs = OrderBlockBook()
+        self.bearish_obs = OrderBlockBook()
+        self._ob_seq = 0
+        self.signal = 0
+
+    def prime(self, df):
+        df = df.copy()
+        for name, values in self.compute(df).items():
+            df[name] = values
+        return df
+
+    def compute(self, candles, scratch=None):
+        """
+        Inti prime() atas array: `candles` = DataFrame atau dict kolom OHLCV (mis. view dataset).
+        Return dict kolom indikator + 'Signal'. `scratch` diterima demi antarmuka yang sama;
+        state SMC (swing & Order Block) memang hidup di objek ini.
+
+        Panggilan berikutnya melanjutkan state: ekor `window - 1` candle blok lalu ikut dipakai
+        untuk cek swing, jadi sinyal per blok = hasil satu run penuh. Kolom swing untuk
+        `swing_length` bar terakhir blok masih NaN/False (butuh candle blok berikutnya).
+        """
+        L = self.swing_length
+        o = np.asarray(candles['Open'], dtype=np.float64)
+        h = np.asarray(candles['High'], dtype=np.float64)
+        l = np.asarray(candles['Low'], dtype=np.float64)
+        c = np.asarray(candles['Close'], dtype=np.float64)
+        n = len(c)
+
+        # Ekor blok sebelumnya (hanya High/Low yang dibaca untuk bar sebelum `lead`)
+        lead = min(self._bars, self.window - 1)
+        if lead:
+            h = np.concatenate([list(self._highs)[-lead:], h])
+            l = np.concatenate([list(self._lows)[-lead:], l])
+            o = np.concatenate([np.zeros(lead), o])
+            c = np.concatenate([np.zeros(lead), c])
         
-        # A. UPDATE SWING (Hanya update jika swing sudah terkonfirmasi 2 bar lalu)
-        # Kita cek index i-2 apakah dia swing
-        check_idx = i - 2
-        if df['Is_Swing_High'].iloc[check_idx]:
-            last_swing_high_price = df['High'].iloc[check_idx]
-            last_swing_high_idx = check_idx
-            
-        if df['Is_Swing_Low'].iloc[check_idx]:
-            last_swing_low_price = df['Low'].iloc[check_idx]
-            last_swing_low_idx = check_idx
-
-        # B. DETEKSI BOS & PEMBUATAN ORDER BLOCK
+        # --- 1. IDENTIFIKASI SWING (FRACTALS) ---
+        # Window `swing_length` kiri & kanan (default 2 -> total 5 candle)
+        # Kita pakai shift(-2) karena swing baru valid 2 candle setelahnya
         
-        # --- BULLISH BOS (Harga Close tembus Swing High Terakhir) ---
-        if last_swing_high_price > 0 and current_close > last_swing_high_price:
-            # Pastikan ini fresh breakout (bar sebelumnya belum tembus)
-            if df['Close'].iloc[i-1] <= last_swing_high_price:
-                # BOS Terjadi! Cari Bullish OB.
-                # Cari candle merah terakhir di antara Swing Low terakhir dan Breakout ini
-                search_start = last_swing_low_idx
-                search_end = i
-                
-                # Slice data range tersebut
-                range_df = df.iloc[search_start:search_end]
-                # Filter candle merah (Close < Open)
-                red_candles = range_df[range_df['Close'] < range_df['Open']]
-                
-                if not red_candles.empty:
-                    # Ambil candle merah TERAKHIR sebelum naik
-                    ob_candle = red_candles.iloc[-1]
-                    
-                    # Definisi Zone OB: Dari Low sampai High candle tersebut
-                    ob_top = ob_candle['High']
-                    ob_bottom = ob_candle['Low']
-                    
-                    # Simpan ke list: [Top, Bottom, Tipe=1 (Buy), Mitigated=False]
-                    active_obs.append({'top': ob_top, 'bottom': ob_bottom, 'type': 1, 'mitigated': False})
-
-        # --- BEARISH BOS (Harga Close tembus Swing Low Terakhir) ---
-        if last_swing_low_price > 0 and current_close < last_swing_low_price:
-            if df['Close'].iloc[i-1] >= last_swing_low_price:
-                # BOS Bearish! Cari Bearish OB (Candle Hijau Terakhir)
-                search_start = last_swing_high_idx
-                search_end = i
-                
-                range_df = df.iloc[search_start:search_end]
-                green_candles = range_df[range_df['Close'] > range_df['Open']]
-                
-                if not green_candles.empty:
-                    ob_candle = green_candles.iloc[-1]
-                    ob_top = ob_candle['High']
-                    ob_bottom = ob_candle['Low']
-                    
-                    # Simpan: [Top, Bottom, Tipe=-1 (Sell), Mitigated=False]
-                    active_obs.append({'top': ob_top, 'bottom': ob_bottom, 'type': -1, 'mitigated': False})
-
-        # C. CEK MITIGATION (ENTRY SIGNAL)
-        # Kita cek apakah harga sekarang menyentuh salah satu OB yang masih aktif
+        swing_high = pd.Series(h).rolling(window=self.window, center=True).max().to_numpy()
+        swing_low = pd.Series(l).rolling(window=self.window, center=True).min().to_numpy()
         
-        signal = 0
+        # Is_Swing: Boolean jika candle i adalah puncak/lembah
+        # Perlu shift(2) untuk mengembalikan ke posisi asli karena rolling center=True sempat 'mengintip' ke depan
+        # Namun dalam trading real-time, kita baru tahu itu swing di candle i+2.
+        # Jadi kita tandai swing di titik kejadiannya, tapi logikanya baru bisa dipakai nanti.
         
-        for ob in active_obs:
-            if ob['mitigated']:
-                continue # Skip OB yang sudah kepakai
-            
-            # Cek Bullish OB (Area Buy)
-            if ob['type'] == 1:
-                # Jika Low hari ini menyentuh zona OB (tapi Close jangan jebol bawah OB biar aman)
-                if current_low <= ob['top'] and current_close >= ob['bottom']:
-                    signal = 1
-                    ob['mitigated'] = True # Tandai sudah dipakai (sekali pakai)
-            
-            # Cek Bearish OB (Area Sell)
-            elif ob['type'] == -1:
-                # Jika High hari ini menyentuh zona OB
-                if current_high >= ob['bottom'] and current_close <= ob['top']:
-                    signal = -1 # Sinyal Sell tidak disupport backtester sederhana kita (Hanya Buy/Exit),
-                                # Tapi kita bisa pakai untuk Close Position Long
-                    ob['mitigated'] = True
-
-        signals[i] = signal
-
-    df['Signal'] = signals
-    
-    # Forward Fill Signal (Opsional, tapi untuk SMC biasanya entry di titik sentuh)
-    # Kita biarkan 0 jika tidak ada sinyal, agar backtester pakai logic hold
-    
-    # TAPI: Backtester kita butuh state 1 untuk Hold.
-    # Jadi kita ubah: Jika Signal 1 (Buy), set state jadi 1. 
-    # Jika Signal -1 (Kena Bearish OB), set state jadi 0 (Sell).
-    
-    df['Signal'] = df['Signal'].replace(0, np.nan).ffill().fillna(0)
-    
-    # Ubah -1 menjadi 0 untuk kompatibilitas backtester (0 = Cash)
-    df['Signal'] = df['Signal'].apply(lambda x: 1 if x == 1 else 0)
-    
-    return df
\ No newline at end of file
+        is_sh = (h == swing_high)
+        is_sl = (l == swing_low)
+
+        # --- 2. LOGIKA UTAMA (LOOP) ---
+        # Kita butuh loop karena harus menyimpan daftar Order Block yang "Hidup"
+        base = self._bars - lead # Index global bar ke-0 array di atas
+        if kernels.HAS_NUMBA:
+            holding = self._prime_kernel(o, h, l, c, is_sh, is_sl, lead, base)
+        else:
+            holding = np.zeros(n, dtype=np.int64)
+            for i in range(lead, lead + n):
+                check_idx = i - L
+                if base + i >= self.window:
+                    holding[i - lead] = self._step(base + i, o[i], h[i], l[i], c[i], is_sh[check_idx], is_sl[check_idx], h[check_idx], l[check_idx])
+                else:
+                    holding[i - lead] = self._step(base + i, o[i], h[i], l[i], c[i])
+
+        # Forward Fill Signal: Jika Signal 1 (Buy), set state jadi 1.
+        # Jika Signal -1 (Kena Bearish OB), state jadi -1 (Short; backtester long-only menganggapnya Cash)
+        self._highs.extend(h[-self.window:])
+        self._lows.extend(l[-self.window:])
+        return {'Swing_High': swing_high[lead:], 'Swing_Low': swing_low[lead:], 'Is_Swing_High': is_sh[lead:],
+                'Is_Swing_Low': is_sl[lead:], 'Signal': holding}
+
+    def _prime_kernel(self, o, h, l, c, is_sh, is_sl, start=0, base=0):
+        """Loop prime lewat kernels.smc_scan (compiled), lalu pindahkan state hasilnya ke objek."""
+        n = len(c) - start
+        state = np.array([self.last_swing_high_price, self.last_swing_low_price,
+                          self.last_swing_high_idx, self.last_swing_low_idx,
+                          self.signal, self._prev_close, self._ob_seq], dtype=np.float64)
+        last_red = np.array(self.last_red or (-1, 0.0, 0.0), dtype=np.float64)
+        last_green = np.array(self.last_green or (-1, 0.0, 0.0), dtype=np.float64)
+
+        # Maksimal 1 OB baru per tipe per bar
+        books = (self.bullish_obs, self.bearish_obs)
+        arrays = []
+        for book in books:
+            obs = np.zeros((len(book) + n, 3))
+            obs[:len(book)] = np.column_stack([book.top, book.bottom, book.seq]) if len(book) else 0
+            arrays.append(obs)
+        n_obs = np.array([len(book) for book in books], dtype=np.int64)
+
+        holding = np.zeros(n, dtype=np.int64)
+        kernels.smc_scan(o, h, l, c, is_sh, is_sl, self.swing_length, start, base, state, last_red, last_green,
+                         arrays[0], arrays[1], n_obs, holding)
+
+        self.last_swing_high_price, self.last_swing_low_price = float(state[0]), float(state[1])
+        self.last_swing_high_idx, self.last_swing_low_idx = int(state[2]), int(state[3])
+        self.signal, self._prev_close, self._ob_seq = int(state[4]), float(state[5]), int(state[6])
+        self.last_red = (int(last_red[0]), float(last_red[1]), float(last_red[2])) if last_red[0] >= 0 else None
+        self.last_green = (int(last_green[0]), float(last_green[1]), float(last_green[2])) if last_green[0] >= 0 else None
+        for book, obs, count in zip(books, arrays, n_obs):
+            live = obs[:count] # Kernel menjaga urutan bottom yang sama dengan OrderBlockBook
+            book.top, book.bottom = live[:, 0].tolist(), live[:, 1].tolist()
+            book.seq = live[:, 2].astype(np.int64).tolist()
+            if count:
+                book.max_height = max(book.max_height, float((live[:, 0] - live[:, 1]).max()))
+        self._bars += n
+        return holding
+
+    def update(self, candle):
+        o, h, l, c = (float(candle[k]) for k in ('Open', 'High', 'Low', 'Close'))
+        self._highs.append(h)
+        self._lows.append(l)
+        i = self._bars
+        if i >= self.window:
+            # Candle di tengah window (i - swing_length) sekarang sudah bisa dinilai swing atau bukan
+            check_high = self._highs[self.swing_length]
+            check_low = self._lows[self.swing_length]
+            return self._step(i, o, h, l, c, check_high == max(self._highs), check_low == min(self._lows), check_high, check_low)
+        return self._step(i, o, h, l, c)
+
+    def _step(self, i, current_open, current_high, current_low, current_close,
+              is_swing_high=False, is_swing_low=False, check_high=0.0, check_low=0.0):
+        """Proses bar ke-i (loop dimulai dari candle ke-`window`), return posisi (1/0)."""
+        prev_close = self._prev_close
+
+        if i >= self.window:
+            # A. UPDATE SWING (Hanya update jika swing sudah terkonfirmasi swing_length bar lalu)
+            check_idx = i - self.swing_length
+            if is_swing_high:
+                self.last_swing_high_price = check_high
+                self.last_swing_high_idx = check_idx
+            if is_swing_low:
+                self.last_swing_low_price = check_low
+                self.last_swing_low_idx = check_idx
+
+            # B. DETEKSI BOS & PEMBUATAN ORDER BLOCK
+
+            # --- BULLISH BOS (Harga Close tembus Swing High Terakhir) ---
+            if self.last_swing_high_price > 0 and current_close > self.last_swing_high_price:
+                # Pastikan ini fresh breakout (bar sebelumnya belum tembus)
+                if prev_close <= self.last_swing_high_price:
+                    # BOS Terjadi! Ambil candle merah TERAKHIR di antara Swing Low terakhir dan Breakout ini
+                    if self.last_red is not None and self.last_red[0] >= self.last_swing_low_idx:
+                        # Definisi Zone OB: Dari Low sampai High candle tersebut
+                        _, ob_top, ob_bottom = self.last_red
+                        self.bullish_obs.add(ob_top, ob_bottom, self._ob_seq)
+                        self._ob_seq += 1
+
+            # --- BEARISH BOS (Harga Close tembus Swing Low Terakhir) ---
+            if self.last_swing_low_price > 0 and current_close < self.last_swing_low_price:
+                if prev_close >= self.last_swing_low_price:
+                    # BOS Bearish! Cari Bearish OB (Candle Hijau Terakhir)
+                    if self.last_green is not None and self.last_green[0] >= self.last_swing_high_idx:
+                        _, ob_top, ob_bottom = self.last_green
+                        self.bearish_obs.add(ob_top, ob_bottom, self._ob_seq)
+                        self._ob_seq += 1
+
+            # C. CEK MITIGATION (ENTRY SIGNAL)
+            # Semua OB yang tersentuh langsung dipakai (sekali pakai) dan dibuang.
+            # Bullish OB: Low menyentuh zona (Low <= top) tapi Close tidak jebol bawah (Close >= bottom)
+            bull_hit = self.bullish_obs.take(current_close, current_low)
+            # Bearish OB: High menyentuh zona (High >= bottom) dan Close <= top
+            bear_hit = self.bearish_obs.take(current_high, current_close)
+
+            # Kalau dua tipe kena di bar yang sama, OB yang dibuat paling akhir yang menentukan
+            if bull_hit > bear_hit:
+                self.signal = 1
+            elif bear_hit > bull_hit:
+                self.signal = -1 # Short (backtester long-only: close posisi long)
+
+        # Catat candle merah/hijau terakhir (kandidat OB untuk bar berikutnya)
+        if current_close < current_open:
+            self.last_red = (i, current_high, current_low)
+        elif current_close > current_open:
+            self.last_green = (i, current_high, current_low)
+
+        self._prev_close = current_close
+        self._bars = i + 1
+        return self.signal
@@ -1,117 +1,116 @@
 import pandas as pd
 import numpy as np
+from indicators.volatility import Supertrend
+from indicators.kernels import hold_state
+from indicators.scratch import take
 
-def calculate_supertrend(df, period=10, multiplier=3):
+# Metadata registry (dibaca tanpa import modul, lihat engine/registry.py)
+STRATEGY = {
+    'label': "Supertrend (Trend Follower)",
+    'params': {
+        'period': {'type': 'int', 'default': 10, 'min': 2, 'max': 100},
+        'multiplier': {'type': 'float', 'default': 3, 'min': 0.5, 'max': 10.0},
+    },
+    'indicators': ['ATR', 'Supertrend'],
+}
+
+def warmup_bars(period=10, **_):
+    """
+    None = butuh seluruh histori. ATR-nya konvergen, tapi band final hanya boleh mendekati
+    harga dan arah tren dibawa terus dari bar pertama, jadi sinyal bergantung titik mulai data
+    (di dashboard: tanggal mulai yang dipilih).
+    """
+    return None
+
+def calculate_supertrend(df, period=10, multiplier=3, indicator=None):
     """
     Menghitung Indikator Supertrend secara manual.
     Period: 10 (Standar)
     Multiplier: 3 (Semakin besar, semakin jarang sinyal tapi semakin akurat tren besar)
     """
     df = df.copy()
-    
-    # 1. Hitung ATR (Average True Range)
-    df['H-L'] = df['High'] - df['Low']
-    df['H-PC'] = abs(df['High'] - df['Close'].shift(1))
-    df['L-PC'] = abs(df['Low'] - df['Close'].shift(1))
-    df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
-    df['ATR'] = df['TR'].ewm(alpha=1/period, adjust=False).mean()
+    indicator = indicator or Supertrend(period, multiplier)
 
-    # 2. Hitung Basic Upper & Lower Bands
-    # Basic Upper = (High + Low) / 2 + (Multiplier * ATR)
-    # Basic Lower = (High + Low) / 2 - (Multiplier * ATR)
-    hl2 = (df['High'] + df['Low']) / 2
-    df['Basic_Upper'] = hl2 + (multiplier * df['ATR'])
-    df['Basic_Lower'] = hl2 - (multiplier * df['ATR'])
-
-    # 3. Hitung Final Upper & Lower Bands (Looping)
+    # 1. ATR (Average True Range), 2. Basic Bands, 3. Final Bands, 4. Arah Trend
     # Aturan: Final Band tidak boleh menjauh dari harga, hanya boleh mendekat atau datar.
-    
-    final_upper = [0.0] * len(df)
-    final_lower = [0.0] * len(df)
-    supertrend = [0.0] * len(df)
-    trend_dir = [1] * len(df) # 1: Uptrend (Green), -1: Downtrend (Red)
-    
-    # Inisialisasi
-    for i in range(len(df)):
-        if i == 0:
-            final_upper[i] = df['Basic_Upper'].iloc[i]
-            final_lower[i] = df['Basic_Lower'].iloc[i]
-            continue
+    bands = indicator.bulk(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())
 
-        prev_final_upper = final_upper[i-1]
-        prev_final_lower = final_lower[i-1]
-        prev_close = df['Close'].iloc[i-1]
-        
-        # Kalkulasi Final Upper
-        if (df['Basic_Upper'].iloc[i] < prev_final_upper) or (prev_close > prev_final_upper):
-            final_upper[i] = df['Basic_Upper'].iloc[i]
-        else:
-            final_upper[i] = prev_final_upper
-            
-        # Kalkulasi Final Lower
-        if (df['Basic_Lower'].iloc[i] > prev_final_lower) or (prev_close < prev_final_lower):
-            final_lower[i] = df['Basic_Lower'].iloc[i]
-        else:
-            final_lower[i] = prev_final_lower
-            
-    # 4. Tentukan Arah Trend (Supertrend Logic)
-    for i in range(1, len(df)):
-        prev_trend = trend_dir[i-1]
-        prev_st = supertrend[i-1]
-        curr_close = df['Close'].iloc[i]
-        
-        if prev_trend == 1: # Sedang Uptrend
-            if curr_close < final_lower[i]:
-                trend_dir[i] = -1 # Ganti jadi Downtrend
-            else:
-                trend_dir[i] = 1
-        else: # Sedang Downtrend
-            if curr_close > final_upper[i]:
-                trend_dir[i] = 1 # Ganti jadi Uptrend
-            else:
-                trend_dir[i] = -1
-        
-        # Set nilai Supertrend Line
-        if trend_dir[i] == 1:
-            supertrend[i] = final_lower[i]
-        else:
-            supertrend[i] = final_upper[i]
-            
-    df['Supertrend'] = supertrend
-    df['Trend_Dir'] = trend_dir
+    df['ATR'] = bands['ATR']
+    df['Basic_Upper'] = bands['Basic_Upper']
+    df['Basic_Lower'] = bands['Basic_Lower']
+    df['Supertrend'] = bands['Supertrend']
+    df['Trend_Dir'] = bands['Trend_Dir']
     
     return df
 
-def apply_strategy(df):
+def indicator_inputs(period=10, multiplier=3, **_):
+    """Node indikator bersama (indicators.graph) yang dibaca compute()."""
+    return [('Supertrend', period, multiplier)]
+
+def apply_strategy(df, period=10, multiplier=3):
     """
     Strategi Supertrend Murni.
     Buy: Saat Trend berubah jadi 1 (Hijau/Uptrend)
     Sell: Saat Trend berubah jadi -1 (Merah/Downtrend)
     """
-    df = calculate_supertrend(df, period=10, multiplier=3)
-    
-    df['Signal'] = 0
-    
-    # Deteksi Perubahan Tren
-    # Trend Sekarang 1 DAN Trend Kemarin -1 => BUY
-    buy_cond = (df['Trend_Dir'] == 1) & (df['Trend_Dir'].shift(1) == -1)
-    
-    # Trend Sekarang -1 DAN Trend Kemarin 1 => SELL
-    sell_cond = (df['Trend_Dir'] == -1) & (df['Trend_Dir'].shift(1) == 1)
-    
-    df.loc[buy_cond, 'Signal'] = 1
-    df.loc[sell_cond, 'Signal'] = -1
-    
-    # Ffill Logic untuk Holding
-    current_signal = 0
-    signal_col = []
-    
-    for i in range(len(df)):
-        s = df['Signal'].iloc[i]
-        if s == 1: current_signal = 1
-        elif s == -1: current_signal = 0
-        signal_col.append(current_signal)
+    return StrategyStream(period, multiplier).prime(df)
+
+class StrategyStream:
+    """Versi incremental apply_strategy: prime() dengan histori, lalu update() per candle."""
+
+    def __init__(self, period=10, multiplier=3):
+        self.indicator = Supertrend(period, multiplier)
+        self.input_keys = indicator_inputs(period, multiplier)
+        self.signal = 0
+
+    def prime(self, df, inputs=None):
+        df = df.copy()
+        for name, values in self.compute(df, inputs=inputs).items():
+            df[name] = values
+        return df
+
+    def compute(self, candles, scratch=None, inputs=None):
+        """
+        Inti prime() atas array: `candles` = DataFrame atau dict kolom OHLCV (mis. view dataset).
+        Return dict kolom indikator + 'Signal'; dengan `scratch`, sinyal mentah memakai buffer kerja.
+        Panggilan berikutnya melanjutkan state (data per blok = hasil satu run penuh).
+        `inputs` (opsional): {node: array} dari indicators.graph.IndicatorGraph atas data yang sama,
+        dipakai menggantikan hitungan indikator sendiri (sekali jalan: state indikator tidak ikut maju).
+        """
+        prev_trend = self.indicator.trend
+        if inputs is None:
+            bands = self.indicator.extend(*(np.asarray(candles[col], dtype=np.float64) for col in ('High', 'Low', 'Close')))
+        else:
+            bands = inputs[self.input_keys[0]]
+        trend = bands['Trend_Dir']
         
-    df['Signal'] = signal_col
-    
-    return df
\ No newline at end of file
+        raw = take(scratch, 'raw_signal', len(trend), np.int64)
+        raw[:] = 0
+        
+        # Deteksi Perubahan Tren
+        # Trend Sekarang 1 DAN Trend Kemarin -1 => BUY
+        raw[1:][(trend[1:] == 1) & (trend[:-1] == -1)] = 1
+        
+        # Trend Sekarang -1 DAN Trend Kemarin 1 => SELL
+        raw[1:][(trend[1:] == -1) & (trend[:-1] == 1)] = -1
+
+        # Bar pertama dibandingkan dengan arah terakhir blok sebelumnya
+        if len(trend) and trend[0] != prev_trend:
+            raw[0] = trend[0]
+        
+        # Ffill Logic untuk Holding
+        signal = hold_state(raw, self.signal)
+        self.signal = int(signal[-1]) if len(signal) else 0
+        
+        columns = {name: bands[name] for name in ('ATR', 'Basic_Upper', 'Basic_Lower', 'Supertrend', 'Trend_Dir')}
+        columns['Signal'] = signal
+        return columns
+
+    def update(self, candle):
+        prev_trend = self.indicator.trend
+        _, trend = self.indicator.update(float(candle['High']), float(candle['Low']), float(candle['Close']))
+        if trend == 1 and prev_trend == -1:
+            self.signal = 1
+        elif trend == -1 and prev_trend == 1:
+            self.signal = -1
+        return self.signal
@@ -1,51 +1,47 @@
 import pandas as pd
 import numpy as np
+from indicators.moving import EMA
+from indicators.momentum import RSI, ADX
+from indicators.kernels import hold_state
+from indicators.scratch import take
 
-def calculate_adx(df, period=14):
+# Metadata registry (dibaca tanpa import modul, lihat engine/registry.py)
+STRATEGY = {
+    'label': "Triple EMA Trend",
+    'params': {
+        'ema_fast': {'type': 'int', 'default': 8, 'min': 2, 'max': 100},
+        'ema_slow': {'type': 'int', 'default': 21, 'min': 2, 'max': 200},
+        'ema_mid': {'type': 'int', 'default': 50, 'min': 2, 'max': 300},
+        'ema_trend': {'type': 'int', 'default': 200, 'min': 2, 'max': 1000},
+        'rsi_period': {'type': 'int', 'default': 14, 'min': 2, 'max': 100},
+        'rsi_min': {'type': 'float', 'default': 50, 'min': 0, 'max': 100},
+        'rsi_max': {'type': 'float', 'default': 70, 'min': 0, 'max': 100},
+        'adx_period': {'type': 'int', 'default': 14, 'min': 2, 'max': 100},
+        'adx_threshold': {'type': 'float', 'default': 20, 'min': 0, 'max': 100},
+    },
+    'indicators': ['EMA', 'RSI', 'ADX'],
+}
+
+def warmup_bars(ema_fast=8, ema_slow=21, ema_mid=50, ema_trend=200, rsi_period=14, adx_period=14, **_):
+    """EMA terpanjang & RSI ~95% konvergen; ADX butuh 2x smoothing Wilder sebelum stabil."""
+    longest_ema = max(ema_fast, ema_slow, ema_mid, ema_trend)
+    return max(3 * (longest_ema + 1) // 2, 3 * rsi_period, 5 * adx_period)
+
+def indicator_inputs(ema_fast=8, ema_slow=21, ema_mid=50, ema_trend=200, rsi_period=14, adx_period=14, **_):
+    """Node indikator bersama (indicators.graph) yang dibaca compute(), urutan: 4 EMA, RSI, ADX."""
+    return [('EMA', span) for span in (ema_fast, ema_slow, ema_mid, ema_trend)] + [('RSI', rsi_period), ('ADX', adx_period)]
+
+def calculate_adx(df, period=14, indicator=None):
     """
     Fungsi bantuan untuk menghitung ADX (Kekuatan Tren) secara manual
+    (TR, +DM/-DM, Wilder's Smoothing mirip tradingview, DI+/DI-, DX, ADX).
     """
-    df = df.copy()
-    
-    # 1. Hitung True Range (TR)
-    df['H-L'] = df['High'] - df['Low']
-    df['H-PC'] = abs(df['High'] - df['Close'].shift(1))
-    df['L-PC'] = abs(df['Low'] - df['Close'].shift(1))
-    df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
-    
-    # 2. Directional Movement (DM)
-    df['UpMove'] = df['High'] - df['High'].shift(1)
-    df['DownMove'] = df['Low'].shift(1) - df['Low']
-    
-    df['+DM'] = np.where((df['UpMove'] > df['DownMove']) & (df['UpMove'] > 0), df['UpMove'], 0)
-    df['-DM'] = np.where((df['DownMove'] > df['UpMove']) & (df['DownMove'] > 0), df['DownMove'], 0)
-    
-    # 3. Smoothed TR and DM (Wilder's Smoothing)
-    # Fungsi manual untuk smoothing mirip tradingview
-    def wilder_smooth(series, period):
-        res = [np.nan] * len(series)
-        # Initial value: Simple Moving Average
-        if len(series) > period:
-            res[period-1] = series.iloc[0:period].mean() 
-            for i in range(period, len(series)):
-                res[i] = res[i-1] - (res[i-1]/period) + series.iloc[i]
-        return res
-
-    df['TR14'] = wilder_smooth(df['TR'], period)
-    df['+DM14'] = wilder_smooth(df['+DM'], period)
-    df['-DM14'] = wilder_smooth(df['-DM'], period)
-
-    # 4. DI+ dan DI-
-    df['+DI'] = 100 * (df['+DM14'] / df['TR14'])
-    df['-DI'] = 100 * (df['-DM14'] / df['TR14'])
-    
-    # 5. ADX
-    df['DX'] = 100 * abs(df['+DI'] - df['-DI']) / (df['+DI'] + df['-DI'])
-    df['ADX'] = pd.Series(wilder_smooth(df['DX'], period), index=df.index)
-    
-    return df['ADX']
+    indicator = indicator or ADX(period)
+    adx = indicator.bulk(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())
+    return pd.Series(adx, index=df.index)
 
-def apply_strategy(df):
+def apply_strategy(df, ema_fast=8, ema_slow=21, ema_mid=50, ema_trend=200,
+                   rsi_period=14, rsi_min=50, rsi_max=70, adx_period=14, adx_threshold=20):
     """
     Strategi: Triple EMA Trend + ADX Filter (Revised)
     
@@ -54,70 +50,118 @@ def apply_strategy(df):
     - Menghapus Exit Signal EMA Cross Down yang terlalu sensitif.
     - Exit hanya mengandalkan SL/TP atau Patah Tren Utama (Close < EMA 50).
     """
-    df = df.copy()
-    
-    # --- 1. HITUNG INDIKATOR ---
-    df['EMA_8'] = df['Close'].ewm(span=8, adjust=False).mean()
-    df['EMA_21'] = df['Close'].ewm(span=21, adjust=False).mean()
-    df['EMA_50'] = df['Close'].ewm(span=50, adjust=False).mean() # Ganti 200 jadi 50 biar lebih responsif
-    df['EMA_200'] = df['Close'].ewm(span=200, adjust=False).mean()
-    
-    # RSI
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).fillna(0)
-    loss = (-delta.where(delta < 0, 0)).fillna(0)
-    avg_gain = gain.ewm(com=13, min_periods=14).mean()
-    avg_loss = loss.ewm(com=13, min_periods=14).mean()
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-
-    # ADX (Filter Kekuatan Tren)
-    df['ADX'] = calculate_adx(df)
-
-    # --- 2. LOGIKA SIGNAL ---
-    df['Signal'] = 0
-    
-    crossover_up = (df['EMA_8'] > df['EMA_21']) & (df['EMA_8'].shift(1) <= df['EMA_21'].shift(1))
-    
-    # --- LOGIKA ENTRY (BUY) ---
-    # Syarat Diperketat:
-    # 1. Tren Besar Bullish (Harga > EMA 200)
-    # 2. Golden Cross (8 memotong 21)
-    # 3. Momentum RSI Bagus (50-70)
-    # 4. ADX > 20 (WAJIB ADA TREN KUAT, JANGAN SIDEWAYS)
-    
-    buy_condition = (
-        (df['Close'] > df['EMA_200']) &    
-        crossover_up &                     
-        (df['RSI'] > 50) &                 
-        (df['RSI'] < 70) &
-        (df['ADX'] > 20)  # <--- Filter Baru "Anti Sideways"
-    )
-    
-    # --- LOGIKA EXIT (SELL) ---
-    # Exit diperlonggar: Jangan keluar cuma gara-gara cross down kecil.
-    # Keluar hanya jika harga jebol EMA 50 (Tren jangka menengah rusak)
-    
-    sell_condition = (df['Close'] < df['EMA_50'])
-    
-    # Terapkan Sinyal
-    df.loc[buy_condition, 'Signal'] = 1
-    df.loc[sell_condition, 'Signal'] = -1
-    
-    # Loop Manual untuk State Holding
-    current_signal = 0
-    signal_col = []
-    
-    for i in range(len(df)):
-        signal_val = df['Signal'].iloc[i]
+    return StrategyStream(ema_fast, ema_slow, ema_mid, ema_trend, rsi_period,
+                          rsi_min, rsi_max, adx_period, adx_threshold).prime(df)
+
+class StrategyStream:
+    """Versi incremental apply_strategy: prime() dengan histori, lalu update() per candle."""
+
+    def __init__(self, ema_fast=8, ema_slow=21, ema_mid=50, ema_trend=200,
+                 rsi_period=14, rsi_min=50, rsi_max=70, adx_period=14, adx_threshold=20):
+        self.spans = (ema_fast, ema_slow, ema_mid, ema_trend)
+        self.rsi_min = rsi_min
+        self.rsi_max = rsi_max
+        self.adx_threshold = adx_threshold
+
+        self.emas = [EMA(span) for span in self.spans]
+        self.rsi = RSI(rsi_period)
+        self.adx = ADX(adx_period)
+        self.input_keys = indicator_inputs(ema_fast, ema_slow, ema_mid, ema_trend, rsi_period, adx_period)
+        self._prev_fast = np.nan
+        self._prev_slow = np.nan
+        self.signal = 0
+
+    def prime(self, df, inputs=None):
+        df = df.copy()
+        for name, values in self.compute(df, inputs=inputs).items():
+            df[name] = values
+        return df
+
+    def compute(self, candles, scratch=None, inputs=None):
+        """
+        Inti prime() atas array: `candles` = DataFrame atau dict kolom OHLCV (mis. view dataset).
+        Return dict kolom indikator + 'Signal'; dengan `scratch`, sinyal mentah memakai buffer kerja.
+        Panggilan berikutnya melanjutkan state (data per blok = hasil satu run penuh).
+        `inputs` (opsional): {node: array} dari indicators.graph.IndicatorGraph atas data yang sama,
+        dipakai menggantikan hitungan indikator sendiri (sekali jalan: state indikator tidak ikut maju).
+        """
+        close = np.asarray(candles['Close'], dtype=np.float64)
+        n = len(close)
         
-        if signal_val == 1: 
-            current_signal = 1
-        elif signal_val == -1: 
-            current_signal = 0
-            
-        signal_col.append(current_signal)
+        # --- 1. HITUNG INDIKATOR ---
+        if inputs is not None:
+            shared = [inputs[key] for key in self.input_keys]
+        columns = {}
+        for k, (span, ema) in enumerate(zip(self.spans, self.emas)):
+            # EMA mid 50 (bukan 200) biar lebih responsif
+            columns[f'EMA_{span}'] = ema.extend(close) if inputs is None else shared[k]
+        ema_fast, ema_slow, ema_mid, ema_trend = (columns[f'EMA_{span}'] for span in self.spans)
         
-    df['Signal'] = signal_col
-    
-    return df
\ No newline at end of file
+        # RSI
+        rsi = columns['RSI'] = self.rsi.extend(close) if inputs is None else shared[4]
+
+        # ADX (Filter Kekuatan Tren)
+        if inputs is None:
+            adx = self.adx.extend(np.asarray(candles['High'], dtype=np.float64),
+                                  np.asarray(candles['Low'], dtype=np.float64), close)
+        else:
+            adx = shared[5]
+        columns['ADX'] = adx
+
+        # --- 2. LOGIKA SIGNAL ---
+        raw = take(scratch, 'raw_signal', n, np.int64)
+        raw[:] = 0
+        
+        # Cross bar ini vs bar sebelumnya (bar pertama vs EMA terakhir blok lalu; di awal data -> False)
+        crossover_up = (ema_fast > ema_slow) & (np.r_[self._prev_fast, ema_fast[:-1]] <= np.r_[self._prev_slow, ema_slow[:-1]])
+        
+        # --- LOGIKA ENTRY (BUY) ---
+        # Syarat Diperketat:
+        # 1. Tren Besar Bullish (Harga > EMA 200)
+        # 2. Golden Cross (8 memotong 21)
+        # 3. Momentum RSI Bagus (50-70)
+        # 4. ADX > 20 (WAJIB ADA TREN KUAT, JANGAN SIDEWAYS)
+        
+        buy_condition = (
+            (close > ema_trend) &    
+            crossover_up &                     
+            (rsi > self.rsi_min) &                 
+            (rsi < self.rsi_max) &
+            (adx > self.adx_threshold)  # <--- Filter Baru "Anti Sideways"
+        )
+        
+        # --- LOGIKA EXIT (SELL) ---
+        # Exit diperlonggar: Jangan keluar cuma gara-gara cross down kecil.
+        # Keluar hanya jika harga jebol EMA 50 (Tren jangka menengah rusak)
+        
+        sell_condition = (close < ema_mid)
+        
+        # Terapkan Sinyal
+        raw[buy_condition] = 1
+        raw[sell_condition] = -1
+        
+        # State Holding (1 = long, -1 = short / keluar, 0 = tahan posisi)
+        signal = hold_state(raw, self.signal)
+        columns['Signal'] = signal
+
+        self.signal = int(signal[-1]) if n else 0
+        if n:
+            self._prev_fast = ema_fast[-1]
+            self._prev_slow = ema_slow[-1]
+        return columns
+
+    def update(self, candle):
+        close = float(candle['Close'])
+        ema_fast, ema_slow, ema_mid, ema_trend = (ema.update(close) for ema in self.emas)
+        rsi = self.rsi.update(close)
+        adx = self.adx.update(float(candle['High']), float(candle['Low']), close)
+
+        crossover_up = ema_fast > ema_slow and self._prev_fast <= self._prev_slow
+        self._prev_fast, self._prev_slow = ema_fast, ema_slow
+
+        # Exit (Close < EMA mid) menang atas entry di bar yang sama
+        if close < ema_mid:
+            self.signal = -1
+        elif close > ema_trend and crossover_up and self.rsi_min < rsi < self.rsi_max and adx > self.adx_threshold:
+            self.signal = 1
+        return self.signal
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul repo di-import sebagai namespace package dari root (sama seperti app.py / bench)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,190 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import registry
+from engine.backtester import _run_backtest_positions, run_backtest, run_backtest_grid, simulate_positions
+from engine.results import EXIT_SIGNAL, EXIT_SL, EXIT_TP
+
+METRICS = ('total_return_pct', 'max_drawdown_pct', 'win_rate')
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(3000, seed=1)
+
+@pytest.mark.parametrize('name', registry.names())
+@pytest.mark.parametrize('sl_pct, tp_pct', [(0.0, 0.0), (0.02, 0.0), (0.0, 0.03), (0.02, 0.04)])
+def test_vectorized_matches_loop(candles, name, sl_pct, tp_pct):
+    df_s = registry.get(name).apply(candles)
+    vectorized = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct)
+    loop = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct, mode="loop")
+
+    assert len(loop['trade_log']) > 0
+    pd.testing.assert_frame_equal(vectorized['trade_log'], loop['trade_log'])
+    pd.testing.assert_series_equal(vectorized['equity_curve'], loop['equity_curve'])
+    for metric in METRICS:
+        assert vectorized[metric] == loop[metric], metric
+
+@pytest.mark.parametrize('option', [{'fee_pct': 0.001}, {'slippage_pct': 0.001}, {'allow_short': True},
+                                    {'max_positions': 2}, {'intrabar': True}])
+def test_loop_rejects_execution_options(candles, option):
+    df_s = registry.get('simple_ma').apply(candles)
+    with pytest.raises(ValueError):
+        run_backtest(df_s, mode="loop", **option)
+
+def test_unknown_mode_raises(candles):
+    with pytest.raises(ValueError):
+        run_backtest(registry.get('simple_ma').apply(candles), mode="numba")
+
+@pytest.mark.parametrize('sl_pct, tp_pct', [(0.01, 0.02), (0.002, 0.004)])
+def test_long_constant_run_stays_fast(sl_pct, tp_pct):
+    # Satu run Signal=1 sepanjang data: puluhan ribu re-entry SL/TP di dalam run yang sama
+    df_s = make_ohlcv(100_000, seed=9).assign(Signal=1)
+
+    started = time.perf_counter()
+    loop = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct, mode="loop")
+    loop_time = time.perf_counter() - started
+    started = time.perf_counter()
+    vectorized = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct)
+    vectorized_time = time.perf_counter() - started
+
+    assert len(loop['trade_log']) > 10_000
+    pd.testing.assert_frame_equal(vectorized['trade_log'], loop['trade_log'])
+    assert vectorized['total_return_pct'] == loop['total_return_pct']
+    # Versi kuadratik lama ~60x lebih lambat dari loop di data ini
+    assert vectorized_time < 5 * loop_time + 0.5
+
+def test_nan_signal_matches_loop(candles):
+    df_s = registry.get('bb_rsi').apply(candles)
+    signal = df_s['Signal'].to_numpy(dtype=float, copy=True)
+    signal[np.random.default_rng(0).random(len(signal)) < 0.05] = np.nan
+    df_s = df_s.assign(Signal=signal)
+    vectorized = run_backtest(df_s, sl_pct=0.01, tp_pct=0.02)
+    loop = run_backtest(df_s, sl_pct=0.01, tp_pct=0.02, mode="loop")
+    pd.testing.assert_frame_equal(vectorized['trade_log'], loop['trade_log'])
+    pd.testing.assert_series_equal(vectorized['equity_curve'], loop['equity_curve'])
+
+# --- GRID SL/TP ---
+
+SL_GRID = [0.0, 0.005, 0.01, 0.03]
+TP_GRID = [0.0, 0.004, 0.02, 0.05]
+
+def _noisy_signal(df_s, seed):
+    """Sinyal strategi + -1 & NaN acak (keduanya diperlakukan bukan-long, NaN menahan posisi)."""
+    rng = np.random.default_rng(seed)
+    signal = df_s['Signal'].to_numpy(dtype=float, copy=True)
+    noise = rng.random(len(signal))
+    signal[noise < 0.05] = -1
+    signal[noise > 0.95] = np.nan
+    return df_s.assign(Signal=signal)
+
+@pytest.mark.parametrize('name', registry.names())
+def test_grid_matches_run_backtest(candles, name):
+    df_s = _noisy_signal(registry.get(name).apply(candles), seed=len(name))
+    assert np.isnan(df_s['Signal']).any() and (df_s['Signal'] == -1).any()
+    grid = run_backtest_grid(df_s, SL_GRID, TP_GRID)
+
+    for i, sl_pct in enumerate(SL_GRID):
+        for j, tp_pct in enumerate(TP_GRID):
+            res = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct)
+            cell = (sl_pct, tp_pct)
+            assert grid['trades'][i, j] == (res.trades.records['exit_bar'] >= 0).sum(), cell
+            assert grid['win_rate'][i, j] == res['win_rate'], cell
+            # Return & drawdown grid dihitung di ruang log
+            assert grid['total_return_pct'][i, j] == pytest.approx(res['total_return_pct'], rel=1e-9, abs=1e-9), cell
+            assert grid['max_drawdown_pct'][i, j] == pytest.approx(res['max_drawdown_pct'], rel=1e-9, abs=1e-9), cell
+
+def test_grid_without_long_signal_is_zero(candles):
+    grid = run_backtest_grid(candles.assign(Signal=-1.0), SL_GRID, TP_GRID)
+    assert grid['trades'].shape == (len(SL_GRID), len(TP_GRID))
+    assert not grid['trades'].any() and not grid['total_return_pct'].any()
+
+# --- MODEL POSISI (simulate_positions) ---
+
+def _positions(close, signal, **options):
+    return simulate_positions(np.asarray(close, dtype=float), np.asarray(signal, dtype=float), 1000, **options)
+
+@pytest.mark.parametrize('name', registry.names())
+@pytest.mark.parametrize('sl_pct, tp_pct', [(0.0, 0.0), (0.02, 0.04)])
+def test_positions_default_options_match_legacy(candles, name, sl_pct, tp_pct):
+    # Jalur posisi mengakhiri run di NaN (legacy menahan posisi), jadi bandingkan tanpa NaN
+    df_s = registry.get(name).apply(candles).fillna({'Signal': 0})
+    positions = _run_backtest_positions(df_s, 1000, sl_pct, tp_pct)
+    legacy = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct)
+    pd.testing.assert_frame_equal(positions['trade_log'], legacy['trade_log'])
+    np.testing.assert_allclose(positions['equity_curve'], legacy['equity_curve'], rtol=1e-12)
+
+@pytest.mark.parametrize('move, sl_pct, tp_pct, reason, exit_price', [
+    (1.03, 0.02, 0.0, EXIT_SL, 102.0), # Harga naik = rugi short: SL di atas entry
+    (0.96, 0.0, 0.03, EXIT_TP, 97.0), # Harga turun = untung short: TP di bawah entry
+])
+def test_short_sl_tp_prices(move, sl_pct, tp_pct, reason, exit_price):
+    close = [100, 100, 100, 100 * move, 100 * move]
+    _, records = _positions(close, [-1] * 5, sl_pct=sl_pct, tp_pct=tp_pct, allow_short=True)
+    first = records[0]
+    assert (first['side'], first['entry_bar'], first['exit_bar'], first['reason']) == (-1, 1, 3, reason)
+    assert first['exit_price'] == pytest.approx(exit_price)
+    assert first['return'] == pytest.approx(-sl_pct if reason == EXIT_SL else tp_pct)
+
+def test_short_signal_ignored_without_allow_short():
+    _, records = _positions([100, 100, 90, 90], [-1, -1, 0, 0])
+    assert len(records) == 0
+
+@pytest.mark.parametrize('side', [1, -1])
+def test_fee_and_slippage_on_both_legs(side):
+    fee, slip = 0.001, 0.0005
+    equity, records = _positions([100, 100, 110, 110], [side, 0, 0, 0], fee_pct=fee, slippage_pct=slip,
+                                 allow_short=True)
+    trade = records[0]
+    entry, exit_ = 100 * (1 + side * slip), 110 * (1 - side * slip)
+    gross = side * (exit_ - entry) / entry
+    net = (1 + gross) * (1 - fee) ** 2 - 1
+    assert (trade['entry_bar'], trade['exit_bar'], trade['reason']) == (1, 2, EXIT_SIGNAL)
+    assert trade['entry_price'] == pytest.approx(entry)
+    assert trade['exit_price'] == pytest.approx(exit_)
+    assert trade['return'] == pytest.approx(net)
+    # Fee entry di bar 1, fee exit di bar 2
+    assert equity[1] == pytest.approx(1000 * (1 - fee))
+    assert equity[-1] == pytest.approx(1000 * (1 + net))
+
+def test_flip_on_short_signal():
+    fee = 0.001
+    close = [100, 100, 100, 105, 105, 100]
+    equity, records = _positions(close, [1, 1, -1, -1, 0, 0], fee_pct=fee, allow_short=True)
+    # Exit long & entry short di bar yang sama (bar 3)
+    assert records[['side', 'entry_bar', 'exit_bar']].tolist() == [(1, 1, 3), (-1, 3, 5)]
+    assert (records['reason'] == EXIT_SIGNAL).all()
+    np.testing.assert_allclose(records['return'], [(1.05 * (1 - fee) ** 2) - 1, (1 + 5 / 105) * (1 - fee) ** 2 - 1])
+    assert equity[-1] == pytest.approx(1000 * np.prod(1 + records['return']))
+
+    _, long_only = _positions(close, [1, 1, -1, -1, 0, 0])
+    assert long_only[['side', 'entry_bar', 'exit_bar']].tolist() == [(1, 1, 3)]
+
+@pytest.mark.parametrize('side', [1, -1])
+def test_no_same_direction_reentry_on_exit_bar(side):
+    close = [100, 100, 100 - side * 3, 100 - side * 3, 100 - side * 6, 100 - side * 6, 100 - side * 6]
+    _, records = _positions(close, [side] * len(close), sl_pct=0.02, allow_short=True)
+    # Entry lagi di bar setelah exit SL (bar exit sendiri dilewati); posisi terakhir masih terbuka
+    assert records['entry_bar'].tolist() == [1, 3, 5]
+    assert records['exit_bar'].tolist() == [2, 4, -1]
+    assert (records['reason'][:2] == EXIT_SL).all()
+
+@pytest.mark.parametrize('max_positions, pyramid_bars', [(1, 1), (2, 2), (3, 1), (3, 4)])
+def test_max_positions_caps_open_positions(max_positions, pyramid_bars):
+    n = 40
+    signal = np.r_[np.ones(20), np.zeros(n - 20)]
+    close = 100 + np.arange(n, dtype=float)
+    equity, records = _positions(close, signal, max_positions=max_positions, pyramid_bars=pyramid_bars)
+
+    assert len(records) == max_positions
+    assert sorted(records['slot']) == list(range(max_positions))
+    # Tambah satu posisi tiap pyramid_bars bar selama sinyal bertahan
+    assert records['entry_bar'].tolist() == [1 + slot * pyramid_bars for slot in range(max_positions)]
+    open_positions = [((records['entry_bar'] <= bar) & (bar < records['exit_bar'])).sum() for bar in range(n)]
+    assert max(open_positions) == max_positions
+    assert equity[0] == pytest.approx(1000)
+
+def test_max_positions_must_be_positive():
+    with pytest.raises(ValueError):
+        _positions([100, 101], [1, 1], max_positions=0)
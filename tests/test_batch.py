@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import batch
+from engine.__main__ import main
+
+CANDLES = make_ohlcv(2000, freq='1h', start='2024-01-01', seed=6)
+
+def fake_loader(symbol, timeframe, start, **_):
+    """Loader offline: BAD/USDT gagal seperti simbol yang tidak ada di exchange."""
+    if symbol == 'BAD/USDT':
+        raise ConnectionError("simbol tidak ditemukan")
+    return CANDLES.loc[CANDLES.index >= pd.to_datetime(start)]
+
+SPEC = {
+    'symbols': ['BTC/USDT', 'BAD/USDT'],
+    'timeframes': '1h',
+    'strategies': ['simple_ma', {'name': 'supertrend', 'params': {'bogus': 1}}, 'smc'],
+    'start': '2024-01-10',
+    'end': '2024-03-01',
+}
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_failed_jobs_become_error_rows(max_workers):
+    metrics, logs, equities = batch.run_batch(SPEC, max_workers=max_workers, loader=fake_loader)
+
+    assert len(metrics) == 6
+    rows = metrics.set_index(['symbol', 'strategy'])
+    for strategy in ('simple_ma', 'smc'):
+        assert pd.isna(rows.loc[('BTC/USDT', strategy), 'error'])
+        assert rows.loc[('BTC/USDT', strategy), 'bars'] > 0
+    assert 'bogus' in rows.loc[('BTC/USDT', 'supertrend'), 'error']
+    assert (rows.loc['BAD/USDT', 'error'].str.contains('ConnectionError')).all()
+    assert len(equities[rows.loc[('BTC/USDT', 'smc'), 'job_id']]) > 0
+
+def test_cli_exit_code_reports_failed_jobs(tmp_path, monkeypatch, capsys):
+    run_batch = batch.run_batch
+    monkeypatch.setattr(batch, 'run_batch', lambda spec, **kwargs: run_batch(spec, loader=fake_loader,
+                                                                            max_workers=1))
+    args = ['run', '--symbols', 'BTC/USDT', '--timeframes', '1h', '--start', '2024-01-10', '--end', '2024-03-01',
+            '--out', str(tmp_path), '--quiet']
+
+    assert main(args + ['--strategies', 'simple_ma,smc']) == 0
+    assert main(args + ['--strategies', 'simple_ma', '--symbols', 'BTC/USDT,BAD/USDT']) == 1
+    assert (tmp_path / 'metrics.csv').exists()
+    assert 'job gagal' in capsys.readouterr().err
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import registry
+from engine.backtester import run_backtest
+from engine.candle_store import OHLCV_COLUMNS
+from engine.chunked import run_chunked
+from engine.dataset import OHLCVDataset, compute_signals, write_dataset
+
+N_BARS = 6000
+BLOCKS = [1000, 97, 2999, N_BARS - 1, N_BARS, 2 * N_BARS]
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(N_BARS, seed=4)
+
+@pytest.fixture(scope='module')
+def dataset_path(candles, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('dataset'))
+    ts = candles.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    write_dataset(path, ts, candles[list(OHLCV_COLUMNS)].to_numpy())
+    return path
+
+@pytest.mark.parametrize('name', registry.names())
+@pytest.mark.parametrize('sl_pct, tp_pct', [(0.0, 0.0), (0.01, 0.02)])
+def test_chunked_matches_single_pass(candles, dataset_path, name, sl_pct, tp_pct):
+    spec = registry.get(name)
+    single = run_backtest(spec.apply(candles), sl_pct=sl_pct, tp_pct=tp_pct)
+    assert len(single.trades) > 0
+
+    for block in BLOCKS:
+        chunked = run_chunked(spec, OHLCVDataset(dataset_path), sl_pct=sl_pct, tp_pct=tp_pct, block=block)
+        np.testing.assert_array_equal(np.asarray(chunked.equity), single.equity, err_msg=f'block={block}')
+        np.testing.assert_array_equal(np.asarray(chunked.drawdown), single.drawdown, err_msg=f'block={block}')
+        for field in single.trades.records.dtype.names:
+            np.testing.assert_array_equal(chunked.trades.records[field], single.trades.records[field],
+                                          err_msg=f'block={block} {field}')
+        for metric in ('total_return_pct', 'max_drawdown_pct', 'win_rate'):
+            assert chunked[metric] == single[metric], (block, metric)
+        # Index dataset beresolusi ms, frame in-memory us: samakan dulu sebelum bandingkan
+        pd.testing.assert_frame_equal(chunked.trade_log.astype({'Tanggal': single.trade_log['Tanggal'].dtype}),
+                                      single.trade_log)
+
+@pytest.mark.parametrize('name', registry.names())
+def test_compute_signals_matches_single_pass(candles, dataset_path, name):
+    spec = registry.get(name)
+    expected = spec.apply(candles)['Signal'].to_numpy()
+    for window in (1, 333, N_BARS):
+        if window == 1 and name != 'simple_ma':
+            continue # Satu bar per window: cukup satu strategi, lambat untuk semuanya
+        signals = compute_signals(spec, OHLCVDataset(dataset_path), window=window)
+        np.testing.assert_array_equal(np.asarray(signals), expected, err_msg=f'window={window}')
@@ -0,0 +1,118 @@
+import json
+import time
+import numpy as np
+import pytest
+from bench.exchange import StandInExchange
+from engine import data_loader
+from engine.candle_store import CandleStore
+from engine.data_loader import (FetchStats, RateLimiter, get_binance_data,
+                                _fetch_ohlcv_range, _fetch_ohlcv_sharded, _fetch_page)
+
+N_BARS = 10_000
+LIMIT = 1000
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Backoff retry tanpa menunggu (exchange palsu di tes ini tanpa latency)."""
+    monkeypatch.setattr(data_loader.time, 'sleep', lambda seconds: None)
+
+def _since(exchange):
+    return int(exchange.timestamps[0])
+
+# --- SHARDING ---
+
+def test_sharded_matches_sequential():
+    sequential = StandInExchange(N_BARS)
+    expected = _fetch_ohlcv_range(sequential, 'BTC/USDT', '1m', _since(sequential), limit=LIMIT)
+
+    sharded = StandInExchange(N_BARS, latency=0.002, jitter=0.003)
+    candles = _fetch_ohlcv_sharded(sharded, 'BTC/USDT', '1m', _since(sharded), limit=LIMIT, max_workers=4)
+
+    assert candles == expected
+    assert len(candles) == N_BARS
+    assert sharded.max_concurrent > 1
+
+def test_sharded_fetches_one_page_per_full_shard():
+    exchange = StandInExchange(N_BARS)
+    stats = FetchStats()
+    candles = _fetch_ohlcv_sharded(exchange, 'BTC/USDT', '1m', _since(exchange), limit=LIMIT, stats=stats)
+
+    shards = N_BARS // LIMIT
+    assert len(candles) == N_BARS
+    assert exchange.calls == shards
+    assert stats.pages_fetched == shards
+    assert stats.rows_fetched == exchange.rows_served == N_BARS
+
+def test_sharded_partial_last_shard():
+    exchange = StandInExchange(N_BARS + 250)
+    candles = _fetch_ohlcv_sharded(exchange, 'BTC/USDT', '1m', _since(exchange), limit=LIMIT)
+
+    assert [c[0] for c in candles] == exchange.timestamps.tolist()
+    assert exchange.calls == N_BARS // LIMIT + 1
+
+# --- RETRY & RATE LIMIT ---
+
+def test_retry_recovers_from_transient_failures(no_sleep):
+    exchange = StandInExchange(N_BARS, fail_first=3)
+    candles = _fetch_ohlcv_sharded(exchange, 'BTC/USDT', '1m', _since(exchange), limit=LIMIT, max_workers=4)
+
+    assert len(candles) == N_BARS
+    assert exchange.failures == 3
+
+def test_retry_cap_raises_last_error():
+    exchange = StandInExchange(N_BARS, fail_first=100)
+    stats = FetchStats()
+    with pytest.raises(ConnectionError):
+        _fetch_page(exchange, 'BTC/USDT', '1m', _since(exchange), LIMIT, max_retries=3, backoff=0, stats=stats)
+    assert exchange.calls == 4
+    assert stats.retries == 3 # Percobaan terakhir yang gagal bukan retry
+
+def test_retry_count_matches_extra_requests():
+    exchange = StandInExchange(N_BARS, fail_first=2)
+    stats = FetchStats()
+    _fetch_page(exchange, 'BTC/USDT', '1m', _since(exchange), LIMIT, backoff=0, stats=stats)
+    assert stats.retries == exchange.calls - 1 == 2
+
+def test_rate_limiter_spaces_requests_across_threads():
+    interval_ms = 20
+    exchange = StandInExchange(5 * LIMIT)
+    limiter = RateLimiter(interval_ms)
+    started = time.monotonic()
+    _fetch_ohlcv_sharded(exchange, 'BTC/USDT', '1m', _since(exchange), limit=LIMIT, max_workers=5, limiter=limiter)
+
+    # Yang dijamin limiter adalah slot waktunya (slot ke-k >= mulai + k * interval); jarak antar
+    # kedatangan bisa menyempit kalau thread sebelumnya telat bangun, jadi cek rentang totalnya
+    assert exchange.calls == 5
+    assert max(exchange.call_times) - started >= 4 * interval_ms / 1000
+    assert limiter._next - started >= 5 * interval_ms / 1000
+
+# --- CACHE & KEGAGALAN ---
+
+def test_tail_failure_keeps_cached_frame(tmp_path, no_sleep):
+    store = CandleStore(str(tmp_path))
+    exchange = StandInExchange(2 * LIMIT)
+    cached = get_binance_data('BTC/USDT', '1m', '2024-01-01', exchange=exchange, store=store)
+
+    offline = StandInExchange(2 * LIMIT, fail_first=10 ** 9)
+    stats = FetchStats()
+    df = get_binance_data('BTC/USDT', '1m', '2024-01-01', exchange=offline, store=store, stats=stats)
+
+    assert df.equals(cached)
+    assert len(stats.errors) == 1
+    assert 'ConnectionError' in stats.errors[0]
+
+def test_first_fetch_failure_raises(tmp_path, no_sleep):
+    offline = StandInExchange(LIMIT, fail_first=10 ** 9)
+    with pytest.raises(ConnectionError):
+        get_binance_data('BTC/USDT', '1m', '2024-01-01', exchange=offline, store=CandleStore(str(tmp_path)))
+
+def test_stats_as_dict_is_json_serialisable(tmp_path):
+    exchange = StandInExchange(2 * LIMIT)
+    stats = FetchStats()
+    get_binance_data('BTC/USDT', '1m', '2024-01-01', exchange=exchange, store=CandleStore(str(tmp_path)), stats=stats)
+
+    report = stats.as_dict()
+    assert report['rows_returned'] == 2 * LIMIT
+    assert all(type(report[name]) is int for name in ('pages_fetched', 'rows_fetched', 'retries',
+                                                     'rows_cached', 'rows_returned'))
+    json.dumps(report)
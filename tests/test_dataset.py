@@ -0,0 +1,144 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import dataset
+from engine.candle_store import OHLCV_COLUMNS, CandleStore
+from engine.dataset import OHLCVDataset, append, export_store, write_dataset
+
+N_BARS = 3000
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(N_BARS, seed=23)
+
+def _arrays(df):
+    return df.index.to_numpy().astype('datetime64[ms]').astype(np.int64), df[OHLCV_COLUMNS].to_numpy()
+
+def _assert_matches(frame, df):
+    np.testing.assert_array_equal(frame.index.asi8, _arrays(df)[0])
+    pd.testing.assert_frame_equal(frame.reset_index(drop=True), df[OHLCV_COLUMNS].reset_index(drop=True))
+
+def _assert_zero_copy(ds, frame):
+    for name in OHLCV_COLUMNS:
+        values = frame[name].to_numpy()
+        assert np.shares_memory(values, ds.column(name)), name
+        assert not values.flags.writeable # Dataset dibuka read-only
+    assert np.shares_memory(frame.index.asi8, ds.timestamps)
+
+# --- TULIS & BACA ---
+
+def test_round_trip(tmp_path, candles, monkeypatch):
+    monkeypatch.setattr(dataset, 'CHUNK_ROWS', 700) # Tulis lewat beberapa potongan
+    ds = write_dataset(str(tmp_path), *_arrays(candles), symbol='BTC/USDT', timeframe='1h')
+
+    reopened = OHLCVDataset(str(tmp_path))
+    assert len(reopened) == N_BARS
+    assert (reopened.symbol, reopened.timeframe) == ('BTC/USDT', '1h')
+    frame = reopened.frame()
+    _assert_matches(frame, candles)
+    _assert_zero_copy(reopened, frame)
+    assert os.path.getsize(os.path.join(str(tmp_path), 'Close.bin')) == N_BARS * 8
+    assert len(ds) == N_BARS
+
+def test_window_and_bounds(tmp_path, candles):
+    ds = write_dataset(str(tmp_path), *_arrays(candles))
+    lo, hi = ds.bounds(_arrays(candles)[0][100], _arrays(candles)[0][250])
+    assert (lo, hi) == (100, 250)
+    assert ds.bounds() == (0, N_BARS)
+
+    window = ds.window(lo, hi, columns=['Close', 'Volume'])
+    assert list(window) == ['Close', 'Volume']
+    np.testing.assert_array_equal(window['Close'], candles['Close'].to_numpy()[100:250])
+    assert np.shares_memory(window['Close'], ds.column('Close'))
+
+    frame = ds.frame(lo, hi)
+    _assert_matches(frame, candles.iloc[100:250])
+    _assert_zero_copy(ds, frame)
+
+def test_missing_dataset_and_column(tmp_path, candles):
+    with pytest.raises(ValueError):
+        OHLCVDataset(str(tmp_path))
+    with pytest.raises(ValueError):
+        append(str(tmp_path), *_arrays(candles))
+    ds = write_dataset(str(tmp_path), *_arrays(candles))
+    with pytest.raises(KeyError):
+        ds.column('Signal')
+
+def test_empty_dataset(tmp_path):
+    ds = write_dataset(str(tmp_path), np.zeros(0, dtype=np.int64), np.zeros((0, 5)))
+    assert len(ds) == 0 and len(ds.frame()) == 0
+
+# --- APPEND ---
+
+def test_append(tmp_path, candles):
+    path = str(tmp_path)
+    write_dataset(path, *_arrays(candles.iloc[:2000]))
+    # Overlap dengan bar yang sudah ada diabaikan
+    assert append(path, *_arrays(candles.iloc[1500:2500])) == 500
+    assert append(path, *_arrays(candles.iloc[1500:2500])) == 0
+    assert append(path, *_arrays(candles.iloc[2500:])) == N_BARS - 2500
+
+    ds = OHLCVDataset(path)
+    frame = ds.frame()
+    _assert_matches(frame, candles)
+    _assert_zero_copy(ds, frame)
+
+def test_append_overwrites_interrupted_tail(tmp_path, candles):
+    path = str(tmp_path)
+    write_dataset(path, *_arrays(candles.iloc[:1000]))
+    # Append terputus: byte sisa di file kolom, meta belum di-commit
+    for name in ['Timestamp', 'Close']:
+        with open(os.path.join(path, f"{name}.bin"), 'ab') as f:
+            f.write(b'\xff' * 8 * 7)
+    assert len(OHLCVDataset(path).frame()) == 1000
+
+    append(path, *_arrays(candles.iloc[1000:]))
+    _assert_matches(OHLCVDataset(path).frame(), candles)
+    assert os.path.getsize(os.path.join(path, 'Close.bin')) == N_BARS * 8
+
+# --- KOLOM TURUNAN ---
+
+def test_create_column(tmp_path, candles):
+    path = str(tmp_path)
+    ds = write_dataset(path, *_arrays(candles.iloc[:2000]))
+    ds.create_column('Signal', np.int8)
+    np.testing.assert_array_equal(ds.column('Signal'), np.zeros(2000, dtype=np.int8))
+
+    values = np.where(np.arange(500) % 3 == 0, 1, -1).astype(np.int8)
+    ds.write('Signal', 700, values)
+    reopened = OHLCVDataset(path)
+    signal = reopened.column('Signal')
+    assert signal.dtype == np.int8
+    np.testing.assert_array_equal(signal[700:1200], values)
+    assert not signal[:700].any() and not signal[1200:].any()
+
+    frame = reopened.frame(columns=['Close', 'Signal'])
+    np.testing.assert_array_equal(frame['Signal'].to_numpy(), signal)
+    assert np.shares_memory(frame['Signal'].to_numpy(), signal)
+
+    with pytest.raises(ValueError):
+        reopened.create_column('Close', np.float64)
+    with pytest.raises(ValueError):
+        reopened.write('Close', 0, np.zeros(3))
+
+    # Append & tulis ulang dataset membuang kolom turunan (panjangnya tidak lagi sama)
+    append(path, *_arrays(candles.iloc[2000:]))
+    assert 'Signal' not in OHLCVDataset(path).meta['columns']
+    assert not os.path.exists(os.path.join(path, 'Signal.bin'))
+    ds = OHLCVDataset(path)
+    ds.create_column('Signal', np.int8)
+    write_dataset(path, *_arrays(candles))
+    assert not os.path.exists(os.path.join(path, 'Signal.bin'))
+
+def test_export_store(tmp_path, candles):
+    store = CandleStore(root=str(tmp_path / 'store'))
+    ts, ohlcv = _arrays(candles)
+    store.merge('binance', 'BTC/USDT', '1h', np.column_stack([ts, ohlcv]), covered_from=int(ts[0]), covered_to=int(ts[-1]))
+
+    ds = export_store(store, 'binance', 'BTC/USDT', '1h', str(tmp_path / 'dataset'))
+    assert (ds.symbol, ds.timeframe) == ('BTC/USDT', '1h')
+    _assert_matches(ds.frame(), candles)
+    with pytest.raises(ValueError):
+        export_store(store, 'binance', 'ETH/USDT', '1h', str(tmp_path / 'missing'))
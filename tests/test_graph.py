@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from bench.synthetic import make_ohlcv
+from indicators.graph import IndicatorGraph, parents
+from indicators.momentum import RSI
+from indicators.moving import EMA
+
+ROWS = 1000
+NODE_BYTES = ROWS * 8
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(ROWS, seed=3)
+
+def test_node_matches_indicator(candles):
+    graph = IndicatorGraph(candles)
+    np.testing.assert_array_equal(graph.get(('RSI', 14)), RSI(14).bulk(candles['Close'].to_numpy()))
+    with pytest.raises(ValueError):
+        graph.get(('RSI', 14))[0] = 0.0 # Node dibagi ke banyak konsumen: read-only
+    with pytest.raises(KeyError):
+        parents(('MACD', 12))
+
+def test_release_after_last_consumer(candles):
+    graph = IndicatorGraph(candles)
+    graph.plan([[('RSI', 14), ('EMA', 50)], [('RSI', 14)]])
+    graph.get(('RSI', 14))
+    graph.get(('EMA', 50))
+
+    graph.release([('RSI', 14), ('EMA', 50)])
+    assert set(graph._cache) == {('RSI', 14)} # Masih ada satu konsumen RSI
+    graph.release([('RSI', 14)])
+    assert graph.nbytes() == 0
+    graph.release([('RSI', 14)]) # Release berlebih diabaikan
+    assert graph.stats == {'computed': 2, 'hits': 0, 'evicted': 0}
+
+def test_intermediate_node_dropped_once_children_computed(candles):
+    graph = IndicatorGraph(candles)
+    order = graph.plan([[('ATR', 10)], [('ADX', 14)]])
+    assert order.index(('TR',)) < order.index(('ATR', 10))
+
+    graph.get(('ATR', 10))
+    assert ('TR',) in graph._cache # ADX belum dihitung, masih butuh TR
+    graph.get(('ADX', 14))
+    assert set(graph._cache) == {('ATR', 10), ('ADX', 14)}
+    assert graph.stats['computed'] == 3 # TR sekali untuk dua anak
+
+def test_unplanned_nodes_stay_until_evicted(candles):
+    graph = IndicatorGraph(candles)
+    graph.get(('EMA', 10))
+    graph.release([('EMA', 10)]) # Tanpa plan: release tidak membuang node
+    assert ('EMA', 10) in graph._cache
+
+def test_lru_eviction(candles):
+    graph = IndicatorGraph(candles, max_bytes=2 * NODE_BYTES)
+    graph.get(('EMA', 10))
+    graph.get(('EMA', 20))
+    graph.get(('EMA', 10)) # Hit: EMA(10) jadi paling baru dipakai
+    graph.get(('EMA', 30))
+
+    assert list(graph._cache) == [('EMA', 10), ('EMA', 30)]
+    assert graph.nbytes() <= graph.max_bytes
+    assert graph.stats == {'computed': 3, 'hits': 1, 'evicted': 1}
+
+    # Node tergeser dihitung ulang dengan hasil sama
+    np.testing.assert_array_equal(graph.get(('EMA', 20)), EMA(20).bulk(candles['Close'].to_numpy()))
+    assert graph.stats['computed'] == 4
+
+def test_node_larger_than_budget_is_kept(candles):
+    graph = IndicatorGraph(candles, max_bytes=NODE_BYTES // 2)
+    graph.get(('SMA', 5))
+    graph.get(('SMA', 7))
+    assert list(graph._cache) == [('SMA', 7)] # Node yang baru dihitung tidak ikut digeser
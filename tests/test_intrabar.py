@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+from engine.backtester import run_backtest
+from engine.candle_store import CandleStore
+from engine.intrabar import LowerTimeframe, bar_ends, bar_resolver, first_touch, resolve_bars
+from engine.results import EXIT_SL, EXIT_TP
+from engine.resample import bucket_ends
+
+HOUR = 3600 * 1000
+QUARTER = HOUR // 4
+SYMBOL = 'BTC/USDT'
+
+def _ms(value):
+    return int(pd.Timestamp(value).value // 10 ** 6)
+
+# --- first_touch ---
+
+@pytest.mark.parametrize('side, candles, expected', [
+    # Long, SL 98 / TP 102
+    (1, [[100, 101, 97.5, 99, 1], [99, 103, 99, 102, 1]], True),
+    (1, [[100, 102.5, 99, 101, 1], [101, 101, 97, 98, 1]], False),
+    (1, [[100, 103, 97, 100, 1]], None), # Satu candle kena dua level, open di tengah
+    (1, [[97.5, 103, 97, 100, 1]], True), # Open sudah lewat SL
+    (1, [[102.5, 103, 97, 100, 1]], False), # Open sudah lewat TP
+    (1, [[100, 101, 99, 100, 1]], None), # Tidak ada yang kena
+    # Short, SL 102 / TP 98
+    (-1, [[100, 102.5, 99, 101, 1], [101, 101, 97, 98, 1]], True),
+    (-1, [[100, 101, 97.5, 99, 1], [99, 103, 99, 102, 1]], False),
+    (-1, [[102.5, 103, 97, 100, 1]], True),
+])
+def test_first_touch(side, candles, expected):
+    sl, tp = (98.0, 102.0) if side > 0 else (102.0, 98.0)
+    assert first_touch(np.array(candles, dtype=float), side, sl, tp) is expected
+
+def test_first_touch_empty():
+    assert first_touch(np.zeros((0, 5)), 1, 98.0, 102.0) is None
+
+# --- AKHIR BAR ---
+
+def test_bucket_ends_calendar():
+    starts = [_ms('2024-01-01'), _ms('2024-02-01'), _ms('2024-12-01')]
+    assert bucket_ends(starts, '1M').tolist() == [_ms('2024-02-01'), _ms('2024-03-01'), _ms('2025-01-01')]
+    assert bucket_ends([_ms('2024-01-01')], '1w').tolist() == [_ms('2024-01-08')]
+    assert bucket_ends([_ms('2024-01-01 04:00')], '4h').tolist() == [_ms('2024-01-01 08:00')]
+
+@pytest.mark.parametrize('timeframe', ['1h', None])
+def test_bar_ends_ignore_gaps(timeframe):
+    ts = np.array([_ms('2024-01-01 08:00'), _ms('2024-01-01 09:00'), _ms('2024-01-01 12:00')])
+    assert (bar_ends(ts, timeframe) - ts).tolist() == [HOUR] * 3
+
+# --- DRILL-DOWN ---
+
+def _lower(tmp_path, bar_timeframe='1h'):
+    """
+    Candle 15m datar (99.8..100.2) 00:00-15:45 di CandleStore, kecuali:
+    - 04:00 sentuh TP (102) lalu 04:15 sentuh SL (98): bar 04:00 -> TP duluan
+    - 09:00-09:45 tidak ada, 10:00 sentuh TP: bar 09:00 tidak bisa ditentukan
+    """
+    ts = np.arange(_ms('2024-01-01'), _ms('2024-01-01 16:00'), QUARTER)
+    ohlcv = np.tile([100.0, 100.2, 99.8, 100.0, 1.0], (len(ts), 1))
+    ohlcv[ts == _ms('2024-01-01 04:00')] = [100, 102.5, 99.9, 101, 1]
+    ohlcv[ts == _ms('2024-01-01 04:15')] = [101, 101, 97, 99, 1]
+    ohlcv[ts == _ms('2024-01-01 10:00')] = [100, 102.5, 99.9, 101, 1]
+    keep = (ts < _ms('2024-01-01 09:00')) | (ts >= _ms('2024-01-01 10:00'))
+    candles = np.column_stack([ts[keep].astype(float), ohlcv[keep]])
+    store = CandleStore(root=str(tmp_path))
+    store.merge('binance', SYMBOL, '15m', candles, covered_from=int(ts[0]), covered_to=int(ts[-1]) + QUARTER)
+    return LowerTimeframe(store, SYMBOL, '15m', bar_timeframe=bar_timeframe)
+
+def _bars():
+    """Bar 1h 00:00-09:00 lalu gap ke 12:00-15:00; bar 04:00 & 09:00 menyentuh SL & TP sekaligus."""
+    index = pd.DatetimeIndex(list(pd.date_range('2024-01-01', periods=10, freq='1h'))
+                             + list(pd.date_range('2024-01-01 12:00', periods=4, freq='1h')), name='Timestamp')
+    df = pd.DataFrame({'Open': 100.0, 'High': 100.5, 'Low': 99.5, 'Close': 100.0, 'Volume': 1.0, 'Signal': 1.0},
+                      index=index)
+    df.loc[['2024-01-01 04:00', '2024-01-01 09:00'], ['High', 'Low']] = [103.0, 97.0]
+    return df
+
+def test_lower_timeframe_window(tmp_path):
+    source = _lower(tmp_path)
+    assert len(source.candles(_ms('2024-01-01 04:00'), _ms('2024-01-01 05:00'))) == 4
+    assert len(source.candles(_ms('2024-01-01 09:00'), _ms('2024-01-01 10:00'))) == 0
+    assert source.fingerprint()[:4] == ['binance', SYMBOL, '15m', '1h']
+
+def test_resolve_bars_defaults_unresolved_to_sl(tmp_path):
+    source = _lower(tmp_path)
+    starts = np.array([_ms('2024-01-01 04:00'), _ms('2024-01-01 09:00')])
+    sl_first = resolve_bars(source, starts, starts + HOUR, np.array([1, 1]), np.array([98.0] * 2), np.array([102.0] * 2))
+    assert sl_first.tolist() == [False, True]
+    assert (source.drilled, source.unresolved) == (2, 1)
+
+@pytest.mark.parametrize('bar_timeframe', ['1h', None])
+def test_gap_does_not_stretch_drill_down_window(tmp_path, bar_timeframe):
+    df = _bars()
+    source = _lower(tmp_path, bar_timeframe)
+    resolve = bar_resolver(source, df.index)
+    bars = np.array([4, 9])
+    # Bar 09:00 hanya melihat 09:00-10:00 (kosong), bukan sampai bar berikutnya 12:00 (ada TP di 10:00)
+    assert resolve(bars, np.array([1, 1]), np.array([98.0] * 2), np.array([102.0] * 2)).tolist() == [False, True]
+    assert source.unresolved == 1
+
+def test_run_backtest_drill_down(tmp_path):
+    df = _bars()
+    source = _lower(tmp_path)
+    drilled = run_backtest(df, sl_pct=0.02, tp_pct=0.02, intrabar=True, drill_down=source).trades.records
+    plain = run_backtest(df, sl_pct=0.02, tp_pct=0.02, intrabar=True).trades.records
+
+    assert drilled['exit_bar'][:2].tolist() == plain['exit_bar'][:2].tolist() == [4, 9]
+    assert drilled['reason'][:2].tolist() == [EXIT_TP, EXIT_SL]
+    assert drilled['exit_price'][:2].tolist() == pytest.approx([102.0, 98.0])
+    # Tanpa drill-down bar ambigu dianggap SL
+    assert plain['reason'][:2].tolist() == [EXIT_SL, EXIT_SL]
+    assert (source.drilled, source.unresolved) == (2, 1)
@@ -0,0 +1,121 @@
+import copy
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import registry
+from indicators import kernels
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not kernels.HAS_NUMBA, reason="Numba tidak aktif: kernel sudah versi referensi")
+
+def _assert_same(a, b):
+    """Sama persis (NaN di posisi yang sama), termasuk tuple / array hasil & argumen yang diubah in-place."""
+    if isinstance(a, (tuple, list)):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_same(x, y)
+    else:
+        np.testing.assert_array_equal(a, b, strict=True)
+
+def _compare(kernel, *args):
+    """Jalankan kernel compiled & versi Python-nya (py_func) dengan salinan argumen yang sama."""
+    compiled_args, python_args = copy.deepcopy(args), copy.deepcopy(args)
+    _assert_same(kernel(*compiled_args), kernel.py_func(*python_args))
+    _assert_same(compiled_args, python_args)
+
+@pytest.fixture
+def candles():
+    return make_ohlcv(3000, seed=7)
+
+# --- KERNEL ---
+
+def test_hold_state():
+    raw = np.random.default_rng(0).choice([-1, 0, 0, 0, 1], size=2000).astype(np.int64)
+    for initial in (-1, 0, 1):
+        _compare(kernels._hold_state, raw, initial)
+
+def test_wilder_recurrence(candles):
+    series = candles['Close'].diff().abs().fillna(0).to_numpy()
+    for period in (2, 14, 50):
+        res = np.full(len(series), np.nan)
+        res[period - 1] = series[:period].mean()
+        _compare(kernels.wilder_recurrence, series, res, period)
+
+@pytest.mark.parametrize('kernel, state_size', [(kernels.rolling_mean, 7), (kernels.rolling_std, 5)])
+@pytest.mark.parametrize('period', [2, 20, 200])
+def test_rolling(candles, kernel, state_size, period):
+    values = candles['Close'].to_numpy().copy()
+    values[[5, 6, 400]] = np.nan
+    state = np.zeros(state_size)
+    if state_size == 7:
+        state[6] = np.nan
+    _compare(kernel, values, np.zeros(0), period, state, np.empty(len(values)))
+
+    # Lanjutan blok: ekor blok sebelumnya + state hasil blok itu
+    half = len(values) // 2
+    kernel.py_func(values[:half], np.zeros(0), period, state, np.empty(half))
+    _compare(kernel, values[half:], values[:half][-period:], period, state, np.empty(len(values) - half))
+
+@pytest.mark.parametrize('adjust', [True, False])
+def test_ewm_recurrence(candles, adjust):
+    values = candles['Close'].to_numpy().copy()
+    values[[0, 1, 300]] = np.nan
+    for alpha, min_periods in ((1 / 14, 14), (2 / 201, 0)):
+        state = np.array([np.nan, 0.0, 0.0])
+        _compare(kernels.ewm_recurrence, values, alpha, adjust, min_periods, state, np.empty(len(values)))
+
+def test_supertrend_bands(candles):
+    hl2 = ((candles['High'] + candles['Low']) / 2).to_numpy()
+    atr = (candles['High'] - candles['Low']).rolling(10, min_periods=1).mean().to_numpy()
+    close = candles['Close'].to_numpy()
+    for first_trend in (1, -1):
+        _compare(kernels.supertrend_bands, hl2 + 3 * atr, hl2 - 3 * atr, close, first_trend)
+
+@pytest.mark.parametrize('swing_length', [1, 2, 5])
+def test_smc_scan(candles, monkeypatch, swing_length):
+    spec = registry.get('smc')
+
+    def run(blocks):
+        stream = spec.stream(swing_length=swing_length)
+        return np.concatenate([stream.compute(candles.iloc[lo:hi])['Signal'] for lo, hi in blocks])
+
+    blocks = [(0, 1000), (1000, 1001), (1001, len(candles))]
+    compiled = run(blocks)
+    monkeypatch.setattr(kernels, 'smc_scan', kernels.smc_scan.py_func)
+    python = run(blocks)
+    np.testing.assert_array_equal(compiled, python, strict=True)
+
+# --- STRATEGI: NUMBA VS BACKTESTER_NO_NUMBA ---
+
+_DUMP = """
+import sys
+import numpy as np
+from bench.synthetic import make_ohlcv
+from engine import registry
+from indicators import kernels
+assert not kernels.HAS_NUMBA
+df = make_ohlcv(3000, seed=7)
+out = {}
+for name in registry.names():
+    df_s = registry.get(name).apply(df)
+    for col in df_s.columns:
+        out[f'{name}/{col}'] = df_s[col].to_numpy()
+np.savez(sys.argv[1], **out)
+"""
+
+def test_strategy_columns_match_without_numba(tmp_path, candles):
+    path = tmp_path / 'no_numba.npz'
+    env = {**os.environ, 'BACKTESTER_NO_NUMBA': '1'}
+    subprocess.run([sys.executable, '-c', _DUMP, str(path)], cwd=ROOT, env=env, check=True)
+    reference = np.load(path)
+
+    for name in registry.names():
+        df_s = registry.get(name).apply(candles)
+        assert {key for key in reference.files if key.startswith(f'{name}/')} == {f'{name}/{col}' for col in df_s.columns}
+        for col in df_s.columns:
+            np.testing.assert_array_equal(df_s[col].to_numpy(), reference[f'{name}/{col}'], strict=True,
+                                          err_msg=f'{name}/{col}')
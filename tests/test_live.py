@@ -0,0 +1,85 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from bench.exchange import StandInExchange
+from bench.synthetic import make_ohlcv
+from engine import live, registry
+from engine.backtester import run_backtest
+from engine.live import StreamingRunner, frame_feed, polling_feed
+
+SL_PCT, TP_PCT = 0.02, 0.04
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(3000, seed=2)
+
+@pytest.mark.parametrize('name', registry.names())
+@pytest.mark.parametrize('history', [1, 300, 1500])
+def test_streaming_replay_matches_batch(candles, name, history):
+    df_s = registry.get(name).apply(candles)
+    runner = StreamingRunner(name, sl_pct=SL_PCT, tp_pct=TP_PCT)
+    runner.prime(candles.iloc[:history])
+
+    signals = []
+    for timestamp, candle in frame_feed(candles.iloc[history:]):
+        runner.on_candle(timestamp, candle)
+        signals.append(runner.prev_signal)
+    np.testing.assert_array_equal(np.asarray(signals), df_s['Signal'].to_numpy()[history:])
+
+    # Bar terakhir histori = bar pertama backtest (sinyalnya dieksekusi di candle stream pertama)
+    batch = run_backtest(df_s.iloc[history - 1:], sl_pct=SL_PCT, tp_pct=TP_PCT)
+    assert len(runner.trade_log) > 0
+    pd.testing.assert_frame_equal(runner.trade_log, batch['trade_log'], check_dtype=False)
+    assert runner.trader.equity == batch['equity_curve'].iloc[-1]
+
+# --- POLLING FEED ---
+
+POLL = 7.0 # Detik poll palsu: hanya sleep sebesar ini yang memajukan jam exchange
+
+@pytest.fixture
+def exchange(monkeypatch):
+    exchange = StandInExchange(600, timeframe='1m', seed=3)
+    exchange.now = int(exchange.timestamps[100]) + exchange.tf_ms # Candle 0..100 sudah tertutup
+
+    def sleep(seconds):
+        if seconds == POLL:
+            exchange.now += exchange.tf_ms # Satu candle baru tertutup tiap poll
+    monkeypatch.setattr(live.time, 'sleep', sleep)
+    return exchange
+
+def _take(feed, count):
+    return [int(ts.value // 10 ** 6) for ts, _ in itertools.islice(feed, count)]
+
+def test_feed_without_since_skips_history(exchange):
+    sent = _take(polling_feed(exchange, 'BTC/USDT', '1m', poll_interval=POLL, backoff=0), 5)
+    assert sent == exchange.timestamps[101:106].tolist()
+
+def test_feed_with_since_replays_backlog_once(exchange):
+    exchange.now = int(exchange.timestamps[450])
+    sent = _take(polling_feed(exchange, 'BTC/USDT', '1m', since=int(exchange.timestamps[0]), poll_interval=POLL,
+                              limit=100, backoff=0), 455)
+    assert sent == exchange.timestamps[:455].tolist()
+
+def test_feed_survives_transient_errors(exchange):
+    exchange.fail_rate = 0.3
+    sent = _take(polling_feed(exchange, 'BTC/USDT', '1m', poll_interval=POLL, backoff=0), 30)
+    assert sent == exchange.timestamps[101:131].tolist()
+    assert exchange.failures > 0
+
+def test_feed_raises_after_retries(exchange):
+    exchange.fail_first = 10 ** 9
+    with pytest.raises(ConnectionError):
+        _take(polling_feed(exchange, 'BTC/USDT', '1m', poll_interval=POLL, max_retries=2, backoff=0), 1)
+    assert exchange.calls == 3
+
+def test_runner_trades_only_live_candles(exchange):
+    history = pd.DataFrame([row[1:] for row in exchange.rows[:101]], columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+                           index=pd.to_datetime(exchange.timestamps[:101], unit='ms'))
+    runner = StreamingRunner('supertrend')
+    runner.prime(history)
+    runner.run(itertools.islice(polling_feed(exchange, 'BTC/USDT', '1m', poll_interval=POLL, backoff=0), 400))
+
+    assert runner.bars == 400
+    assert len(runner.trade_log) > 0
+    assert (runner.trade_log['Tanggal'] > history.index[-1]).all()
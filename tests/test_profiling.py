@@ -0,0 +1,21 @@
+import tracemalloc
+import numpy as np
+from engine.profiling import RunReport
+
+def test_memory_tracking_is_opt_in():
+    report = RunReport()
+    with report.stage('compute', rows=1000):
+        assert not tracemalloc.is_tracing()
+        np.ones(1000).sum()
+    stage = report.stages[0]
+    assert 'peak_alloc_mb' not in stage
+    assert {'wall_s', 'cpu_s', 'rows_per_s'} <= set(stage)
+
+def test_memory_tracking_when_enabled():
+    report = RunReport(track_memory=True)
+    with report.stage('alloc'):
+        assert tracemalloc.is_tracing()
+        buffer = np.ones(1_000_000)
+        del buffer
+    assert not tracemalloc.is_tracing()
+    assert report.stages[0]['peak_alloc_mb'] >= 7
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import registry
+from engine.batch import _slice
+from indicators.graph import IndicatorGraph
+
+@pytest.mark.parametrize('name', ['smc', 'supertrend'])
+def test_path_dependent_strategies_need_full_history(name):
+    assert registry.get(name).warmup() is None
+
+def test_warmup_start():
+    bar = pd.Timedelta(hours=1)
+    assert registry.warmup_start('2024-01-02', bar, 24) == pd.Timestamp('2024-01-01')
+    assert registry.warmup_start('2024-01-02', bar, 0) == pd.Timestamp('2024-01-02')
+    # Tanpa warm-up terbatas: fetch tetap mulai dari tanggal yang dipilih, tidak mundur ke awal histori
+    assert registry.warmup_start('2024-01-02', bar, None) == pd.Timestamp('2024-01-02')
+
+def test_slice_warmup():
+    df = make_ohlcv(500)
+    start, end = df.index[300], f"{df.index[-1]:%Y-%m-%d}"
+    assert len(_slice(df, start, end, 10)) == 210
+    assert len(_slice(df, start, end, None)) == len(_slice(df, start, end, 0)) == 200
+
+# --- GRAF INDIKATOR BERSAMA ---
+
+# Varian param yang berbagi node dengan default: SMA(50), EMA(50), RSI(14), TR, ATR(10)
+SHARED = registry.names() + [
+    ('simple_ma', {'fast': 20, 'slow': 50}),
+    ('bb_rsi', {'bb_period': 50}),
+    ('trend_ema', {'ema_slow': 50, 'ema_mid': 100}),
+    ('supertrend', {'multiplier': 2}),
+]
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(2000, seed=25)
+
+def _own(df, item):
+    name, params = (item, {}) if isinstance(item, str) else item
+    return registry.get(name).apply(df, **params)
+
+def test_apply_shared_matches_apply(candles):
+    graph = IndicatorGraph(candles)
+    frames = registry.apply_shared(candles, SHARED, graph=graph)
+    for item, frame in zip(SHARED, frames):
+        pd.testing.assert_frame_equal(frame, _own(candles, item), obj=str(item))
+    # Node bersama dihitung sekali, lalu semua dilepas setelah konsumen terakhir
+    assert graph.stats['hits'] > 0
+    assert graph.nbytes() == 0
+
+def test_apply_shared_with_tiny_memory_budget(candles):
+    # Node tergeser LRU dihitung ulang: hasil tetap sama
+    graph = IndicatorGraph(candles, max_bytes=1)
+    frames = registry.apply_shared(candles, SHARED, graph=graph)
+    for item, frame in zip(SHARED, frames):
+        pd.testing.assert_frame_equal(frame, _own(candles, item), obj=str(item))
+    assert graph.stats['evicted'] > 0
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine.candle_store import OHLCV_COLUMNS, CandleStore
+from engine.resample import check_parity, compare_native, resample_frame, resample_ohlcv, update_resampled
+
+BASE = '15m'
+BASE_MS = 15 * 60 * 1000
+KEY = ('standin', 'BTC/USDT')
+
+# Timeframe -> aturan pandas setara (kiri-tertutup, label kiri; fixed unit selaras epoch)
+RULES = {'1h': '1h', '4h': '4h', '1d': '24h', '3d': '72h', '1w': 'W-MON', '1M': 'MS'}
+
+def reference(df, timeframe):
+    """Referensi pandas.resample: bucket tanpa candle base (gap) dibuang, seperti candle native."""
+    rule = RULES[timeframe]
+    kwargs = {} if timeframe[-1] in 'wM' else {'origin': 'epoch'}
+    out = (df.resample(rule, closed='left', label='left', **kwargs)
+           .agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+           .dropna(subset=['Open']))
+    out.index = out.index.as_unit('ns').rename('Timestamp')
+    return out
+
+@pytest.fixture(scope='module')
+def base():
+    """15m mulai Rabu 07:30 (bucket pertama 4h/hari/minggu/bulan terpotong), ~10 minggu, dengan gap."""
+    df = make_ohlcv(7000, freq='15min', start='2024-01-03 07:30', seed=20)
+    gaps = np.r_[100:130, 2000:2300, 4300:4900] # Dalam sehari, >3 hari, melewati batas minggu & bulan
+    return df.drop(df.index[gaps])
+
+def _ts(df):
+    return df.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+def _candles(df):
+    return np.column_stack([_ts(df).astype(np.float64), df[OHLCV_COLUMNS].to_numpy()])
+
+# --- AGREGASI vs PANDAS ---
+
+@pytest.mark.parametrize('timeframe', list(RULES))
+def test_resample_matches_pandas(base, timeframe):
+    pd.testing.assert_frame_equal(resample_frame(base, timeframe), reference(base, timeframe), check_freq=False)
+
+def test_partial_first_and_last_buckets(base):
+    out = resample_frame(base, '4h')
+    # Bucket pertama mulai 04:00 walau data base mulai 07:30; bucket terakhir berisi data yang ada saja
+    assert out.index[0] == pd.Timestamp('2024-01-03 04:00')
+    assert out['Open'].iloc[0] == base['Open'].iloc[0]
+    assert out['Close'].iloc[-1] == base['Close'].iloc[-1]
+    assert out['Volume'].iloc[0] == base['Volume'].iloc[:2].sum()
+
+def test_gaps_leave_no_empty_buckets(base):
+    out = resample_frame(base, '1d')
+    assert out.index.isin(base.index.normalize()).all()
+    assert len(out) == base.index.normalize().nunique()
+
+def test_week_and_month_anchoring(base):
+    weekly = resample_frame(base, '1w')
+    assert (weekly.index.dayofweek == 0).all()
+    assert weekly.index[0] == pd.Timestamp('2024-01-01') # Senin sebelum data mulai (Rabu)
+    monthly = resample_frame(base, '1M')
+    assert (monthly.index.day == 1).all()
+    assert list(monthly.index.month) == sorted(set(base.index.month))
+
+def test_empty_input():
+    ts, ohlcv = resample_ohlcv(np.array([], dtype=np.int64), np.empty((0, 5)), '1h')
+    assert ts.shape == (0,) and ohlcv.shape == (0, 5)
+
+# --- CACHE INKREMENTAL ---
+
+def _merge(store, df):
+    ts = _ts(df)
+    store.merge(*KEY, BASE, _candles(df), covered_from=int(ts[0]), covered_to=int(ts[-1]) + BASE_MS)
+
+def _assert_full(result, df, timeframe):
+    expected_ts, expected = resample_ohlcv(_ts(df), df[OHLCV_COLUMNS].to_numpy(), timeframe)
+    np.testing.assert_array_equal(result[0], expected_ts)
+    np.testing.assert_allclose(result[1], expected, rtol=1e-12)
+
+@pytest.mark.parametrize('timeframe', ['4h', '1w', '1M'])
+def test_incremental_update_matches_full_resample(tmp_path, base, timeframe):
+    store = CandleStore(root=str(tmp_path))
+    # Potongan tidak selaras bucket: bucket terakhir tersimpan selalu belum lengkap
+    cuts = [1001, 1003, 2500, 4321, len(base)]
+    lo = 0
+    for hi in cuts:
+        _merge(store, base.iloc[lo:hi])
+        _assert_full(update_resampled(store, *KEY, BASE, timeframe), base.iloc[:hi], timeframe)
+        lo = hi
+
+def test_incremental_update_recomputes_when_base_extends_backwards(tmp_path, base):
+    store = CandleStore(root=str(tmp_path))
+    _merge(store, base.iloc[3000:])
+    update_resampled(store, *KEY, BASE, '1d')
+    _merge(store, base.iloc[:3000])
+    _assert_full(update_resampled(store, *KEY, BASE, '1d'), base, '1d')
+
+def test_unchanged_base_reuses_cache(tmp_path, base):
+    store = CandleStore(root=str(tmp_path))
+    _merge(store, base)
+    first = update_resampled(store, *KEY, BASE, '4h')
+    updated = store.updated_at(*KEY, '4h@15m')
+    second = update_resampled(store, *KEY, BASE, '4h')
+    assert store.updated_at(*KEY, '4h@15m') == updated
+    np.testing.assert_array_equal(first[1], second[1])
+
+def test_update_without_base_returns_none(tmp_path):
+    assert update_resampled(CandleStore(root=str(tmp_path)), *KEY, BASE, '4h') is None
+
+# --- PARITY vs CANDLE NATIVE ---
+
+class MultiTimeframeExchange:
+    """Exchange offline dengan candle native per timeframe (dari referensi pandas) di atas base 15m."""
+    id = 'standin'
+    rateLimit = 0
+
+    def __init__(self, base, native):
+        self.series = {BASE: base, **native}
+        self.rows = {tf: _candles(df).tolist() for tf, df in self.series.items()}
+        self.now = int(_ts(base)[-1]) + BASE_MS
+
+    def milliseconds(self):
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=1000):
+        lo = int(np.searchsorted(_ts(self.series[timeframe]), since or 0))
+        return [list(row) for row in self.rows[timeframe][lo:lo + limit]]
+
+def test_compare_native_counts():
+    native = reference(make_ohlcv(500, freq='15min', seed=3), '1h')
+    resampled = native.iloc[1:].copy()
+    resampled = pd.concat([resampled, native.iloc[[-1]].set_axis([native.index[-1] + pd.Timedelta('1h')])])
+    resampled.iloc[10, 1] *= 1 + 1e-6
+
+    stats = compare_native(native, resampled)
+    assert stats['bars'] == len(native) - 1
+    assert stats['missing'] == 1 and stats['extra'] == 1
+    assert stats['mismatched_bars'] == 1
+    assert stats['max_rel_diff']['High'] == pytest.approx(1e-6, rel=1e-3)
+    assert stats['max_rel_diff']['Close'] == 0
+
+def test_check_parity_against_native(base):
+    timeframes = ['4h', '1d', '1w', '1M']
+    native = {tf: reference(base, tf) for tf in timeframes}
+    native['1d'].iloc[5, 2] *= 0.99 # Satu candle native beda
+    exchange = MultiTimeframeExchange(base, native)
+
+    report = check_parity('BTC/USDT', timeframes, '2024-01-03 10:10', base_timeframe=BASE, exchange=exchange)
+    assert list(report['timeframe']) == timeframes
+    assert (report['bars'] > 0).all()
+    assert (report[['missing', 'extra']] == 0).all().all()
+    assert report.set_index('timeframe')['mismatched_bars'].to_dict() == {'4h': 0, '1d': 1, '1w': 0, '1M': 0}
+    assert report.set_index('timeframe').loc['1d', 'max_rel_low'] == pytest.approx(0.01, rel=1e-6)
+
+def test_check_parity_empty_base_raises(base):
+    exchange = MultiTimeframeExchange(base, {})
+    with pytest.raises(ValueError):
+        check_parity('BTC/USDT', ['4h'], '2030-01-01', base_timeframe=BASE, exchange=exchange)
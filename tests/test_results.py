@@ -0,0 +1,155 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import registry
+from engine.backtester import run_backtest
+from engine.results import BacktestResult
+
+def baseline_run_backtest(df, initial_capital=1000, sl_pct=0.0, tp_pct=0.0):
+    """run_backtest versi awal (loop, trade log list of dict) sebagai acuan format lama."""
+    df = df.copy()
+    position = 0
+    entry_price = 0
+    equity = [initial_capital]
+    trade_log = []
+
+    for i in range(1, len(df)):
+        current_date = df.index[i]
+        current_price = df['Close'].iloc[i]
+        prev_signal = df['Signal'].iloc[i-1]
+        action_taken = False
+
+        if position == 1:
+            pnl_pct = (current_price - entry_price) / entry_price
+            exit_reason = ""
+            exit_price = current_price
+            if sl_pct > 0 and pnl_pct <= -sl_pct:
+                exit_price = entry_price * (1 - sl_pct)
+                exit_reason = "Stop Loss (SL)"
+                action_taken = True
+            elif tp_pct > 0 and pnl_pct >= tp_pct:
+                exit_price = entry_price * (1 + tp_pct)
+                exit_reason = "Take Profit (TP)"
+                action_taken = True
+            elif prev_signal == 0:
+                exit_price = current_price
+                exit_reason = "Signal Sell (Strategy)"
+                action_taken = True
+
+            if action_taken:
+                position = 0
+                actual_return = (exit_price - entry_price) / entry_price
+                current_equity = equity[-1] * (1 + actual_return)
+                equity.append(current_equity)
+                trade_log.append({
+                    'Tanggal': current_date,
+                    'Tipe': 'SELL',
+                    'Harga': exit_price,
+                    'Alasan': exit_reason,
+                    'Profit/Loss %': round(actual_return * 100, 2),
+                    'Saldo Akhir': round(current_equity, 2)
+                })
+                continue
+
+        if position == 0 and prev_signal == 1:
+            position = 1
+            entry_price = current_price
+            equity.append(equity[-1])
+            trade_log.append({
+                'Tanggal': current_date,
+                'Tipe': 'BUY',
+                'Harga': entry_price,
+                'Alasan': 'Signal Buy (Strategy)',
+                'Profit/Loss %': 0.0,
+                'Saldo Akhir': round(equity[-1], 2)
+            })
+            action_taken = True
+
+        if not action_taken:
+            if position == 1:
+                daily_change = (current_price - df['Close'].iloc[i-1]) / df['Close'].iloc[i-1]
+                equity.append(equity[-1] * (1 + daily_change))
+            else:
+                equity.append(equity[-1])
+
+    if len(equity) > len(df): equity = equity[1:]
+    df['Equity_Curve'] = equity
+    running_max = df['Equity_Curve'].cummax()
+    df['Drawdown'] = (df['Equity_Curve'] - running_max) / running_max
+
+    closed_trades = [t for t in trade_log if t['Tipe'] == 'SELL']
+    winning_trades = len([t for t in closed_trades if t['Profit/Loss %'] > 0])
+    return {
+        "total_return_pct": ((df['Equity_Curve'].iloc[-1] / initial_capital) - 1) * 100,
+        "max_drawdown_pct": df['Drawdown'].min() * 100,
+        "win_rate": winning_trades / len(closed_trades) * 100 if closed_trades else 0.0,
+        "equity_curve": df['Equity_Curve'],
+        "dataframe": df,
+        "trade_log": pd.DataFrame(trade_log)
+    }
+
+@pytest.fixture(scope='module')
+def candles():
+    return make_ohlcv(1500, seed=18)
+
+@pytest.mark.parametrize('name', ['simple_ma', 'bb_rsi', 'supertrend'])
+@pytest.mark.parametrize('sl_pct, tp_pct', [(0.0, 0.0), (0.01, 0.02)])
+def test_to_frame_matches_baseline_table(candles, name, sl_pct, tp_pct):
+    # Versi awal menahan posisi saat Signal -1; sejak model short, -1 = flat di mode long-only
+    df_s = registry.get(name).apply(candles)
+    df_s = df_s.assign(Signal=df_s['Signal'].clip(lower=0))
+    res = run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct)
+    expected = baseline_run_backtest(df_s, sl_pct=sl_pct, tp_pct=tp_pct)
+
+    assert len(expected['trade_log']) > 0
+    pd.testing.assert_frame_equal(res.trades.to_frame(), expected['trade_log'], check_exact=False, rtol=1e-12)
+    # Total Trades di app = baris BUY + SELL, seperti len(trade_log) lama
+    assert res.trades.n_rows() == len(expected['trade_log'])
+
+def test_dict_access_matches_baseline(candles):
+    df_s = registry.get('bb_rsi').apply(candles)
+    res = run_backtest(df_s, sl_pct=0.01, tp_pct=0.02)
+    expected = baseline_run_backtest(df_s, sl_pct=0.01, tp_pct=0.02)
+
+    assert isinstance(res, BacktestResult)
+    assert sorted(res.keys()) == sorted(expected)
+    for key in ('total_return_pct', 'max_drawdown_pct', 'win_rate'):
+        assert key in res
+        assert res[key] == pytest.approx(expected[key], rel=1e-9), key
+    pd.testing.assert_series_equal(res['equity_curve'], expected['equity_curve'], check_exact=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(res['dataframe'], expected['dataframe'], check_exact=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(res.get('trade_log'), expected['trade_log'], check_exact=False, rtol=1e-12)
+    assert res['trade_log'] is res.trade_log # View dibangun sekali
+
+    assert 'missing' not in res
+    assert res.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        res['missing']
+
+def test_pickled_result_keeps_views_except_dataframe(candles):
+    res = run_backtest(registry.get('simple_ma').apply(candles))
+    loaded = pickle.loads(pickle.dumps(res))
+    pd.testing.assert_frame_equal(loaded['trade_log'], res['trade_log'])
+    pd.testing.assert_series_equal(loaded['equity_curve'], res['equity_curve'])
+    assert loaded['win_rate'] == res['win_rate']
+    with pytest.raises(ValueError):
+        loaded['dataframe']
+
+@pytest.mark.parametrize('options', [{}, {'allow_short': True}, {'max_positions': 3, 'pyramid_bars': 2}])
+def test_row_count_matches_frame(candles, options):
+    df_s = registry.get('trend_ema').apply(candles)
+    # Sinyal tetap aktif di bar terakhir: ada posisi yang masih terbuka (baris entry tanpa exit)
+    signal = df_s['Signal'].to_numpy(dtype=float, copy=True)
+    signal[-5:] = 1
+    res = run_backtest(df_s.assign(Signal=signal), sl_pct=0.01, **options)
+    assert (res.trades.records['exit_bar'] < 0).any()
+    assert res.trades.n_rows() == len(res.trade_log)
+    assert res.trades.n_rows() > len(res.trades)
+
+def test_empty_trade_log(candles):
+    res = run_backtest(candles.assign(Signal=0))
+    assert len(res.trades) == res.trades.n_rows() == 0
+    assert res['trade_log'].empty
+    assert res['win_rate'] == 0.0
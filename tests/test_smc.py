@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from indicators import kernels
+from strategies import smc
+
+class LinearBook:
+    """Referensi: daftar OB tanpa index, setiap mitigasi menscan semua OB hidup."""
+
+    def __init__(self):
+        self.top, self.bottom, self.seq = [], [], []
+        self.max_height = 0.0
+
+    def __len__(self):
+        return len(self.bottom)
+
+    def add(self, top, bottom, seq):
+        self.top.append(top)
+        self.bottom.append(bottom)
+        self.seq.append(seq)
+
+    def take(self, upper, lower):
+        hits = [k for k in range(len(self.bottom)) if self.bottom[k] <= upper and self.top[k] >= lower]
+        hit = max((self.seq[k] for k in hits), default=-1)
+        keep = [k for k in range(len(self.bottom)) if k not in set(hits)]
+        self.top = [self.top[k] for k in keep]
+        self.bottom = [self.bottom[k] for k in keep]
+        self.seq = [self.seq[k] for k in keep]
+        return hit
+
+def trending(n, drift, seed=0):
+    """Tren kuat: OB searah tren jarang ter-mitigasi, jadi ribuan OB tetap hidup."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(drift + 0.003 * rng.standard_normal(n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + 0.001 * rng.random(n))
+    low = np.minimum(open_, close) * (1 - 0.001 * rng.random(n))
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': 1.0})
+
+DATASETS = {
+    'random_walk': lambda: make_ohlcv(6000, seed=8),
+    'uptrend': lambda: trending(6000, 0.001),
+    'downtrend': lambda: trending(6000, -0.001, seed=1),
+}
+
+def _signals(df, swing_length, blocks=1):
+    stream = smc.StrategyStream(swing_length)
+    edges = np.linspace(0, len(df), blocks + 1).astype(int)
+    return np.concatenate([stream.compute(df.iloc[lo:hi])['Signal'] for lo, hi in zip(edges[:-1], edges[1:])]), stream
+
+@pytest.mark.parametrize('data', list(DATASETS))
+@pytest.mark.parametrize('swing_length', [1, 2, 5])
+def test_indexed_order_blocks_match_linear_scan(monkeypatch, data, swing_length):
+    df = DATASETS[data]()
+    default, stream = _signals(df, swing_length, blocks=3) # Kernel Numba kalau ada
+
+    monkeypatch.setattr(kernels, 'HAS_NUMBA', False)
+    indexed, _ = _signals(df, swing_length) # _step + OrderBlockBook
+    monkeypatch.setattr(smc, 'OrderBlockBook', LinearBook)
+    linear, linear_stream = _signals(df, swing_length)
+
+    np.testing.assert_array_equal(indexed, linear)
+    np.testing.assert_array_equal(default, linear)
+    # Sisa OB hidup sama (sebagai himpunan [top, bottom, seq])
+    for book, reference in ((stream.bullish_obs, linear_stream.bullish_obs), (stream.bearish_obs, linear_stream.bearish_obs)):
+        assert sorted(zip(book.seq, book.top, book.bottom)) == sorted(zip(reference.seq, reference.top, reference.bottom))
+
+def test_trend_keeps_many_live_order_blocks():
+    _, stream = _signals(DATASETS['uptrend'](), 2)
+    assert len(stream.bullish_obs) > 50
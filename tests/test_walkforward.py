@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench.synthetic import make_ohlcv
+from engine import registry
+from engine.walkforward import make_folds, oos_signals, walk_forward
+
+@pytest.mark.parametrize('name', registry.names())
+@pytest.mark.parametrize('anchored', [False, True])
+def test_stitched_oos_signals_match_full_history(name, anchored):
+    spec = registry.get(name)
+    df = make_ohlcv(2400, seed=11)
+    params = spec.defaults()
+    expected = spec.apply(df, **params)['Signal']
+
+    folds = make_folds(len(df), train_bars=800, test_bars=400, anchored=anchored)
+    stitched = pd.concat([oos_signals(df, spec, params, test_start, test_end)['Signal']
+                          for _, _, test_start, test_end in folds])
+    pd.testing.assert_series_equal(stitched, expected.iloc[folds[0][2]:])
+
+def test_walk_forward_runs_folds():
+    df = make_ohlcv(1500, seed=5)
+    space = {'supertrend': {'period': [7, 10]}, 'smc': {'swing_length': [2]}}
+    result = walk_forward(df, space, train_bars=600, test_bars=300, max_workers=1, seed=0)
+    assert len(result['folds']) == 3
+    assert len(result['equity']) == 900
+    assert np.isfinite(result['total_return_pct'])